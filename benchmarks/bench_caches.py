@@ -0,0 +1,93 @@
+#!/usr/bin/env python
+"""
+    Benchmark of the caches of the tries of the glyph sets (DictUtils) and of the booleans (BooleanUtils): the cost
+    of a call hitting them, and the share of the calls hitting them when threads each use a few glyph sets over and
+    over among a stream of glyph sets used once (e.g. built on the fly), more glyph sets than the caches hold.
+
+    Run it with both the standard and the free-threaded interpreter (e.g. python3.13t) to compare.
+
+    Usage (from the root of the repository): PYTHONPATH=src python benchmarks/bench_caches.py [--threads N]
+"""
+from __future__ import division, print_function, unicode_literals
+
+import argparse
+import sys
+import threading
+import time
+import timeit
+
+from glyphs.ro.ROGlyph import ROGlyph
+from glyphs.utils import DictUtils as dict_utils
+from glyphs.utils.BooleanUtils import BooleanUtils
+from glyphs.utils.DictUtils import DictUtils
+
+
+SOURCE = {'key': 'XXX-23', 'fields': {'status': 'done', 'resolved': 'true'}}
+
+GLYPHS = (ROGlyph('key'), ROGlyph('fields>status'), ROGlyph('fields>resolved'))
+
+
+def best_of(statement, calls):
+    return min(timeit.repeat(statement, number=calls, repeat=5)) / calls * 1e9
+
+
+def glyph_set(name):
+    return (ROGlyph('key'), ROGlyph('fields>{}'.format(name)))
+
+
+def run(hot, cold, calls, hits):
+    """
+        Reads L{SOURCE} with each of the L{hot} glyph sets in turn, one of the L{cold} ones (used once) every other
+        call, and appends the number of calls of the hot sets hitting the cache to L{hits}.
+    """
+    count = 0
+    for i in range(calls):
+        glyphs = hot[i % len(hot)]
+        count += glyphs in dict_utils._R_TRIES
+        DictUtils.get_many(SOURCE, glyphs)
+        if i % 2:
+            DictUtils.get_many(SOURCE, cold[i // 2])
+    hits.append(count)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--threads', type=int, default=4, help='number of threads sharing the caches')
+    parser.add_argument('--hot', type=int, default=24, help='number of glyph sets used over and over per thread')
+    parser.add_argument('--calls', type=int, default=20000, help='number of calls of the hot sets per thread')
+    args = parser.parse_args()
+
+    gil = getattr(sys, '_is_gil_enabled', lambda: True)()
+    print('Python {} ({})'.format(sys.version.split()[0], 'GIL' if gil else 'free-threaded'))
+
+    print('get_many (cached)   {:8.0f} ns'.format(best_of(lambda: DictUtils.get_many(SOURCE, GLYPHS), 100000)))
+    print('to_boolean (cached) {:8.0f} ns'.format(best_of(lambda: BooleanUtils.to_boolean('true'), 100000)))
+
+    hits = []
+    threads = [
+               threading.Thread(target=run, args=(
+                                                  [glyph_set('h{}-{}'.format(t, i)) for i in range(args.hot)],
+                                                  [glyph_set('c{}-{}'.format(t, i)) for i in range(args.calls // 2)],
+                                                  args.calls,
+                                                  hits,
+                                                  ))
+               for t in range(args.threads)
+               ]
+    started = time.time()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.time() - started
+    cached = sum(hits) / len(hits) / args.calls
+
+    print('{} threads x {} hot glyph sets: {:.1%} of the hot calls cached, {:.3f} s'.format(
+                                                                                          args.threads,
+                                                                                          args.hot,
+                                                                                          cached,
+                                                                                          elapsed,
+                                                                                          ))
+
+
+if __name__ == '__main__':
+    main()
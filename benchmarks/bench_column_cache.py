@@ -0,0 +1,71 @@
+#!/usr/bin/env python
+"""
+    Benchmark of ColumnCache: extracting the columns of a set of glyphs out of a NDJSON file, then getting them back
+    from the cache (file hashed again or not) and summing one of them.
+
+    Usage (from the root of the repository): PYTHONPATH=src python benchmarks/bench_column_cache.py [--records N]
+"""
+from __future__ import print_function, unicode_literals
+
+import argparse
+import json
+import os
+import shutil
+import tempfile
+import time
+
+from glyphs.extraction.ColumnCache import ColumnCache
+from glyphs.ro.ROGlyph import ROGlyph
+
+GLYPHS = (
+          ROGlyph('key'),
+          ROGlyph('fields>status>statusCategory>id', r_translation_function=int),
+          ROGlyph('fields>assignee>name', r_default_value=''),
+          )
+
+
+def write_records(path, count):
+    with open(path, 'w') as f:
+        for i in range(count):
+            record = {
+                      'key': 'XXX-{}'.format(i),
+                      'fields': {
+                                 'status': {'name': 'Done', 'statusCategory': {'id': i % 5, 'key': 'done'}},
+                                 'assignee': {'name': 'someone-{}'.format(i % 97)},
+                                 'description': 'x' * (i % 400),
+                                 },
+                      }
+            f.write(json.dumps(record))
+            f.write('\n')
+
+
+def timed(label, function):
+    started = time.time()
+    result = function()
+    print('{:<30} {:8.3f} s'.format(label, time.time() - started))
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--records', type=int, default=300000, help='number of records of the file')
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp()
+    try:
+        path = os.path.join(directory, 'records.ndjson')
+        write_records(path, args.records)
+        print('{} records, {} bytes'.format(args.records, os.path.getsize(path)))
+
+        cache = ColumnCache(os.path.join(directory, 'cache'))
+        timed('extract and store', lambda: sum(cache.columns(path, GLYPHS)[1].data))
+        timed('cached', lambda: sum(cache.columns(path, GLYPHS)[1].data))
+
+        shutil.rmtree(os.path.join(directory, 'cache', 'sources'))
+        timed('cached (file hashed)', lambda: sum(cache.columns(path, GLYPHS)[1].data))
+    finally:
+        shutil.rmtree(directory)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,100 @@
+#!/usr/bin/env python
+"""
+    Benchmark of DictUtils.get, in_ and set at HEAD against the same methods at a baseline revision (by default,
+    the one before the fast path for plain dictionaries), called with the same plain dictionaries and glyphs.
+
+    The baseline DictUtils is loaded from git (C{git show <revision>:src/glyphs/utils/DictUtils.py}) on top of the
+    glyphs of the working tree, so only the code of DictUtils differs between the two columns.
+
+    Usage (from the root of the repository): PYTHONPATH=src python benchmarks/bench_dict_fast_path.py
+    [--baseline REVISION] [--calls N]
+"""
+from __future__ import print_function, unicode_literals
+
+import argparse
+import subprocess
+import sys
+import timeit
+import types
+
+from glyphs.ro.ROGlyph import ROGlyph
+from glyphs.rw.RWGlyph import RWGlyph
+from glyphs.utils.DictUtils import DictUtils
+
+
+SOURCE = {
+          'fields': {
+                     'xsi': 'Status',
+                     'status': {
+                                'name': 'Done',
+                                'statusCategory': {'colorName': 'green', 'id': 3, 'key': 'done'},
+                                },
+                     },
+          'key': 'XXX-23',
+          }
+
+READ_GLYPHS = (
+               ('typed', ROGlyph('fields>status>statusCategory>id', r_types='>xsi:Status', r_translation_function=int)),
+               ('flat', ROGlyph('key')),
+               ('default', ROGlyph('fields>status>resolution', r_default_value='none')),
+               )
+
+WRITE_GLYPHS = (
+                ('typed', RWGlyph('fields>status>statusCategory>id', w_types='>xsi:Status')),
+                ('flat', RWGlyph('key')),
+                )
+
+
+def load_baseline(revision):
+    """
+        Returns the DictUtils class of the given git revision.
+    """
+    source = subprocess.check_output(['git', 'show', '{}:src/glyphs/utils/DictUtils.py'.format(revision)])
+    module = types.ModuleType(str('baseline_dict_utils'))
+    sys.modules[module.__name__] = module  # kept alive: Python 2 clears the globals of collected modules
+    exec(compile(source, 'DictUtils.py@{}'.format(revision), 'exec'), module.__dict__)
+    return module.DictUtils
+
+
+def written(utils, glyph):
+    destination = {}
+    utils.set(destination, glyph, 3)
+    return destination
+
+
+def best_of(statement, calls):
+    return min(timeit.repeat(statement, number=calls, repeat=5)) / calls * 1e9
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--baseline', default='cd4175d^', help='git revision of the baseline DictUtils')
+    parser.add_argument('--calls', type=int, default=100000, help='number of calls per measure')
+    args = parser.parse_args()
+
+    baseline = load_baseline(args.baseline)
+
+    cases = []
+    for label, g in READ_GLYPHS:
+        cases.append(('get', label, lambda u, g=g: u.get(SOURCE, g)))
+        cases.append(('in_', label, lambda u, g=g: u.in_(SOURCE, g)))
+    for label, g in WRITE_GLYPHS:
+        cases.append(('set', label, lambda u, g=g: written(u, g)))
+
+    print('{:<12} {:>14} {:>14}'.format('', 'baseline', 'HEAD'))
+    for method, label, call in cases:
+        # identical inputs, identical results.
+        assert call(baseline) == call(DictUtils)
+
+        baseline_ns = best_of(lambda: call(baseline), args.calls)
+        head_ns = best_of(lambda: call(DictUtils), args.calls)
+        print('{:<12} {:11.0f} ns {:11.0f} ns  x{:.2f}'.format(
+                                                               '{} {}'.format(method, label),
+                                                               baseline_ns,
+                                                               head_ns,
+                                                               baseline_ns / head_ns,
+                                                               ))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,90 @@
+#!/usr/bin/env python
+"""
+    Benchmark of GlyphTracer: the overhead of the tracing on DictUtils.get per sample rate, and the report of a 10
+    levels deep glyph whose 7th level is a slow (lazily loaded) mapping, read through ExtractionUtils, showing which
+    level is slow.
+
+    Usage (from the root of the repository): PYTHONPATH=src python benchmarks/bench_glyph_tracer.py [--calls N]
+"""
+from __future__ import print_function, unicode_literals
+
+import argparse
+import time
+import timeit
+
+try:  # transition with Python 3.6+
+    from collections.abc import Mapping
+except ImportError:
+    from collections import Mapping
+
+from glyphs.extraction.GlyphTracer import GlyphTracer
+from glyphs.ro.ROGlyph import ROGlyph
+from glyphs.utils.DictUtils import DictUtils
+from glyphs.utils.ExtractionUtils import ExtractionUtils
+
+
+class SlowMapping(Mapping):
+    """
+        Mapping loading its items on each access (as a lazy ORM-backed mapping would).
+    """
+
+    def __init__(self, items):
+        self.__items = items
+
+    def __getitem__(self, key):
+        time.sleep(0.00005)
+        return self.__items[key]
+
+    def __iter__(self):
+        return iter(self.__items)
+
+    def __len__(self):
+        return len(self.__items)
+
+
+PATH = tuple('level{}'.format(i) for i in range(10))
+
+GLYPH = ROGlyph('>'.join(PATH), r_types='>' * 3 + 'xsi:Node' + '>' * 6, r_translation_function=str.upper)
+
+
+def source(slow_level=None):
+    node = 'value'
+    for i, sub_path in reversed(tuple(enumerate(PATH))):
+        node = {sub_path: node}
+        if i == 3:
+            node['xsi'] = 'Node'
+        if i == slow_level:
+            node = SlowMapping(node)
+    return node
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--calls', type=int, default=100000, help='number of calls timed')
+    args = parser.parse_args()
+
+    fast = source()
+    baseline = min(timeit.repeat(lambda: DictUtils.get(fast, GLYPH), number=args.calls, repeat=3))
+    print('{:<22} {:8.3f} us/call'.format('no tracer', baseline / args.calls * 1e6))
+
+    for sample_rate in (1000, 100, 10, 1):
+        with GlyphTracer(sample_rate):
+            elapsed = min(timeit.repeat(lambda: DictUtils.get(fast, GLYPH), number=args.calls, repeat=3))
+        print('{:<22} {:8.3f} us/call  +{:.0f}%'.format(
+                                                          'GlyphTracer (1 in {})'.format(sample_rate),
+                                                          elapsed / args.calls * 1e6,
+                                                          (elapsed / baseline - 1) * 100,
+                                                          ))
+
+    slow = source(slow_level=6)
+    with GlyphTracer(10) as tracer:
+        for values in ExtractionUtils.iter_extract((slow for _ in range(1000)), (GLYPH,)):
+            assert values == ('VALUE',)
+
+    print('Mean time per step, 7th level slow ({} traced calls):'.format(1000 // tracer.sample_rate))
+    for step in tracer.report()['glyphs'][repr(GLYPH)]['steps']:
+        print('    {:<70} {:>10} ns'.format(step['step'], step['mean_ns']))
+
+
+if __name__ == '__main__':
+    main()
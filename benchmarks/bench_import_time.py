@@ -0,0 +1,79 @@
+#!/usr/bin/env python
+"""
+    Benchmark of the time taken to import the package, enforcing a budget.
+
+    Each import is timed in a fresh interpreter (best of several runs), net of the interpreter start up. The script
+    exits with a non-zero status if any import goes over its budget, so it can be used as a check in CI.
+
+    Usage (from the root of the repository): PYTHONPATH=src python benchmarks/bench_import_time.py [--scale FACTOR]
+"""
+from __future__ import print_function, unicode_literals
+
+import argparse
+import subprocess
+import sys
+
+BUDGETS_MS = (
+              ('glyphs', 2.0),
+              ('glyphs.utils.DictUtils', 15.0),
+              ('glyphs.utils.BooleanUtils', 5.0),
+              )
+""" Pairs of module and budget (in milliseconds) of its import."""
+
+FORBIDDEN_MODULES = (
+                     ('glyphs.utils.DictUtils', 'six'),
+                     )
+""" Pairs of module and of a module its import must not load (Python 3 only)."""
+
+RUNS = 7
+
+TIMER = (
+         "import time; t = time.perf_counter(); import {module}; "
+         "print((time.perf_counter() - t) * 1000.0)"
+         )
+
+
+def best_import_ms(module):
+    timings = []
+
+    for _ in range(RUNS):
+        out = subprocess.check_output([sys.executable, '-c', TIMER.format(module=module)])
+        timings.append(float(out.decode('ascii').strip()))
+
+    return min(timings)
+
+
+def loads_module(module, other):
+    out = subprocess.check_output([
+                                   sys.executable,
+                                   '-c',
+                                   "import sys; import {}; print({!r} in sys.modules)".format(module, other),
+                                   ])
+    return out.decode('ascii').strip() == 'True'
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--scale', type=float, default=1.0, help='factor applied to the budgets (slow machines)')
+    args = parser.parse_args()
+
+    failed = False
+
+    for module, budget_ms in BUDGETS_MS:
+        budget_ms *= args.scale
+        elapsed_ms = best_import_ms(module)
+        over = elapsed_ms > budget_ms
+        failed = failed or over
+        print('{:<30} {:7.2f} ms  (budget {:6.2f} ms){}'.format(module, elapsed_ms, budget_ms, '  OVER' if over else ''))
+
+    if sys.version_info[0] >= 3:
+        for module, other in FORBIDDEN_MODULES:
+            if loads_module(module, other):
+                failed = True
+                print('{} loads {}'.format(module, other))
+
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,105 @@
+#!/usr/bin/env python
+"""
+    Benchmark of MessagePackReader against decoding the whole MessagePack payload then reading each glyph with
+    DictUtils.get, on large payloads of which a handful of values is read.
+
+    The reader skips strings and binaries in constant time and stops scanning a map once the keys it looks for in it
+    are found, so it wins by far on large payloads, whatever they are made of. Its worst case is a map made of many
+    small values in which a key is absent (or a reader with last_value_wins): the map is then scanned to its end,
+    going through each object, and the reader loses against the C implementation of msgpack.
+
+    Requires msgpack (only for encoding the payload and for the comparison, not by the reader).
+
+    Usage (from the root of the repository): PYTHONPATH=src python benchmarks/bench_msgpack_reader.py
+"""
+from __future__ import print_function, unicode_literals
+
+import sys
+import timeit
+
+from glyphs.readers.MessagePackReader import MessagePackReader
+from glyphs.ro.ROGlyph import ROGlyph
+from glyphs.utils.DictUtils import DictUtils
+
+try:
+    import msgpack
+except ImportError:
+    print('msgpack is required by this benchmark')
+    sys.exit(1)
+
+
+NUMBER = 200
+
+GLYPHS = (
+          ROGlyph('key'),
+          ROGlyph('fields>status>statusCategory>id', r_types='>xsi:Status', r_translation_function=int),
+          ROGlyph('fields>assignee>name', r_default_value=''),
+          ROGlyph('fields>priority', r_default_value='none'),
+          )
+
+
+def many_small_values(count, priority=True):
+    fields = {
+              'xsi': 'Status',
+              'status': {'name': 'Done', 'statusCategory': {'id': 3, 'key': 'done'}},
+              'assignee': {'name': 'someone'},
+              }
+    if priority:
+        fields['priority'] = 'high'
+    fields['history'] = [{'at': i, 'from': 'open', 'to': 'done', 'ok': True} for i in range(count)]
+    fields['custom'] = dict(('customfield_{}'.format(i), i * 1.5) for i in range(count))
+    return {'key': 'XXX-23', 'fields': fields}
+
+
+PAYLOADS = (
+            (
+             'large strings',
+             {
+              'key': 'XXX-23',
+              'fields': {
+                         'description': 'x' * 200000,
+                         'attachments': [b'\x00' * 50000 for _ in range(20)],
+                         'xsi': 'Status',
+                         'status': {'name': 'Done', 'statusCategory': {'id': 3, 'key': 'done'}},
+                         'assignee': {'name': 'someone', 'avatar': 'y' * 100000},
+                         },
+              },
+             ),
+            ('many small values', many_small_values(2000)),
+            ('many small values, larger', many_small_values(20000)),
+            ('many small values, a key absent (worst case)', many_small_values(2000, priority=False)),
+            )
+
+
+def main():
+    reader = MessagePackReader(GLYPHS)
+    last_value_reader = MessagePackReader(GLYPHS, last_value_wins=True)
+
+    for name, payload in PAYLOADS:
+        raw = msgpack.packb(payload, use_bin_type=True)
+        assert reader.read(raw) == tuple(DictUtils.get(msgpack.unpackb(raw, raw=False), g) for g in GLYPHS)
+
+        def full_decode():
+            source = msgpack.unpackb(raw, raw=False)
+            return tuple(DictUtils.get(source, g) for g in GLYPHS)
+
+        def read():
+            return reader.read(raw)
+
+        def read_last_value():
+            return last_value_reader.read(raw)
+
+        print('{} ({} bytes)'.format(name, len(raw)))
+        baseline = None
+        for label, statement in (
+                                 ('unpackb + DictUtils.get', full_decode),
+                                 ('MessagePackReader.read', read),
+                                 ('  with last_value_wins', read_last_value),
+                                 ):
+            elapsed = min(timeit.repeat(statement, number=NUMBER, repeat=5)) / NUMBER * 1e6
+            baseline = baseline or elapsed
+            print('    {:<25} {:10.1f} us {:8.1f}x'.format(label, elapsed, baseline / elapsed))
+
+
+if __name__ == '__main__':
+    main()
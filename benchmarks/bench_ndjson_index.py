@@ -0,0 +1,78 @@
+#!/usr/bin/env python
+"""
+    Benchmark of NDJSONIndex: building the index of a NDJSON file, loading it back and extracting the records with
+    1 to N processes (N being the number of CPUs).
+
+    Usage (from the root of the repository): PYTHONPATH=src python benchmarks/bench_ndjson_index.py [--records N]
+"""
+from __future__ import print_function, unicode_literals
+
+import argparse
+import json
+import multiprocessing
+import os
+import shutil
+import tempfile
+import time
+
+from glyphs.extraction.NDJSONIndex import NDJSONIndex
+from glyphs.ro.ROGlyph import ROGlyph
+
+GLYPHS = (
+          ROGlyph('key'),
+          ROGlyph('fields>status>statusCategory>id', r_translation_function=int),
+          ROGlyph('fields>assignee>name', r_default_value=''),
+          )
+
+
+def write_records(path, count):
+    with open(path, 'w') as f:
+        for i in range(count):
+            record = {
+                      'key': 'XXX-{}'.format(i),
+                      'fields': {
+                                 'status': {'name': 'Done', 'statusCategory': {'id': i % 5, 'key': 'done'}},
+                                 'assignee': {'name': 'someone-{}'.format(i % 97)},
+                                 'description': 'x' * (i % 400),
+                                 },
+                      }
+            f.write(json.dumps(record))
+            f.write('\n')
+
+
+def timed(label, function):
+    started = time.time()
+    result = function()
+    print('{:<30} {:8.3f} s'.format(label, time.time() - started))
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--records', type=int, default=300000, help='number of records of the file')
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp()
+    try:
+        path = os.path.join(directory, 'records.ndjson')
+        write_records(path, args.records)
+        print('{} records, {} bytes'.format(args.records, os.path.getsize(path)))
+
+        timed('build and save', lambda: NDJSONIndex.open(path))
+        index = timed('load', lambda: NDJSONIndex.open(path))
+
+        timed('iter_extract', lambda: sum(1 for _ in index.iter_extract(GLYPHS)))
+
+        processes = 1
+        while processes <= multiprocessing.cpu_count():
+            timed(
+                  'iter_extract_chunks ({})'.format(processes),
+                  lambda: sum(len(c.values) for c in index.iter_extract_chunks(GLYPHS, processes=processes)),
+                  )
+            processes *= 2
+    finally:
+        shutil.rmtree(directory)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,62 @@
+#!/usr/bin/env python
+"""
+    Benchmark of PayloadTemplate against DictUtils.set called for each glyph and against PayloadBuilder, building
+    the same payload (nested dictionaries and types) over and over, as a bulk export does.
+
+    Usage (from the root of the repository): PYTHONPATH=src python benchmarks/bench_payload_template.py [--payloads N]
+"""
+from __future__ import print_function, unicode_literals
+
+import argparse
+import timeit
+
+from glyphs.rw.RWGlyph import RWGlyph
+from glyphs.utils.DictUtils import DictUtils
+from glyphs.writers.PayloadBuilder import PayloadBuilder
+from glyphs.writers.PayloadTemplate import PayloadTemplate
+
+
+GLYPHS = (
+          RWGlyph('key'),
+          RWGlyph('fields>status>statusCategory>id', w_types='>xsi:Status'),
+          RWGlyph('fields>status>statusCategory>key', w_types='>xsi:Status'),
+          RWGlyph('fields>status>name', w_types='>xsi:Status'),
+          RWGlyph('fields>assignee>name', w_types='>>xsi:User'),
+          RWGlyph('fields>assignee>email', w_types='>>xsi:User'),
+          RWGlyph('fields>resolved'),
+          RWGlyph('fields>priority', w_translation_function=int),
+          )
+
+VALUES = ('XXX-1', 3, 'done', 'Done', 'someone', 'someone@example.com', True, '2',)
+
+
+def with_set():
+    payload = {}
+    for g, value in zip(GLYPHS, VALUES):
+        DictUtils.set(payload, g, value)
+    return payload
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--payloads', type=int, default=100000, help='number of payloads built')
+    args = parser.parse_args()
+
+    builder = PayloadBuilder(GLYPHS)
+    template = PayloadTemplate(GLYPHS)
+    mapping = dict(zip(GLYPHS, VALUES))
+    assert template.build(VALUES) == builder.build(mapping) == with_set()
+
+    baseline = None
+    for label, build in (
+                         ('DictUtils.set', with_set),
+                         ('PayloadBuilder', lambda: builder.build(mapping)),
+                         ('PayloadTemplate', lambda: template.build(VALUES)),
+                         ):
+        elapsed = min(timeit.repeat(build, number=args.payloads, repeat=3))
+        baseline = baseline or elapsed
+        print('{:<16} {:8.3f} us/payload  x{:.2f}'.format(label, elapsed / args.payloads * 1e6, baseline / elapsed))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,83 @@
+#!/usr/bin/env python
+"""
+    Benchmark of ThreadedExtractor from 1 to N threads (N being the number of CPUs, at least 4), on a CPU bound
+    extraction and on an extraction interleaved with I/O (a translation function sleeping, as a lookup in a remote
+    service would).
+
+    Run it with both the standard and the free-threaded interpreter (e.g. python3.13t) to compare: CPU bound
+    extraction only scales without the GIL.
+
+    Usage (from the root of the repository): PYTHONPATH=src python benchmarks/bench_threads.py [--sources N]
+"""
+from __future__ import print_function, unicode_literals
+
+import argparse
+import multiprocessing
+import sys
+import time
+
+from glyphs.extraction.StringInterner import StringInterner
+from glyphs.extraction.ThreadedExtractor import ThreadedExtractor
+from glyphs.ro.ROGlyph import ROGlyph
+from glyphs.utils.BooleanUtils import BooleanUtils
+
+
+def lookup(value):
+    time.sleep(0.0001)
+    return value
+
+
+CPU_GLYPHS = (
+              ROGlyph('key'),
+              ROGlyph('fields>status>statusCategory>id', r_types='>xsi:Status', r_translation_function=int),
+              ROGlyph('fields>status>name'),
+              ROGlyph('fields>resolved', r_translation_function=BooleanUtils.to_boolean),
+              )
+
+IO_GLYPHS = CPU_GLYPHS + (ROGlyph('fields>assignee>name', r_translation_function=lookup),)
+
+
+def sources(count):
+    for i in range(count):
+        yield {
+               'key': 'XXX-{}'.format(i),
+               'fields': {
+                          'xsi': 'Status',
+                          'status': {'name': 'Done', 'statusCategory': {'id': i % 5, 'key': 'done'}},
+                          'resolved': 'true' if i % 2 else 'false',
+                          'assignee': {'name': 'someone-{}'.format(i % 97)},
+                          },
+               }
+
+
+def run(glyphs, count, threads):
+    interner = StringInterner()
+    with ThreadedExtractor(glyphs, threads=threads, chunk_size=64, interner=interner) as extractor:
+        started = time.time()
+        extracted = sum(1 for _ in extractor.iter_extract(sources(count)))
+        elapsed = time.time() - started
+    assert extracted == count
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--sources', type=int, default=50000, help='number of sources of the CPU bound extraction')
+    args = parser.parse_args()
+
+    gil = getattr(sys, '_is_gil_enabled', lambda: True)()
+    print('Python {} ({})'.format(sys.version.split()[0], 'GIL' if gil else 'free-threaded'))
+
+    for label, glyphs, count in (('CPU bound', CPU_GLYPHS, args.sources), ('I/O interleaved', IO_GLYPHS, args.sources // 25)):
+        print('{} ({} sources)'.format(label, count))
+        baseline = None
+        threads = 1
+        while threads <= max(4, multiprocessing.cpu_count()):
+            elapsed = run(glyphs, count, threads)
+            baseline = baseline or elapsed
+            print('    {:>3} threads {:8.3f} s  x{:.2f}'.format(threads, elapsed, baseline / elapsed))
+            threads *= 2
+
+
+if __name__ == '__main__':
+    main()
@@ -2,14 +2,18 @@
 
 from __future__ import unicode_literals
 from distutils.core import setup
+import re
 from setuptools import find_packages
 
 with open("README.md", "r") as fh:
     long_description = fh.read()
 
+with open("src/glyphs/__init__.py", "r") as fh:
+    version = re.search(r"^__version__ = '([^']+)'", fh.read(), re.MULTILINE).group(1)
+
 setup(
         name='glyphs',
-        version='0.1.3',
+        version=version,
         description='Swiss army knife of data extraction',
         long_description=long_description,
         long_description_content_type="text/markdown",
@@ -17,11 +21,14 @@ setup(
         url='https://github.com/slorg1/glyphs',
         packages=[
                   'glyphs',
-                  'glyphs.backports',
+                  'glyphs.extraction',
                   'glyphs.helpers',
+                  'glyphs.readers',
+                  'glyphs.registry',
                   'glyphs.ro',
                   'glyphs.rw',
                   'glyphs.utils',
+                  'glyphs.writers',
                   ],
         package_dir={'':'src'},
         install_requires=[
@@ -1 +1,66 @@
-# this space for rent
\ No newline at end of file
+"""
+    Swiss army knife of data extraction.
+
+    The main classes of the package are available from here. Their modules are only imported when first used, so
+    that importing C{glyphs} stays cheap for short-lived processes.
+"""
+from __future__ import unicode_literals
+
+import sys
+
+__version__ = '0.1.3'
+
+_LAZY_ATTRIBUTES = {
+                    'BooleanUtils': 'glyphs.utils.BooleanUtils',
+                    'ColumnCache': 'glyphs.extraction.ColumnCache',
+                    'DictUtils': 'glyphs.utils.DictUtils',
+                    'ExtractionUtils': 'glyphs.utils.ExtractionUtils',
+                    'GlyphAggregator': 'glyphs.extraction.GlyphAggregator',
+                    'GlyphColumn': 'glyphs.extraction.GlyphColumn',
+                    'GlyphRegistry': 'glyphs.registry.GlyphRegistry',
+                    'GlyphTracer': 'glyphs.extraction.GlyphTracer',
+                    'GlyphValidator': 'glyphs.readers.GlyphValidator',
+                    'JSONPayloadWriter': 'glyphs.writers.JSONPayloadWriter',
+                    'MessagePackReader': 'glyphs.readers.MessagePackReader',
+                    'MemoryUtils': 'glyphs.utils.MemoryUtils',
+                    'NDJSONIndex': 'glyphs.extraction.NDJSONIndex',
+                    'PayloadBuilder': 'glyphs.writers.PayloadBuilder',
+                    'PayloadTemplate': 'glyphs.writers.PayloadTemplate',
+                    'PredicateUtils': 'glyphs.utils.PredicateUtils',
+                    'ROGlyph': 'glyphs.ro.ROGlyph',
+                    'RWGlyph': 'glyphs.rw.RWGlyph',
+                    'ResettableGlyph': 'glyphs.rw.ResettableGlyph',
+                    'StringInterner': 'glyphs.extraction.StringInterner',
+                    'StringUtils': 'glyphs.utils.StringUtils',
+                    'ThreadedExtractor': 'glyphs.extraction.ThreadedExtractor',
+                    'TrackingMapping': 'glyphs.writers.TrackingMapping',
+                    }
+""" Module of each attribute of the package, imported on first access."""
+
+__all__ = sorted(str(name) for name in _LAZY_ATTRIBUTES)  # Python 2: native strings only
+
+
+def __getattr__(name):
+    """
+        Returns the attribute of the given L{name}, importing its module on first access (PEP 562).
+
+        @raise AttributeError: if the package has no such attribute
+    """
+    module_name = _LAZY_ATTRIBUTES.get(name)
+
+    if module_name is None:
+        raise AttributeError("module {!r} has no attribute {!r}".format(__name__, name))
+
+    value = getattr(__import__(module_name, fromlist=(str(name),)), name)
+    globals()[name] = value  # next accesses do not go through here.
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_ATTRIBUTES))
+
+
+if sys.version_info < (3, 7):
+    # no module __getattr__: everything is imported upfront.
+    for _name in __all__:
+        globals()[_name] = __getattr__(_name)
@@ -0,0 +1,228 @@
+from __future__ import unicode_literals
+
+import hashlib
+import json
+import os
+
+from glyphs.extraction.GlyphColumn import GlyphColumn
+from glyphs.helpers import compat
+from glyphs.helpers.FileUtils import FileUtils
+from glyphs.helpers.ImmutableObject import ImmutableObject
+from glyphs.ro.ROGlyph import ROGlyph
+from glyphs.utils.DictUtils import DictUtils
+
+
+class ColumnCache(ImmutableObject):
+    """
+        Persistent cache of the L{columns<GlyphColumn>} of values read with glyphs out of NDJSON files (one JSON
+        document per line, blank lines being skipped).
+
+        A column is keyed by the fingerprint of the file (its size, modification time and SHA-256) and by the
+        identity of the glyph (its path, types, default value and the name of its translation function). Only the
+        columns of the glyphs new to a file, or of a file modified since, are extracted: the others are memory
+        mapped back from the cache. Within the cache directory, the columns of a file are stored in a directory
+        named after its SHA-256, which is only computed again when the size or the modification time of the file
+        change.
+    """
+
+    COLUMN_SUFFIX = '.col'
+    """ Suffix of the column files."""
+
+    def __init__(self, directory):
+        """
+            Initializer for a cache.
+
+            @param directory: the directory of the cache (created when first written to).
+            @type directory: six.text_type
+        """
+        self.__dict__["__directory"] = directory
+
+    @property
+    def directory(self):
+        """
+            Returns the directory of the cache.
+
+            @rtype: six.text_type
+        """
+        return self.__dict__["__directory"]
+
+    @staticmethod
+    def glyph_key(glyph, no_default=False, force_none_to_default_value=False, loads=json.loads):
+        """
+            Returns the stable key identifying the column of values read with the given L{glyph} and options.
+
+            @type glyph: ROGlyph
+            @param no_default: see L{DictUtils.get<glyphs.utils.DictUtils.DictUtils.get>}.
+            @type no_default: bool
+            @param force_none_to_default_value: see L{DictUtils.get<glyphs.utils.DictUtils.DictUtils.get>}.
+            @type force_none_to_default_value: bool
+            @param loads: the function decoding the lines of the file.
+            @type loads: collections.abc.Callable
+
+            @rtype: six.text_type
+
+            @raise ValueError: if the translation function of the glyph (or L{loads}) has no stable name (e.g. a
+            lambda or a nested function).
+        """
+        assert isinstance(glyph, ROGlyph)
+
+        identity = (
+                    tuple(glyph.iter_r_path_type),
+                    glyph.r_default_value,
+                    ColumnCache.__name(glyph.r_translation_function),
+                    ColumnCache.__name(loads),
+                    bool(no_default),
+                    bool(force_none_to_default_value),
+                    )
+
+        return hashlib.sha256(repr(identity).encode('utf-8')).hexdigest()[:32]
+
+    def fingerprint(self, path):
+        """
+            Returns the triplet of the size, the modification time (in nanoseconds) and the SHA-256 (hexadecimal)
+            of the file at L{path}.
+
+            @rtype: tuple
+
+            @raise IOError: if the file cannot be read.
+        """
+        size, mtime = FileUtils.stat(path)
+        memo_path = os.path.join(
+                                 self.__dict__["__directory"],
+                                 'sources',
+                                 hashlib.sha256(os.path.abspath(path).encode('utf-8')).hexdigest()[:32] + '.json',
+                                 )
+
+        try:
+            with open(memo_path, 'rb') as f:
+                memo = json.loads(f.read().decode('utf-8'))
+            if memo['size'] == size and memo['mtime'] == mtime:
+                return size, mtime, memo['sha256']
+        except (IOError, OSError, ValueError, KeyError,):
+            # missing, stale or unreadable: hashed again.
+            pass
+
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                digest.update(block)
+        digest = digest.hexdigest()
+
+        memo = json.dumps({'size': size, 'mtime': mtime, 'sha256': digest}).encode('utf-8')
+        FileUtils.write_atomically(memo_path, lambda f: f.write(memo))
+
+        return size, mtime, digest
+
+    def columns(self, path, glyphs, no_default=False, force_none_to_default_value=False, loads=json.loads):
+        """
+            Returns the tuple of the columns of the values read with each of the given L{glyphs} out of the records
+            of the NDJSON file at L{path}, extracting (in a single pass) those which are not in the cache. The
+            columns are memory mapped: L{close<GlyphColumn.close>} them once read.
+
+            @type glyphs: collections.abc.Iterable
+            @param no_default: see L{DictUtils.get<glyphs.utils.DictUtils.DictUtils.get>}.
+            @type no_default: bool
+            @param force_none_to_default_value: see L{DictUtils.get<glyphs.utils.DictUtils.DictUtils.get>}.
+            @type force_none_to_default_value: bool
+            @param loads: the function decoding the lines of the file.
+            @type loads: collections.abc.Callable
+
+            @rtype: tuple
+
+            @raise IOError: if the file cannot be read or if it was modified during the extraction.
+            @raise ValueError: see L{ColumnCache.glyph_key}. Also whatever the translation function of a glyph
+            raised.
+            @raise TypeError: on a type mismatch (see L{DictUtils.get<glyphs.utils.DictUtils.DictUtils.get>}). Also
+            whatever the translation function of a glyph raised.
+
+            @precondition: all(isinstance(g, ROGlyph) for g in glyphs)
+        """
+        glyphs = tuple(glyphs)
+        assert all(isinstance(g, ROGlyph) for g in glyphs)
+
+        size, mtime, digest = self.fingerprint(path)
+        directory = os.path.join(self.__dict__["__directory"], digest)
+        column_paths = tuple(
+                             os.path.join(
+                                          directory,
+                                          ColumnCache.glyph_key(g, no_default, force_none_to_default_value, loads)
+                                          + ColumnCache.COLUMN_SUFFIX,
+                                          )
+                             for g in glyphs
+                             )
+        columns = [GlyphColumn.open(p, g) for p, g in compat.zip(column_paths, glyphs)]
+        todo = tuple(i for i, c in enumerate(columns) if c is None)
+
+        if not todo:
+            return tuple(columns)
+
+        extracted = ColumnCache.__extract(
+                                          path,
+                                          tuple(glyphs[i] for i in todo),
+                                          no_default,
+                                          force_none_to_default_value,
+                                          loads,
+                                          )
+
+        if FileUtils.stat(path) != (size, mtime,):
+            raise IOError('{} was modified during the extraction'.format(path))
+
+        for i, (values, mask) in compat.zip(todo, extracted):
+            GlyphColumn.write(column_paths[i], values, mask)
+            columns[i] = GlyphColumn.open(column_paths[i], glyphs[i])
+
+        return tuple(columns)
+
+    @staticmethod
+    def __extract(path, glyphs, no_default, force_none_to_default_value, loads):
+        """
+            Returns, per glyph, the pair of the list of the values read out of the records of the file at L{path}
+            and of the list of their L{states<GlyphColumn.VALID>}. Only the records in which the path of a glyph is
+            not found are L{missing<GlyphColumn.MISSING>}: the other errors (type mismatches, translations) are
+            raised, rather than cached as absent values.
+
+            @rtype: tuple
+        """
+        get = DictUtils.get
+        columns = tuple(([], [],) for _ in glyphs)
+        valid, null, missing = GlyphColumn.VALID, GlyphColumn.NULL, GlyphColumn.MISSING
+
+        with open(path, 'rb') as f:
+            for line in f:
+                if line.isspace():
+                    continue
+
+                record = loads(line)
+
+                for g, (values, mask) in compat.zip(glyphs, columns):
+                    try:
+                        value = get(record, g, no_default, force_none_to_default_value,)
+                    except KeyError:
+                        values.append(None)
+                        mask.append(missing)
+                        continue
+
+                    values.append(value)
+                    mask.append(null if value is None else valid)
+
+        return columns
+
+    @staticmethod
+    def __name(function):
+        """
+            Returns the qualified name of the given L{function} (C{None} if L{function} is C{None}).
+
+            @rtype: six.text_type
+
+            @raise ValueError: if L{function} has no stable name.
+        """
+        if function is None:
+            return None
+
+        module = getattr(function, '__module__', None)
+        name = getattr(function, '__qualname__', None) or getattr(function, '__name__', None)
+
+        if module is None or name is None or '<' in name:
+            raise ValueError('{!r} has no stable name: it cannot be part of the key of a column'.format(function))
+
+        return '{}.{}'.format(module, name)
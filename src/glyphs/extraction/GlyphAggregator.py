@@ -0,0 +1,390 @@
+from __future__ import unicode_literals
+
+from collections import namedtuple
+import numbers
+import os
+import pickle
+import tempfile
+import zlib
+
+from glyphs.helpers import compat
+from glyphs.ro.ROGlyph import ROGlyph
+from glyphs.utils.DictUtils import DictUtils
+from glyphs.utils.PredicateUtils import PredicateUtils
+
+
+GroupAggregate = namedtuple("GroupAggregate", ["count", "total", "minimum", "maximum"])
+"""
+    Running aggregates of a group: the number of sources in the group, then the sum, minimum and maximum of their
+    values which are not C{None} (C{None} if there is no such value).
+"""
+
+
+class _Overflow(object):
+    """
+        Type of the key of the overflow group by default, equal to no key read with a glyph.
+    """
+
+    def __repr__(self):
+        return str('OVERFLOW')
+
+    def __reduce__(self):
+        # unpickled as the same object, e.g. when aggregators are merged across processes.
+        return str('OVERFLOW')
+
+    __slots__ = tuple()
+
+
+OVERFLOW = _Overflow()
+""" Key of the overflow group by default (see L{GlyphAggregator.__init__})."""
+
+
+class GlyphAggregator(object):
+    """
+        Streaming group-by of sources keyed by the value read with a glyph, aggregating the value read with
+        another glyph.
+
+        Only the running aggregates of each group are kept in memory. When the number of groups goes above the
+        configured maximum, the groups are either spilled to disk (partitioned by key) or the sources of the new
+        groups are folded into an overflow group.
+
+        Aggregators filled in parallel (e.g. one per worker) can be merged together: the aggregates are
+        combined group by group and the results are always iterated in the same order.
+    """
+
+    OVERFLOW = OVERFLOW
+    """ Key of the overflow group by default, sorted after all the other keys."""
+
+    def __init__(self, key_glyph, value_glyph=None, max_groups=None, spill_directory=None, overflow_key=OVERFLOW,
+                 partitions=16, predicate=None):
+        """
+            Initializer for an aggregator.
+
+            @param key_glyph: glyph used to read the key of the group of a source.
+            @type key_glyph: ROGlyph
+            @param value_glyph: (Optional) glyph used to read the value to aggregate. If C{None}, only the
+            sources are counted.
+            @type value_glyph: ROGlyph
+            @param max_groups: (Optional) maximum number of groups held in memory, the overflow group included. If
+            C{None}, it is unbounded.
+            @type max_groups: int
+            @param spill_directory: (Optional) directory where the groups are spilled when there are more than
+            L{max_groups}. If C{None}, once there are L{max_groups} - 1 groups, the sources of the new groups are
+            aggregated in the group of L{overflow_key} instead.
+            @type spill_directory: six.text_type
+            @param overflow_key: key of the group aggregating the sources of the groups over L{max_groups} when
+            there is no L{spill_directory}. It must not be a key read with L{key_glyph}: by default,
+            L{GlyphAggregator.OVERFLOW}, which is none.
+            @param partitions: number of partitions of the spilled groups. Only one partition is loaded in
+            memory at a time when iterating through the results.
+            @type partitions: int
+            @param predicate: (Optional) the L{predicate<glyphs.utils.PredicateUtils.PredicateUtils>} the sources
+            must match to be aggregated. The others are dropped before the key and value are read, and the values
+            read while evaluating it are reused.
+            @type predicate: tuple
+
+            @precondition: max_groups is None or max_groups > 0
+            @precondition: partitions > 0
+        """
+        assert isinstance(key_glyph, ROGlyph)
+        assert value_glyph is None or isinstance(value_glyph, ROGlyph)
+        assert max_groups is None or max_groups > 0
+        assert partitions > 0
+
+        self.__key_glyph = key_glyph
+        self.__value_glyph = value_glyph
+        self.__glyphs = (key_glyph, value_glyph,)
+        self.__max_groups = max_groups
+        self.__spill_directory = spill_directory
+        self.__overflow_key = overflow_key
+        self.__partitions = partitions
+        self.__matches = None if predicate is None else PredicateUtils.compile(predicate)
+        self.__groups = {}
+        self.__spill_files = tuple([] for _ in compat.range(partitions))
+
+    def update(self, source):
+        """
+            Aggregates the given L{source} in its group, if it matches the predicate of this aggregator.
+
+            @type source: collections.abc.Mapping
+
+            @raise KeyError: see L{DictUtils.get<glyphs.utils.DictUtils.DictUtils.get>}
+            @raise TypeError: see L{DictUtils.get<glyphs.utils.DictUtils.DictUtils.get>}
+        """
+        matches = self.__matches
+
+        if matches is not None:
+            resolved = {}
+            if not matches(source, resolved):
+                return
+
+            unresolved = PredicateUtils.UNRESOLVED
+            key = resolved.get(self.__key_glyph, unresolved)
+            if key is unresolved:
+                # never resolved or could not be: reading it again either reads it or raises the error.
+                key = DictUtils.get(source, self.__key_glyph)
+            value = None
+            if self.__value_glyph is not None:
+                value = resolved.get(self.__value_glyph, unresolved)
+                if value is unresolved:
+                    value = DictUtils.get(source, self.__value_glyph)
+        elif self.__value_glyph is None:
+            key = DictUtils.get(source, self.__key_glyph)
+            value = None
+        else:
+            key, value = DictUtils.get_many(source, self.__glyphs)
+
+        groups = self.__groups
+        aggregate = groups.get(key)
+
+        if aggregate is None:
+            aggregate = self.__new_group(key)
+
+        aggregate[0] += 1
+
+        if value is not None:
+            if aggregate[1] is None:
+                aggregate[1] = aggregate[2] = aggregate[3] = value
+            else:
+                aggregate[1] += value
+                if value < aggregate[2]:
+                    aggregate[2] = value
+                if value > aggregate[3]:
+                    aggregate[3] = value
+
+    def consume(self, sources):
+        """
+            Aggregates each source of the given L{sources}.
+
+            @type sources: collections.abc.Iterable
+
+            @return: this aggregator
+            @rtype: GlyphAggregator
+        """
+        update = self.update
+
+        for source in sources:
+            update(source)
+
+        return self
+
+    def merge(self, other):
+        """
+            Merges the aggregates of the given L{other} aggregator into this one.
+
+            The spilled groups of L{other} are handed over to this aggregator, L{other} should not be used
+            afterwards.
+
+            @type other: GlyphAggregator
+
+            @return: this aggregator
+            @rtype: GlyphAggregator
+
+            @precondition: other.__partitions == self.__partitions
+        """
+        assert isinstance(other, GlyphAggregator)
+        assert other.__partitions == self.__partitions
+
+        for key, other_aggregate in compat.iteritems(other.__groups):
+            aggregate = self.__groups.get(key)  # not cached: spilling replaces the groups
+            if aggregate is None:
+                aggregate = self.__new_group(key)
+            GlyphAggregator.__combine(aggregate, other_aggregate)
+
+        other.__groups = {}
+
+        for files, other_files in compat.zip(self.__spill_files, other.__spill_files):
+            files.extend(other_files)
+            del other_files[:]
+
+        return self
+
+    def iter_results(self):
+        """
+            Returns a new iterator through the pairs of key and L{GroupAggregate} of each group.
+
+            Without spilled groups, the groups are sorted by key. Otherwise, they are sorted by partition and
+            then by key. Either way, the order does not depend on the order the sources were aggregated or
+            merged in.
+
+            @rtype: collections.abc.Iterator
+
+            @precondition: the keys are comparable with each other (C{None} and the overflow group excepted)
+        """
+        if not any(self.__spill_files):
+            return iter(GlyphAggregator.__sorted_results(self.__groups))
+
+        return self.__iter_spilled_results()
+
+    def close(self):
+        """
+            Deletes the files of the spilled groups, if any.
+        """
+        for files in self.__spill_files:
+            for path in files:
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+            del files[:]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.close()
+
+    def __iter_spilled_results(self):
+        """
+            Returns a new iterator through the groups, one partition at a time.
+        """
+        in_memory = tuple({} for _ in compat.range(self.__partitions))
+        for key, aggregate in compat.iteritems(self.__groups):
+            in_memory[self.__partition(key)][key] = aggregate
+
+        for partition_groups, files in compat.zip(in_memory, self.__spill_files):
+            merged = {}
+
+            for groups in [partition_groups] + [GlyphAggregator.__load(p) for p in files]:
+                for key, other_aggregate in compat.iteritems(groups):
+                    aggregate = merged.get(key)
+                    if aggregate is None:
+                        merged[key] = list(other_aggregate)
+                    else:
+                        GlyphAggregator.__combine(aggregate, other_aggregate)
+
+            for result in GlyphAggregator.__sorted_results(merged):
+                yield result
+
+    def __new_group(self, key):
+        """
+            Returns the running aggregates of the new group of L{key}, after spilling or overflowing when there
+            are too many groups in memory.
+
+            @rtype: list
+        """
+        groups = self.__groups
+        max_groups = self.__max_groups
+
+        if max_groups is None:
+            pass
+        elif self.__spill_directory is not None:
+            if len(groups) >= max_groups:
+                self.__spill()
+                groups = self.__groups
+        elif len(groups) >= max_groups - 1:
+            # the overflow group counts against the maximum: one place is kept for it.
+            key = self.__overflow_key
+            aggregate = groups.get(key)
+            if aggregate is not None:
+                return aggregate
+
+        aggregate = [0, None, None, None]
+        groups[key] = aggregate
+        return aggregate
+
+    def __spill(self):
+        """
+            Writes the groups held in memory into one file per partition and clears them from memory.
+        """
+        buckets = {}
+        for key, aggregate in compat.iteritems(self.__groups):
+            buckets.setdefault(self.__partition(key), {})[key] = aggregate
+
+        for partition, groups in compat.iteritems(buckets):
+            fd, path = tempfile.mkstemp(prefix='glyphs-', suffix='.spill', dir=self.__spill_directory)
+            with os.fdopen(fd, 'wb') as f:
+                pickle.dump(groups, f, pickle.HIGHEST_PROTOCOL)
+            self.__spill_files[partition].append(path)
+
+        self.__groups = {}
+
+    def __partition(self, key):
+        """
+            Returns the partition of the given L{key}, stable across processes.
+
+            @rtype: int
+        """
+        return GlyphAggregator.__stable_hash(key) % self.__partitions
+
+    @staticmethod
+    def __stable_hash(key):
+        """
+            Returns the hash of the given L{key}, equal for equal keys (e.g. C{1}, C{1.0} and C{True}) and stable
+            across processes (the hash of the strings is salted per process).
+
+            @rtype: int
+        """
+        if isinstance(key, numbers.Number):
+            return hash(key)  # not salted, and equal for equal numbers of any type
+        if isinstance(key, compat.text_type):
+            return zlib.crc32(key.encode('utf-8'))
+        if isinstance(key, bytes):
+            return zlib.crc32(key)
+        if isinstance(key, tuple):
+            return zlib.crc32(repr(tuple(GlyphAggregator.__stable_hash(k) for k in key)).encode('utf-8'))
+        if isinstance(key, frozenset):
+            return sum(GlyphAggregator.__stable_hash(k) for k in key)
+        return zlib.crc32(repr(key).encode('utf-8'))
+
+    @staticmethod
+    def __load(path):
+        """
+            Returns the groups spilled in the file at the given L{path}.
+
+            @rtype: dict
+        """
+        with open(path, 'rb') as f:
+            return pickle.load(f)
+
+    @staticmethod
+    def __combine(aggregate, other_aggregate):
+        """
+            Combines the running aggregates L{other_aggregate} into L{aggregate}.
+        """
+        aggregate[0] += other_aggregate[0]
+
+        if other_aggregate[1] is None:
+            return
+
+        if aggregate[1] is None:
+            aggregate[1:] = other_aggregate[1:]
+            return
+
+        aggregate[1] += other_aggregate[1]
+        if other_aggregate[2] < aggregate[2]:
+            aggregate[2] = other_aggregate[2]
+        if other_aggregate[3] > aggregate[3]:
+            aggregate[3] = other_aggregate[3]
+
+    @staticmethod
+    def __sorted_results(groups):
+        """
+            Returns the list of pairs of key and L{GroupAggregate} of L{groups}, sorted by key.
+
+            @rtype: list
+        """
+        # None first and the overflow group last: only the other keys are compared with each other.
+        return [
+                (key, GroupAggregate(*aggregate))
+                for key, aggregate in sorted(
+                                             compat.iteritems(groups),
+                                             key=lambda item: (
+                                                               0 if item[0] is None else 2 if item[0] is OVERFLOW else 1,
+                                                               item[0],
+                                                               ),
+                                             )
+                ]
+
+    __slots__ = (
+                 '__key_glyph',
+                 '__value_glyph',
+                 '__glyphs',
+                 '__max_groups',
+                 '__spill_directory',
+                 '__overflow_key',
+                 '__partitions',
+                 '__matches',
+                 '__groups',
+                 '__spill_files',
+                 )
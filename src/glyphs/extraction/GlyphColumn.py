@@ -0,0 +1,373 @@
+from __future__ import unicode_literals
+
+import array
+import json
+import mmap
+import pickle
+import struct
+import sys
+
+from glyphs.helpers import compat
+from glyphs.helpers.FileUtils import FileUtils
+from glyphs.helpers.ImmutableObject import ImmutableObject
+
+
+_HEADER = struct.Struct(str('<8sII'))
+""" Header of a column file: magic, format and size of the description (JSON) following it."""
+
+_MAGIC = b'GLYPHCOL'
+
+_ALIGNMENT = 8
+""" Alignment of the sections of a column file, so they can be viewed as arrays of any type."""
+
+try:
+    array.array(str('q'))
+    _INT64 = str('q')
+except ValueError:  # Python 2
+    _INT64 = str('l')
+
+
+class GlyphColumn(ImmutableObject):
+    """
+        Values read with a glyph out of a sequence of sources, stored in a column file and memory mapped back.
+
+        Each source has a state in the L{mask<GlyphColumn.mask>}: L{valid<GlyphColumn.VALID>} (a value was read),
+        L{null<GlyphColumn.NULL>} (C{None} was read) or L{missing<GlyphColumn.MISSING>} (the glyph could not be
+        read, i.e. L{DictUtils.get<glyphs.utils.DictUtils.DictUtils.get>} raised a C{KeyError}).
+
+        The values are stored according to their L{kind<GlyphColumn.kind>}: booleans, integers (64 bits) and
+        floats as arrays, texts as their UTF-8 encoded bytes with the array of their offsets and anything else
+        pickled. Arrays and bytes are viewed straight from the memory map, without copying, on Python 3.
+    """
+
+    MISSING = 0
+    """ State of a source the glyph could not be read from."""
+
+    VALID = 1
+    """ State of a source a value was read from."""
+
+    NULL = 2
+    """ State of a source C{None} was read from."""
+
+    BOOL = 'bool'
+    """ Kind of a column of booleans, stored as an array of bytes."""
+
+    INT = 'int'
+    """ Kind of a column of integers, stored as an array of 64 bits integers."""
+
+    FLOAT = 'float'
+    """ Kind of a column of floats, stored as an array of doubles."""
+
+    TEXT = 'text'
+    """ Kind of a column of texts, stored as their UTF-8 encoded bytes and the array of their offsets."""
+
+    PICKLE = 'pickle'
+    """ Kind of a column of any other values, stored pickled (loaded in memory when opened)."""
+
+    FORMAT = 1
+    """ Format of the column files. A column file of another format is not opened."""
+
+    __TYPECODES = {BOOL: str('b'), INT: _INT64, FLOAT: str('d')}
+
+    def __init__(self, glyph, kind, mask, data, offsets, memory_map=None, views=tuple()):
+        """
+            Initializer for a column. Use L{GlyphColumn.open} rather than this.
+
+            @param glyph: the glyph the values were read with.
+            @type glyph: glyphs.ro.ROGlyph.ROGlyph
+            @param kind: the kind of the column.
+            @type kind: six.text_type
+            @param mask: the state of each source.
+            @param data: the values (an array, the encoded texts or the list of the values, depending on the kind).
+            @param offsets: the offsets of the encoded texts (C{None} for the other kinds).
+            @param memory_map: (Optional) the memory map of the column file, closed by L{GlyphColumn.close}.
+            @type memory_map: mmap.mmap
+            @param views: the views of L{memory_map} released before closing it, in the order they were created.
+            @type views: tuple
+        """
+        self.__dict__["__glyph"] = glyph
+        self.__dict__["__kind"] = kind
+        self.__dict__["__mask"] = mask
+        self.__dict__["__data"] = data
+        self.__dict__["__offsets"] = offsets
+        self.__dict__["__memory_map"] = memory_map
+        self.__dict__["__views"] = views
+
+    @staticmethod
+    def write(path, values, mask):
+        """
+            Writes (atomically) the column file of the given L{values} and L{mask} at L{path}.
+
+            @param values: the value read out of each source (ignored for the sources not L{valid
+            <GlyphColumn.VALID>}).
+            @type values: collections.abc.Sequence
+            @param mask: the state of each source.
+            @type mask: collections.abc.Sequence
+
+            @precondition: len(values) == len(mask)
+        """
+        assert len(values) == len(mask)
+
+        valid = GlyphColumn.VALID
+        kind = GlyphColumn.__kind(v for v, m in compat.zip(values, mask) if m == valid)
+        sections = [bytes(bytearray(mask))]
+
+        if kind == GlyphColumn.TEXT:
+            encoded = [v.encode('utf-8') if m == valid else b'' for v, m in compat.zip(values, mask)]
+            offsets = array.array(_INT64, [0])
+            for e in encoded:
+                offsets.append(offsets[-1] + len(e))
+            sections.append(b''.join(encoded))
+            sections.append(GlyphColumn.__to_bytes(offsets))
+        elif kind == GlyphColumn.PICKLE:
+            sections.append(pickle.dumps(
+                                         [v if m == valid else None for v, m in compat.zip(values, mask)],
+                                         pickle.HIGHEST_PROTOCOL,
+                                         ))
+        else:
+            sections.append(GlyphColumn.__to_bytes(array.array(
+                                                               GlyphColumn.__TYPECODES[kind],
+                                                               (v if m == valid else 0 for v, m in compat.zip(values, mask)),
+                                                               )))
+
+        # the offsets depend on the size of the description holding them: reserved generously.
+        position = GlyphColumn.__align(_HEADER.size + 64 * (len(sections) + 4))
+        layout = []
+        for section in sections:
+            layout.append((position, len(section),))
+            position = GlyphColumn.__align(position + len(section))
+
+        description = json.dumps({
+                                  'kind': kind,
+                                  'count': len(mask),
+                                  'byteorder': sys.byteorder,
+                                  'sections': layout,
+                                  }).encode('utf-8')
+        assert _HEADER.size + len(description) <= layout[0][0]
+
+        def write(f):
+            f.write(_HEADER.pack(_MAGIC, GlyphColumn.FORMAT, len(description)))
+            f.write(description)
+            for (offset, _), section in compat.zip(layout, sections):
+                f.write(b'\0' * (offset - f.tell()))
+                f.write(section)
+
+        FileUtils.write_atomically(path, write)
+
+    @staticmethod
+    def open(path, glyph):
+        """
+            Returns the column of the column file at L{path}, memory mapped, if it exists and can be read on this
+            platform. Otherwise (e.g. a truncated or corrupted file), returns C{None}.
+
+            The memory map is released by L{GlyphColumn.close}.
+
+            @param glyph: the glyph the values were read with.
+            @type glyph: glyphs.ro.ROGlyph.ROGlyph
+
+            @rtype: GlyphColumn
+        """
+        try:
+            with open(path, 'rb') as f:
+                m = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (IOError, OSError, ValueError,):  # missing or empty
+            return None
+
+        views = []
+        try:
+            magic, column_format, size = _HEADER.unpack_from(m, 0)
+            if magic != _MAGIC or column_format != GlyphColumn.FORMAT:
+                raise ValueError('not a column file')
+
+            description = json.loads(m[_HEADER.size:_HEADER.size + size].decode('utf-8'))
+            kind = description['kind']
+            if description['byteorder'] != sys.byteorder:
+                raise ValueError('column file of another platform')
+            if len(description['sections']) != (3 if kind == GlyphColumn.TEXT else 2):
+                raise ValueError('corrupted column file')
+
+            view = compat.byte_view(m)
+            views.append(view)
+            sections = []
+            for offset, length in description['sections']:
+                if not 0 <= offset <= offset + length <= len(m):
+                    raise ValueError('truncated column file')
+                sections.append(view[offset:offset + length])
+                views.append(sections[-1])
+
+            offsets = None
+            if kind == GlyphColumn.TEXT:
+                data = sections[1]
+                offsets = compat.typed_view(sections[2], _INT64)
+                views.append(offsets)
+            elif kind == GlyphColumn.PICKLE:
+                try:
+                    data = pickle.loads(bytes(sections[1]))
+                except Exception as e:  # a corrupted pickle can fail in about any way
+                    raise ValueError('corrupted column file: {!r}'.format(e))
+            else:
+                data = compat.typed_view(sections[1], GlyphColumn.__TYPECODES[kind])
+                views.append(data)
+
+            count = description['count']
+            if offsets is not None:
+                if len(offsets) != count + 1 or offsets[-1] > len(data):
+                    raise ValueError('corrupted column file')
+            elif len(data) != count:
+                raise ValueError('corrupted column file')
+            if len(sections[0]) != count:
+                raise ValueError('corrupted column file')
+        except (struct.error, ValueError, KeyError, IndexError, TypeError,):
+            GlyphColumn.__release(m, views)
+            return None
+
+        return GlyphColumn(glyph, kind, sections[0], data, offsets, m, tuple(views))
+
+    def close(self):
+        """
+            Releases the memory map of the column, if any. The column cannot be read afterwards.
+        """
+        GlyphColumn.__release(self.__dict__["__memory_map"], self.__dict__["__views"])
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    @property
+    def glyph(self):
+        """
+            Returns the glyph the values were read with.
+
+            @rtype: glyphs.ro.ROGlyph.ROGlyph
+        """
+        return self.__dict__["__glyph"]
+
+    @property
+    def kind(self):
+        """
+            Returns the kind of the column (e.g. L{GlyphColumn.INT}).
+
+            @rtype: six.text_type
+        """
+        return self.__dict__["__kind"]
+
+    @property
+    def mask(self):
+        """
+            Returns the state (e.g. L{GlyphColumn.VALID}) of each source, as a sequence of bytes.
+
+            @rtype: collections.abc.Sequence
+        """
+        return self.__dict__["__mask"]
+
+    @property
+    def data(self):
+        """
+            Returns the raw values: the array of the values for the booleans, integers and floats (0 for the
+            sources not L{valid<GlyphColumn.VALID>}), the UTF-8 encoded bytes of the texts and the list of the
+            values for the pickled columns.
+
+            @rtype: collections.abc.Sequence
+        """
+        return self.__dict__["__data"]
+
+    def __len__(self):
+        """
+            Returns the number of sources.
+
+            @rtype: int
+        """
+        return len(self.__dict__["__mask"])
+
+    def __getitem__(self, index):
+        """
+            Returns the value read out of the source at L{index}, C{None} if the source is not L{valid
+            <GlyphColumn.VALID>}.
+
+            @type index: int
+
+            @raise IndexError: if there is no source at L{index}.
+        """
+        if self.__dict__["__mask"][index] != GlyphColumn.VALID:
+            return None
+
+        kind = self.__dict__["__kind"]
+        data = self.__dict__["__data"]
+
+        if kind == GlyphColumn.TEXT:
+            offsets = self.__dict__["__offsets"]
+            index = index % len(self)
+            return bytes(data[offsets[index]:offsets[index + 1]]).decode('utf-8')
+        if kind == GlyphColumn.BOOL:
+            return bool(data[index])
+        return data[index]
+
+    def __iter__(self):
+        """
+            Returns a new iterator through the values read out of each source (see L{GlyphColumn.__getitem__}).
+
+            @rtype: collections.abc.Iterator
+        """
+        for index in compat.range(len(self)):
+            yield self[index]
+
+    @staticmethod
+    def __release(memory_map, views):
+        """
+            Releases the given L{views} (in reverse order) and closes the given L{memory_map} (if not C{None}).
+        """
+        for view in reversed(views):
+            release = getattr(view, 'release', None)  # copies on Python 2
+            if release is not None:
+                release()
+
+        if memory_map is not None:
+            memory_map.close()
+
+    @staticmethod
+    def __kind(values):
+        """
+            Returns the kind of column holding the given (valid) L{values}.
+
+            @rtype: six.text_type
+        """
+        kinds = set()
+
+        for v in values:
+            t = type(v)
+            if t is bool:
+                kinds.add(GlyphColumn.BOOL)
+            elif isinstance(v, compat.integer_types) and t is not bool and -2 ** 63 <= v < 2 ** 63:
+                kinds.add(GlyphColumn.INT)
+            elif t is float:
+                kinds.add(GlyphColumn.FLOAT)
+            elif t is compat.text_type:
+                kinds.add(GlyphColumn.TEXT)
+            else:
+                return GlyphColumn.PICKLE
+
+            if len(kinds) > 1:
+                return GlyphColumn.PICKLE
+
+        return kinds.pop() if kinds else GlyphColumn.INT
+
+    @staticmethod
+    def __align(position):
+        """
+            Returns the first aligned position from L{position}.
+
+            @rtype: int
+        """
+        return (position + _ALIGNMENT - 1) // _ALIGNMENT * _ALIGNMENT
+
+    @staticmethod
+    def __to_bytes(values):
+        """
+            Returns the bytes of the given array of L{values}.
+
+            @rtype: bytes
+        """
+        to_bytes = getattr(values, 'tobytes', None) or values.tostring  # Python 2: tostring only
+        return to_bytes()
@@ -0,0 +1,251 @@
+from __future__ import unicode_literals
+
+from collections import OrderedDict
+import json
+
+from glyphs.helpers import compat
+from glyphs.ro.ROGlyph import ROGlyph
+from glyphs.utils.DictUtils import DictUtils
+
+
+class GlyphTracer(object):
+    """
+        Sampled tracing of the reads of glyphs, attributing their latency to each level of their path.
+
+        While the tracer is L{started<GlyphTracer.start>}, one call to L{DictUtils.get<glyphs.utils.DictUtils.
+        DictUtils.get>} in L{sample_rate<GlyphTracer.sample_rate>}, wherever it comes from (extraction, predicates,
+        aggregators...), is traced: the time spent on each step of the read is added to the histograms of the
+        glyph:
+            - C{<path>}: the lookup of a level of the path (e.g. C{fields>status}), including the cost of the
+            C{Mapping} of that level (e.g. a lazy mapping loading from a database).
+            - C{<path> [<key>]}: the check of the type (discriminator) of a level, including the conversion of the
+            type found to text.
+            - C{(translation)}: the translation function (with the comparisons to the default value).
+            - C{(total)}: the whole read.
+
+        Each time measured includes a read of the clock (tens of nanoseconds): compare the steps with each other
+        rather than with untraced calls.
+
+        Only one tracer is installed at a time, for all threads. With several threads, the counts of a tracer are
+        approximate.
+    """
+
+    FORMAT = 1
+    """ Format of the reports (see L{GlyphTracer.report})."""
+
+    TRANSLATION = '(translation)'
+    """ Name of the step of the translation function."""
+
+    TOTAL = '(total)'
+    """ Name of the step of the whole read."""
+
+    def __init__(self, sample_rate=100):
+        """
+            Initializer for a tracer.
+
+            @param sample_rate: one call in L{sample_rate} is traced (1 to trace all of them).
+            @type sample_rate: int
+
+            @precondition: sample_rate > 0
+        """
+        assert sample_rate > 0
+
+        self.__sample_rate = sample_rate
+        self.clear()
+
+    @property
+    def sample_rate(self):
+        """
+            Returns the number of calls per traced call.
+
+            @rtype: int
+        """
+        return self.__sample_rate
+
+    def clear(self):
+        """
+            Forgets all the calls and histograms.
+        """
+        self.__countdown = 0  # the first call is traced
+        self.__glyphs = {}
+
+    def start(self):
+        """
+            Installs this tracer in L{DictUtils<glyphs.utils.DictUtils.DictUtils>} (see L{DictUtils.set_tracer
+            <glyphs.utils.DictUtils.DictUtils.set_tracer>}), replacing the tracer installed if any.
+
+            @return: this tracer
+            @rtype: GlyphTracer
+        """
+        DictUtils.set_tracer(self)
+        return self
+
+    def stop(self):
+        """
+            Uninstalls this tracer, if it is installed. Its histograms are kept.
+        """
+        previous = DictUtils.set_tracer(None)
+        if previous is not self:
+            DictUtils.set_tracer(previous)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+    def sample(self, glyph):
+        """
+            Counts a call to L{DictUtils.get<glyphs.utils.DictUtils.DictUtils.get>} with the given L{glyph} and
+            returns the list of the times of its steps to fill if the call is traced. Otherwise, returns C{None}.
+
+            @type glyph: ROGlyph
+
+            @rtype: list
+        """
+        traces = self.__glyphs.get(glyph)
+        if traces is None:
+            traces = self.__glyphs[glyph] = GlyphTracer.__new_traces(glyph)
+
+        traces[0] += 1
+
+        if self.__countdown:
+            self.__countdown -= 1
+            return None
+
+        self.__countdown = self.__sample_rate - 1
+        traces[1] += 1
+        return []
+
+    def record(self, glyph, times):
+        """
+            Adds the times of the steps of a traced call with the given L{glyph} to its histograms.
+
+            @type glyph: ROGlyph
+            @param times: the list returned by L{GlyphTracer.sample}, filled by the call.
+            @type times: list
+        """
+        end = compat.clock_ns()
+        traces = self.__glyphs[glyph]
+        add = GlyphTracer.__add
+        steps = traces[3]
+
+        if times[-1] is None:
+            traces[2] += 1
+            times = times[:-1]
+
+        # a call ending early (e.g. on an error) went through the first steps only.
+        for name, begin, finish in compat.zip(traces[4], times, times[1:]):
+            add(steps, name, finish - begin)
+
+        add(steps, GlyphTracer.TOTAL, end - times[0])
+
+    def report(self):
+        """
+            Returns the report of the traced calls, which can be dumped as JSON (see L{GlyphTracer.dumps}):
+                - C{format}, C{sample_rate}: what produced the report.
+                - C{glyphs}: per glyph (keyed by its representation), its number of C{calls}, of C{sampled} calls
+                and of sampled calls raising an error (C{errors}) and its C{steps} (in the order of the read, the
+                total last).
+
+            Each step has its name (C{step}), its number of traced calls (C{count}), the sum (C{total_ns}), mean
+            (C{mean_ns}) and maximum (C{max_ns}) of its times and their histogram (C{buckets}): per power of 2
+            (as text), the number of times under that number of nanoseconds and not under the previous one.
+
+            @rtype: dict
+        """
+        glyphs_report = {}
+
+        for glyph, (calls, sampled, errors, steps, _) in compat.iteritems(self.__glyphs):
+            key = repr(glyph)
+            suffix = 1
+            while key in glyphs_report:
+                suffix += 1
+                key = '{}#{}'.format(repr(glyph), suffix)
+
+            glyphs_report[key] = {
+                                  'calls': calls,
+                                  'sampled': sampled,
+                                  'errors': errors,
+                                  'steps': [
+                                            {
+                                             'step': name,
+                                             'count': count,
+                                             'total_ns': total,
+                                             'mean_ns': total // count,
+                                             'max_ns': maximum,
+                                             'buckets': dict(
+                                                             (compat.text_type(2 ** b), n)
+                                                             for b, n in enumerate(buckets)
+                                                             if n
+                                                             ),
+                                             }
+                                            for name, (count, total, maximum, buckets) in (
+                                                (step, statistics) for step, statistics in compat.iteritems(steps)
+                                                if statistics is not None  # not reached yet
+                                                )
+                                            ],
+                                  }
+
+        return {
+                'format': GlyphTracer.FORMAT,
+                'sample_rate': self.__sample_rate,
+                'glyphs': glyphs_report,
+                }
+
+    def dumps(self):
+        """
+            Returns the JSON of the L{report<GlyphTracer.report>} of this tracer.
+
+            @rtype: six.text_type
+        """
+        return json.dumps(self.report(), indent=2, sort_keys=True)
+
+    @staticmethod
+    def __new_traces(glyph):
+        """
+            Returns the traces of the given L{glyph}: the numbers of calls, of sampled calls and of errors, the
+            statistics of the steps by name (in the order of the read) and the names of the steps timed by
+            L{DictUtils.get<glyphs.utils.DictUtils.DictUtils.get>}, in order.
+
+            @rtype: list
+        """
+        names = []
+        path = []
+
+        for _, sub_path, source_type in glyph.iter_r_path_type:
+            path.append(sub_path)
+            name = ROGlyph.NAME_SPACE_SEPARATOR.join(path)
+            if source_type is not None:
+                names.append('{} [{}]'.format(name, source_type[0]))
+            names.append(name)
+
+        if glyph.r_translation_function:
+            names.append(GlyphTracer.TRANSLATION)
+
+        # steps are listed in the order of the read, even when a call stops before the end of the path.
+        steps = OrderedDict((name, None) for name in names)
+        steps[GlyphTracer.TOTAL] = None
+
+        return [0, 0, 0, steps, tuple(names)]
+
+    @staticmethod
+    def __add(steps, name, elapsed):
+        """
+            Adds the time L{elapsed} (in nanoseconds) to the statistics of the step L{name}.
+        """
+        statistics = steps.get(name)
+        if statistics is None:
+            statistics = steps[name] = [0, 0, 0, [0] * 64]
+
+        statistics[0] += 1
+        statistics[1] += elapsed
+        if elapsed > statistics[2]:
+            statistics[2] = elapsed
+        statistics[3][min(elapsed.bit_length(), 63)] += 1
+
+    __slots__ = (
+                 '__sample_rate',
+                 '__countdown',
+                 '__glyphs',
+                 )
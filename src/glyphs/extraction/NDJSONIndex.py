@@ -0,0 +1,405 @@
+from __future__ import unicode_literals
+
+import array
+import bisect
+from collections import namedtuple
+import json
+import mmap
+import multiprocessing
+import struct
+import sys
+
+from glyphs.helpers import compat
+from glyphs.helpers.FileUtils import FileUtils
+from glyphs.helpers.ImmutableObject import ImmutableObject
+from glyphs.utils.ExtractionUtils import ExtractionUtils
+
+
+ExtractedChunk = namedtuple("ExtractedChunk", ["start", "stop", "values"])
+"""
+    Values extracted from a range of records: the index of the first record, the index following the last record
+    and the list of the tuples of values (one per record matching, in order).
+"""
+
+_HEADER = struct.Struct(str('<8sIQQQ'))
+""" Header of an index file: magic, format, size and modification time (ns) of the data file, number of records."""
+
+_MAGIC = b'GLYPHIDX'
+
+_BLANKS = frozenset(b' \t\r\n')
+""" Bytes a blank line can be made of."""
+
+try:
+    array.array(str('Q'))
+    _TYPECODE = str('Q')
+except ValueError:  # Python 2
+    _TYPECODE = str('L')
+
+
+class NDJSONIndex(ImmutableObject):
+    """
+        Index of the byte offsets of the records of a NDJSON file (one JSON document per line), persisted in a
+        sidecar file next to it.
+
+        The index is built once, by scanning the file through a memory map, then loaded as long as the file is not
+        modified. It gives random access to the records and splits the file into ranges of records of about the
+        same size in bytes, which can be extracted in parallel processes and resumed from any record. Blank lines
+        are not records.
+    """
+
+    INDEX_SUFFIX = '.idx'
+    """ Suffix added to the path of the data file to get the path of its index file, by default."""
+
+    INDEX_FORMAT = 1
+    """ Format of the index files. An index file of another format is rebuilt."""
+
+    def __init__(self, path, offsets, size, mtime):
+        """
+            Initializer for an index. Use L{NDJSONIndex.open} or L{NDJSONIndex.build} rather than this.
+
+            @param path: the path of the data file.
+            @type path: six.text_type
+            @param offsets: the offsets of the records, followed by the offset of the end of the last record.
+            @type offsets: array.array
+            @param size: the size of the data file, when indexed.
+            @type size: int
+            @param mtime: the modification time (in nanoseconds) of the data file, when indexed.
+            @type mtime: int
+
+            @precondition: len(offsets) > 0
+        """
+        assert len(offsets) > 0
+
+        self.__dict__["__path"] = path
+        self.__dict__["__offsets"] = offsets
+        self.__dict__["__size"] = size
+        self.__dict__["__mtime"] = mtime
+
+    @staticmethod
+    def open(path, index_path=None):
+        """
+            Returns the index of the NDJSON file at L{path}, loaded from its index file. If the index file is
+            missing, stale (the data file was modified since) or unreadable, the index is built and saved.
+
+            @param index_path: (Optional) the path of the index file. If C{None}, L{path} followed by
+            L{NDJSONIndex.INDEX_SUFFIX}.
+            @type index_path: six.text_type
+
+            @rtype: NDJSONIndex
+
+            @raise IOError: if the data file cannot be read.
+        """
+        if index_path is None:
+            index_path = path + NDJSONIndex.INDEX_SUFFIX
+
+        index = NDJSONIndex.__load(path, index_path)
+        if index is None:
+            index = NDJSONIndex.build(path)
+            index.save(index_path)
+        return index
+
+    @staticmethod
+    def build(path):
+        """
+            Returns the index of the NDJSON file at L{path}, scanning all of it (not saved).
+
+            @rtype: NDJSONIndex
+
+            @raise IOError: if the data file cannot be read.
+        """
+        offsets = array.array(_TYPECODE)
+
+        with open(path, 'rb') as f:
+            size, mtime = FileUtils.stat(path)  # before scanning: a later change makes the index stale
+
+            if size:
+                m = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                try:
+                    NDJSONIndex.__scan(m, size, offsets)
+                finally:
+                    m.close()
+
+        offsets.append(size)
+        return NDJSONIndex(path, offsets, size, mtime)
+
+    def save(self, index_path=None):
+        """
+            Writes (atomically) the index into its index file.
+
+            @param index_path: (Optional) see L{NDJSONIndex.open}.
+            @type index_path: six.text_type
+
+            @raise IOError: if the data file was modified since the index was built or if the index file cannot be
+            written.
+        """
+        path = self.__dict__["__path"]
+        offsets = self.__dict__["__offsets"]
+
+        if index_path is None:
+            index_path = path + NDJSONIndex.INDEX_SUFFIX
+
+        size, mtime = FileUtils.stat(path)
+        if (size, mtime,) != (self.__dict__["__size"], self.__dict__["__mtime"],):
+            raise IOError('{} was modified since it was indexed'.format(path))
+
+        if sys.byteorder != 'little':
+            offsets = array.array(_TYPECODE, offsets)
+            offsets.byteswap()
+
+        header = _HEADER.pack(_MAGIC, NDJSONIndex.INDEX_FORMAT, size, mtime, len(offsets) - 1)
+
+        def write(f):
+            f.write(header)
+            offsets.tofile(f)
+
+        FileUtils.write_atomically(index_path, write)
+
+    @property
+    def path(self):
+        """
+            Returns the path of the data file.
+
+            @rtype: six.text_type
+        """
+        return self.__dict__["__path"]
+
+    def __len__(self):
+        """
+            Returns the number of records.
+
+            @rtype: int
+        """
+        return len(self.__dict__["__offsets"]) - 1
+
+    def byte_range(self, start=0, stop=None):
+        """
+            Returns the pair of the offset of the record at L{start} and of the offset following the record before
+            L{stop}.
+
+            @param stop: (Optional) the index following the last record. If C{None}, the number of records.
+            @type stop: int
+
+            @rtype: tuple
+
+            @precondition: 0 <= start <= (len(self) if stop is None else stop) <= len(self)
+        """
+        offsets = self.__dict__["__offsets"]
+        stop = len(offsets) - 1 if stop is None else stop
+        assert 0 <= start <= stop <= len(offsets) - 1
+
+        return offsets[start], offsets[stop]
+
+    def split(self, parts, start=0, stop=None):
+        """
+            Returns the ranges (pairs of start and stop) of records splitting the given range of records into at
+            most L{parts} ranges of about the same size in bytes. Empty ranges are left out.
+
+            @type parts: int
+            @param stop: (Optional) see L{NDJSONIndex.byte_range}.
+            @type stop: int
+
+            @rtype: tuple
+
+            @precondition: parts > 0
+        """
+        assert parts > 0
+
+        offsets = self.__dict__["__offsets"]
+        stop = len(offsets) - 1 if stop is None else stop
+        begin, end = self.byte_range(start, stop)
+        ranges = []
+
+        for part in compat.range(1, parts + 1):
+            # first record starting at or after the target offset of the end of the part.
+            target = begin + (end - begin) * part // parts
+            bound = stop if part == parts else min(max(bisect.bisect_left(offsets, target, start, stop), start), stop)
+            if bound > start:
+                ranges.append((start, bound,))
+                start = bound
+
+        return tuple(ranges)
+
+    def iter_records(self, start=0, stop=None, loads=json.loads):
+        """
+            Returns a new iterator through the records of the given range, decoded with L{loads}.
+
+            @param stop: (Optional) see L{NDJSONIndex.byte_range}.
+            @type stop: int
+            @param loads: the function decoding the bytes of a record.
+            @type loads: collections.abc.Callable
+
+            @rtype: collections.abc.Iterator
+        """
+        begin, end = self.byte_range(start, stop)
+        return _iter_records(self.__dict__["__path"], begin, end, loads)
+
+    def iter_extract(self, glyphs, start=0, stop=None, **kwargs):
+        """
+            Returns a new iterator through the values of the given L{glyphs} read out of the records of the given
+            range (see L{ExtractionUtils.iter_extract<glyphs.utils.ExtractionUtils.ExtractionUtils.iter_extract>},
+            which receives the keyword arguments).
+
+            @type glyphs: collections.abc.Iterable
+            @param stop: (Optional) see L{NDJSONIndex.byte_range}.
+            @type stop: int
+
+            @rtype: collections.abc.Iterator
+        """
+        return ExtractionUtils.iter_extract(self.iter_records(start, stop), glyphs, **kwargs)
+
+    def iter_extract_chunks(self, glyphs, start=0, stop=None, processes=None, chunks=None, predicate=None,
+                            no_default=False, force_none_to_default_value=False):
+        """
+            Returns a new iterator through the L{chunks<ExtractedChunk>} of values of the given L{glyphs} read out
+            of the records of the given range, extracted by a pool of processes.
+
+            The range is split into L{chunks} of about the same size in bytes. Each process reads its chunks
+            straight from the data file, so only the glyphs and the values extracted go through the pool. The
+            chunks are iterated in order: after a failure, the extraction is resumed by passing the stop of the
+            last chunk processed as L{start}.
+
+            The glyphs (hence their translation functions) and the L{predicate} must be picklable.
+
+            @type glyphs: collections.abc.Iterable
+            @param stop: (Optional) see L{NDJSONIndex.byte_range}.
+            @type stop: int
+            @param processes: (Optional) the number of processes. If C{None}, the number of CPUs. If 1, the
+            chunks are extracted in the current process.
+            @type processes: int
+            @param chunks: (Optional) the number of chunks. If C{None}, 4 per process so that the processes stay
+            busy until the end.
+            @type chunks: int
+            @param predicate: see L{ExtractionUtils.iter_extract<glyphs.utils.ExtractionUtils.ExtractionUtils.
+            iter_extract>}.
+            @type predicate: tuple
+            @param no_default: see L{ExtractionUtils.iter_extract<glyphs.utils.ExtractionUtils.ExtractionUtils.
+            iter_extract>}.
+            @type no_default: bool
+            @param force_none_to_default_value: see L{ExtractionUtils.iter_extract<glyphs.utils.ExtractionUtils.
+            ExtractionUtils.iter_extract>}.
+            @type force_none_to_default_value: bool
+
+            @rtype: collections.abc.Iterator
+
+            @raise KeyError: see L{DictUtils.get<glyphs.utils.DictUtils.DictUtils.get>}
+            @raise TypeError: see L{DictUtils.get<glyphs.utils.DictUtils.DictUtils.get>}
+
+            @precondition: processes is None or processes > 0
+            @precondition: chunks is None or chunks > 0
+        """
+        assert processes is None or processes > 0
+        assert chunks is None or chunks > 0
+
+        if processes is None:
+            processes = multiprocessing.cpu_count()
+
+        glyphs = tuple(glyphs)
+        path = self.__dict__["__path"]
+        tasks = tuple(
+                      (path, self.byte_range(s, e), s, e, glyphs, predicate, no_default, force_none_to_default_value,)
+                      for s, e in self.split(processes * 4 if chunks is None else chunks, start, stop)
+                      )
+
+        if processes == 1 or len(tasks) <= 1:
+            for task in tasks:
+                yield _extract_chunk(task)
+            return
+
+        pool = multiprocessing.Pool(min(processes, len(tasks)))
+        try:
+            for chunk in pool.imap(_extract_chunk, tasks):
+                yield chunk
+            pool.close()
+        finally:
+            pool.terminate()
+            pool.join()
+
+    @staticmethod
+    def __load(path, index_path):
+        """
+            Returns the index of the data file at L{path} read from the index file at L{index_path} if it exists
+            and is up to date. Otherwise, returns C{None}.
+
+            @rtype: NDJSONIndex
+        """
+        try:
+            size, mtime = FileUtils.stat(path)
+
+            with open(index_path, 'rb') as f:
+                magic, index_format, indexed_size, indexed_mtime, count = _HEADER.unpack(f.read(_HEADER.size))
+                if (magic, index_format, indexed_size, indexed_mtime,) != (_MAGIC, NDJSONIndex.INDEX_FORMAT, size, mtime,):
+                    return None
+
+                offsets = array.array(_TYPECODE)
+                offsets.fromfile(f, count + 1)
+        except (IOError, OSError, EOFError, struct.error,):
+            # missing, stale or unreadable: rebuilt.
+            return None
+
+        if sys.byteorder != 'little':
+            offsets.byteswap()
+
+        return NDJSONIndex(path, offsets, size, mtime)
+
+    @staticmethod
+    def __scan(m, size, offsets):
+        """
+            Appends to L{offsets} the offsets of the records of the memory mapped data file L{m}.
+        """
+        find = m.find
+        append = offsets.append
+        blanks = _BLANKS
+        start = 0
+
+        while start < size:
+            end = find(b'\n', start)
+            if end < 0:
+                end = size
+
+            # a line starting with a blank is rare enough to be checked fully.
+            if end > start and (m[start] not in blanks or not m[start:end].isspace()):
+                append(start)
+
+            start = end + 1
+
+
+def _iter_records(path, begin, end, loads):
+    """
+        Returns a new iterator through the records between the offsets L{begin} and L{end} of the data file at
+        L{path}, decoded with L{loads}.
+
+        @rtype: collections.abc.Iterator
+    """
+    if begin == end:
+        return
+
+    with open(path, 'rb') as f:
+        f.seek(begin)
+        remaining = end - begin
+
+        # line by line through the buffer of the file: a range is not read into memory at once.
+        while remaining > 0:
+            line = f.readline(remaining)
+            if not line:
+                return
+            remaining -= len(line)
+
+            if line[-1:] == b'\n':
+                line = line[:-1]
+            if line and not line.isspace():
+                yield loads(line)
+
+
+def _extract_chunk(task):
+    """
+        Returns the L{ExtractedChunk} of the given L{task} of L{NDJSONIndex.iter_extract_chunks} (run by the
+        processes of the pool, hence at the module level).
+
+        @rtype: ExtractedChunk
+    """
+    path, (begin, end), start, stop, glyphs, predicate, no_default, force_none_to_default_value = task
+
+    records = _iter_records(path, begin, end, json.loads)
+    values = list(ExtractionUtils.iter_extract(records, glyphs, predicate, no_default, force_none_to_default_value,))
+
+    return ExtractedChunk(start, stop, values)
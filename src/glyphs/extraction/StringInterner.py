@@ -0,0 +1,193 @@
+from __future__ import unicode_literals
+
+import sys
+import threading
+
+from glyphs.helpers import compat
+
+
+class StringInterner(object):
+    """
+        Per glyph pools of strings, used to share a single string object between all the equal strings read with
+        the same glyph.
+
+        Fields taking a handful of distinct values (statuses, categories, colors...) are held once per distinct
+        value instead of once per source. A glyph reading too many distinct values stops being interned and its
+        pool is released: see L{StringInterner.__init__}.
+
+        An interner can be shared by threads. Strings already pooled are looked up without locking (the statistics
+        are counted per thread), only pooling a new string takes a lock.
+    """
+
+    def __init__(self, max_pool_size=1024, max_distinct_ratio=0.5, warm_up=1000):
+        """
+            Initializer for an interner.
+
+            @param max_pool_size: maximum number of distinct strings pooled per glyph. Interning is disabled for
+            a glyph reading more distinct strings.
+            @type max_pool_size: int
+            @param max_distinct_ratio: cardinality cutoff. Once L{warm_up} strings were read with a glyph,
+            interning is disabled for that glyph if the ratio of distinct strings to strings read is greater.
+            @type max_distinct_ratio: float
+            @param warm_up: number of strings read with a glyph before checking L{max_distinct_ratio}.
+            @type warm_up: int
+
+            @precondition: max_pool_size > 0
+            @precondition: 0 < max_distinct_ratio <= 1
+            @precondition: warm_up > 0
+        """
+        assert max_pool_size > 0
+        assert 0 < max_distinct_ratio <= 1
+        assert warm_up > 0
+
+        self.__max_pool_size = max_pool_size
+        self.__max_distinct_ratio = max_distinct_ratio
+        self.__warm_up = warm_up
+        self.__lock = threading.Lock()
+        self.clear()
+
+    def intern(self, glyph, value):
+        """
+            Returns the pooled string equal to the given L{value} read with L{glyph}, pooling L{value} if there is
+            none. Returns L{value} if it is not a string or if interning is disabled for L{glyph}.
+
+            @type glyph: glyphs.ro.ROGlyph.ROGlyph
+
+            @postcondition: return == value
+        """
+        if not isinstance(value, compat.string_types):
+            return value
+
+        pools = self.__pools
+        pool = pools.get(glyph, pools)  # the pools themselves are used as not-found sentinel
+
+        if pool is None:  # disabled
+            return value
+
+        counters = self.__thread_counters()
+        seen = counters[2]
+        seen[glyph] = seen.get(glyph, 0) + 1
+
+        if pool is not pools:
+            pooled = pool.get(value)
+            if pooled is not None:
+                return self.__hit(counters, value, pooled)
+
+        with self.__lock:
+            pools = self.__pools
+            pool = pools.get(glyph, pools)
+
+            if pool is None:  # disabled meanwhile
+                return value
+
+            if pool is pools:
+                pool = pools[glyph] = {}
+
+            pooled = pool.get(value)  # pooled meanwhile?
+            if pooled is not None:
+                return self.__hit(counters, value, pooled)
+
+            seen = sum(c[2].get(glyph, 0) for c in self.__counters)
+            if (
+                len(pool) >= self.__max_pool_size
+                or (seen >= self.__warm_up and len(pool) > seen * self.__max_distinct_ratio)
+                ):
+                # high cardinality: not worth it.
+                pools[glyph] = None
+                return value
+
+            pool[value] = value
+            return value
+
+    def is_interning(self, glyph):
+        """
+            Returns C{False} if interning was disabled for the given L{glyph}. Otherwise, returns C{True}.
+
+            @type glyph: glyphs.ro.ROGlyph.ROGlyph
+
+            @rtype: bool
+        """
+        return self.__pools.get(glyph, True) is not None
+
+    @property
+    def bytes_saved(self):
+        """
+            Returns the estimated number of bytes saved: the size of all the strings which were replaced by a
+            pooled string (they are freed as long as nothing else references them).
+
+            @rtype: int
+        """
+        return sum(c[1] for c in self.__counters)
+
+    @property
+    def hits(self):
+        """
+            Returns the number of strings which were replaced by a pooled string.
+
+            @rtype: int
+        """
+        return sum(c[0] for c in self.__counters)
+
+    def report(self):
+        """
+            Returns a dictionary describing the state of the pools: the number of bytes saved, of strings
+            replaced and, per glyph, the number of pooled strings (C{None} if interning was disabled).
+
+            @rtype: dict
+        """
+        return {
+                'bytes_saved': self.bytes_saved,
+                'hits': self.hits,
+                'pools': dict(
+                              (glyph, None if pool is None else len(pool))
+                              for glyph, pool in compat.iteritems(dict(self.__pools))
+                              ),
+                }
+
+    def clear(self):
+        """
+            Releases all the pools and resets the statistics.
+        """
+        with self.__lock:
+            self.__pools = {}
+            self.__counters = []
+            self.__local = threading.local()
+
+    def __thread_counters(self):
+        """
+            Returns the counters of the current thread: the number of strings replaced, the number of bytes saved
+            and the number of strings read per glyph.
+
+            @rtype: list
+        """
+        local = self.__local
+        counters = getattr(local, 'counters', None)
+
+        if counters is None:
+            counters = local.counters = [0, 0, {}]
+            with self.__lock:
+                if local is self.__local:  # not cleared meanwhile
+                    self.__counters.append(counters)
+
+        return counters
+
+    @staticmethod
+    def __hit(counters, value, pooled):
+        """
+            Returns L{pooled}, counting L{value} as replaced in the given L{counters} (of the current thread) if it
+            is not the pooled string itself.
+        """
+        if pooled is not value:
+            counters[0] += 1
+            counters[1] += sys.getsizeof(value)
+        return pooled
+
+    __slots__ = (
+                 '__max_pool_size',
+                 '__max_distinct_ratio',
+                 '__warm_up',
+                 '__lock',
+                 '__pools',
+                 '__counters',
+                 '__local',
+                 )
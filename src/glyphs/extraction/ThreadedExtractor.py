@@ -0,0 +1,147 @@
+from __future__ import unicode_literals
+
+from collections import deque
+import itertools
+import multiprocessing
+from multiprocessing.pool import ThreadPool
+
+from glyphs.ro.ROGlyph import ROGlyph
+from glyphs.utils.ExtractionUtils import ExtractionUtils
+
+
+class ThreadedExtractor(object):
+    """
+        Extractor of the values of a set of glyphs out of a stream of sources, by a pool of threads.
+
+        The sources are extracted by chunks, with L{ExtractionUtils.iter_extract<glyphs.utils.ExtractionUtils.
+        ExtractionUtils.iter_extract>}, and the values are iterated in the order of the sources. Threads pay off when
+        the extraction is interleaved with I/O (e.g. translation functions or sources releasing the GIL) and on the
+        interpreters without a GIL.
+
+        Glyphs are immutable and the caches of the package are safe to share between threads, as is a
+        L{StringInterner<glyphs.extraction.StringInterner.StringInterner>}. Mutable helpers such as
+        L{GlyphAggregator<glyphs.extraction.GlyphAggregator.GlyphAggregator>} are not: use one per thread and
+        merge them.
+    """
+
+    def __init__(self, glyphs, threads=None, chunk_size=256, predicate=None, no_default=False,
+                 force_none_to_default_value=False, interner=None):
+        """
+            Initializer for an extractor. Its pool of threads is started right away and stopped by
+            L{ThreadedExtractor.close}.
+
+            @type glyphs: collections.abc.Iterable
+            @param threads: (Optional) the number of threads. If C{None}, the number of CPUs.
+            @type threads: int
+            @param chunk_size: the number of sources extracted at once by a thread.
+            @type chunk_size: int
+            @param predicate: see L{ExtractionUtils.iter_extract<glyphs.utils.ExtractionUtils.ExtractionUtils.
+            iter_extract>}.
+            @type predicate: tuple
+            @param no_default: see L{ExtractionUtils.iter_extract<glyphs.utils.ExtractionUtils.ExtractionUtils.
+            iter_extract>}.
+            @type no_default: bool
+            @param force_none_to_default_value: see L{ExtractionUtils.iter_extract<glyphs.utils.ExtractionUtils.
+            ExtractionUtils.iter_extract>}.
+            @type force_none_to_default_value: bool
+            @param interner: see L{ExtractionUtils.iter_extract<glyphs.utils.ExtractionUtils.ExtractionUtils.
+            iter_extract>}.
+            @type interner: glyphs.extraction.StringInterner.StringInterner
+
+            @precondition: all(isinstance(g, ROGlyph) for g in glyphs)
+            @precondition: threads is None or threads > 0
+            @precondition: chunk_size > 0
+        """
+        glyphs = tuple(glyphs)
+        assert all(isinstance(g, ROGlyph) for g in glyphs)
+        assert threads is None or threads > 0
+        assert chunk_size > 0
+
+        self.__glyphs = glyphs
+        self.__chunk_size = chunk_size
+        self.__predicate = predicate
+        self.__no_default = no_default
+        self.__force_none_to_default_value = force_none_to_default_value
+        self.__interner = interner
+        self.__threads = multiprocessing.cpu_count() if threads is None else threads
+        self.__pool = ThreadPool(self.__threads)
+
+    @property
+    def threads(self):
+        """
+            Returns the number of threads of the pool.
+
+            @rtype: int
+        """
+        return self.__threads
+
+    def iter_extract(self, sources):
+        """
+            Returns a new iterator through the values of the glyphs read out of each source of L{sources}, as one
+            tuple per source (in the order of the glyphs), in the order of L{sources}.
+
+            L{sources} is consumed as the values are iterated: at most 2 chunks per thread are in flight.
+
+            @type sources: collections.abc.Iterable
+
+            @rtype: collections.abc.Iterator
+
+            @raise KeyError: see L{DictUtils.get<glyphs.utils.DictUtils.DictUtils.get>}
+            @raise TypeError: see L{DictUtils.get<glyphs.utils.DictUtils.DictUtils.get>}
+        """
+        sources = iter(sources)
+        chunk_size = self.__chunk_size
+        window = 2 * self.__threads
+        apply_async = self.__pool.apply_async
+        pending = deque()
+
+        while True:
+            chunk = list(itertools.islice(sources, chunk_size))
+            if chunk:
+                pending.append(apply_async(self.__extract, (chunk,)))
+
+            if pending and (not chunk or len(pending) >= window):
+                for values in pending.popleft().get():
+                    yield values
+            elif not chunk:
+                return
+
+    def close(self):
+        """
+            Stops the pool of threads, once the chunks in flight are extracted.
+        """
+        self.__pool.close()
+        self.__pool.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def __extract(self, chunk):
+        """
+            Returns the list of the values of the glyphs read out of each source of the given L{chunk} (run by the
+            threads of the pool).
+
+            @rtype: list
+        """
+        return list(ExtractionUtils.iter_extract(
+                                                 chunk,
+                                                 self.__glyphs,
+                                                 self.__predicate,
+                                                 self.__no_default,
+                                                 self.__force_none_to_default_value,
+                                                 self.__interner,
+                                                 ))
+
+    __slots__ = (
+                 '__glyphs',
+                 '__chunk_size',
+                 '__predicate',
+                 '__no_default',
+                 '__force_none_to_default_value',
+                 '__interner',
+                 '__pool',
+                 '__threads',
+                 )
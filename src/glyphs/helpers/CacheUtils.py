@@ -0,0 +1,61 @@
+from __future__ import unicode_literals
+
+import itertools
+
+from glyphs.helpers import compat
+from glyphs.helpers.ImmutableType import ImmutableType
+
+
+class CacheUtils(compat.with_metaclass(ImmutableType)):
+    """
+        Utility methods for the bounded caches of the package, plain dictionaries evicting their least recently used
+        entries when full.
+
+        Each value is cached along with the stamp of its last use (C{[value, stamp]}). The caches are shared by all
+        threads without a lock: each lookup, stamp and insertion is atomic on its own, and an entry evicted or cached
+        twice by racing threads is, at worst, computed again. Unlike clearing a full cache, a miss on a full cache
+        evicts only its least recently used quarter (a quarter at once, so that the entries are sorted once every so
+        many misses), so the values in use by the other threads stay cached.
+    """
+
+    __slots__ = tuple()
+
+    STAMPS = itertools.count()
+    """ Stamps of the uses of the cached values, increasing, shared by all caches."""
+
+    @staticmethod
+    def get(cache, key):
+        """
+            Returns the value cached for the given L{key} in the given L{cache}, stamped as used, or C{None} if none
+            is.
+
+            @type cache: dict
+        """
+        entry = cache.get(key)
+
+        if entry is None:
+            return None
+
+        entry[1] = next(CacheUtils.STAMPS)
+        return entry[0]
+
+    @staticmethod
+    def put(cache, key, value, size):
+        """
+            Caches the given L{value} for the given L{key} in the given L{cache}, first evicting its least recently
+            used quarter if it holds L{size} entries already. Returns L{value}.
+
+            @type cache: dict
+            @param size: the maximum number of entries of the cache.
+            @type size: int
+        """
+        assert value is not None
+
+        if len(cache) >= size and key not in cache:
+            # a copy first (sorted copies the items at once): other threads may change the cache meanwhile.
+            entries = sorted(cache.items(), key=lambda e: e[1][1])
+            for oldest, _ in entries[:max(len(entries) // 4, 1)]:
+                cache.pop(oldest, None)
+
+        cache[key] = [value, next(CacheUtils.STAMPS)]
+        return value
@@ -0,0 +1,52 @@
+from __future__ import unicode_literals
+
+import os
+import tempfile
+
+from glyphs.helpers import compat
+from glyphs.helpers.ImmutableType import ImmutableType
+
+
+class FileUtils(compat.with_metaclass(ImmutableType)):
+    """
+        Utility methods for the files written and read back by the package (indexes, caches and artifacts).
+    """
+
+    @staticmethod
+    def stat(path):
+        """
+            Returns the pair of the size and of the modification time (in nanoseconds) of the file at L{path}.
+
+            @rtype: tuple
+
+            @raise OSError: if the file cannot be found.
+        """
+        stat = os.stat(path)
+        return stat.st_size, getattr(stat, 'st_mtime_ns', None) or int(stat.st_mtime * 1e9)
+
+    @staticmethod
+    def write_atomically(path, write):
+        """
+            Writes the file at L{path} with the given L{write} function, atomically: the file is written next to
+            L{path} under a temporary name and then renamed, so readers see either the previous file or the whole
+            new one. The directory of the file is created if needed.
+
+            @param write: the function writing the content, given the file (opened in binary mode).
+            @type write: collections.abc.Callable
+
+            @raise IOError: if the file cannot be written.
+        """
+        directory = os.path.dirname(os.path.abspath(path))
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+
+        fd, temp_path = tempfile.mkstemp(prefix='.glyphs-', dir=directory)
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                write(f)
+            getattr(os, 'replace', os.rename)(temp_path, path)
+        except BaseException:
+            os.remove(temp_path)
+            raise
+
+    __slots__ = tuple()
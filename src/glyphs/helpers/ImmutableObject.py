@@ -1,11 +1,10 @@
 from __future__ import unicode_literals
 
-import six
-
+from glyphs.helpers import compat
 from glyphs.helpers.ImmutableType import ImmutableType
 
 
-class ImmutableObject(six.with_metaclass(ImmutableType)):
+class ImmutableObject(compat.with_metaclass(ImmutableType)):
     """
         Abstract class making any implementation and instance of this class immutable.
 
@@ -0,0 +1,82 @@
+from __future__ import unicode_literals
+
+from collections import namedtuple
+
+from glyphs.helpers.ImmutableObject import ImmutableObject
+
+
+PathTrieEdge = namedtuple("PathTrieEdge", ["sub_path", "is_last", "routes", "children"])
+"""
+    Edge of a L{PathTrie}: the sub path it follows, whether the paths going through it end there, the pairs of
+    index and types (at that level) of all the paths going through it (in order) and the edges below it.
+"""
+
+
+class PathTrie(ImmutableObject):
+    """
+        Trie of typed paths (sequences of triplets, as L{iterated through by the glyphs<glyphs.ro.ROGlyph.ROGlyph.
+        iter_r_path_type>}) sharing their common prefixes.
+
+        Walking the trie visits each shared level once, whatever the number of paths going through it.
+    """
+
+    def __init__(self, paths):
+        """
+            Initializer for a trie.
+
+            @param paths: the typed paths. Each path is identified by its index in L{paths}.
+            @type paths: collections.abc.Iterable
+
+            @precondition: all(len(tuple(p)) > 0 for p in paths)
+        """
+        root = []
+        count = 0
+
+        for index, path in enumerate(paths):
+            count += 1
+            edges = root
+
+            for is_last, sub_path, type_tuple in path:
+                # a path ending on a sub path and a path going through it are on different edges.
+                for edge in edges:
+                    if edge[0] == sub_path and edge[1] is is_last:
+                        break
+                else:
+                    edge = [sub_path, is_last, [], []]
+                    edges.append(edge)
+
+                edge[2].append((index, type_tuple,))
+                edges = edge[3]
+
+        self.__dict__["__edges"] = PathTrie.__freeze(root)
+        self.__dict__["__count"] = count
+
+    @property
+    def edges(self):
+        """
+            Returns the edges at the root of the trie, in the order their sub paths first appear in the paths.
+
+            @rtype: tuple
+        """
+        return self.__dict__["__edges"]
+
+    @property
+    def count(self):
+        """
+            Returns the number of paths in the trie.
+
+            @rtype: int
+        """
+        return self.__dict__["__count"]
+
+    @staticmethod
+    def __freeze(edges):
+        """
+            Returns the tuple of L{PathTrieEdge} matching the given L{edges} being built.
+
+            @rtype: tuple
+        """
+        return tuple(
+                     PathTrieEdge(sub_path, is_last, tuple(routes), PathTrie.__freeze(children))
+                     for sub_path, is_last, routes, children in edges
+                     )
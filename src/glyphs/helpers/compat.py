@@ -0,0 +1,82 @@
+"""
+    Python 2 and 3 compatibility names used by the package.
+
+    On Python 3 they are defined here, so importing the package does not load C{six}. On Python 2 they come from
+    C{six}.
+"""
+from __future__ import unicode_literals
+
+import array
+import sys
+import time
+
+try:  # Python 3.7+
+    clock_ns = time.perf_counter_ns
+except AttributeError:
+    _clock = getattr(time, 'perf_counter', time.time)
+
+    def clock_ns():
+        """
+            Returns the time of a performance counter, in nanoseconds.
+        """
+        return int(_clock() * 1e9)
+
+if sys.version_info[0] >= 3:
+    text_type = str
+    string_types = (str,)
+    integer_types = (int,)
+    zip = zip
+    range = range
+
+    def byte_view(buffer):
+        """
+            Returns a view of the bytes of the given L{buffer}, indexed as integers and sliced without copying.
+        """
+        view = memoryview(buffer)
+        return view if view.format == 'B' else view.cast('B')
+
+    def typed_view(buffer, typecode):
+        """
+            Returns a view of the given L{buffer} as items of the C{array} L{typecode}, without copying.
+        """
+        return memoryview(buffer).cast(typecode)
+
+    def iteritems(d):
+        """
+            Returns an iterator through the items of the given dictionary L{d}.
+        """
+        return iter(d.items())
+
+    def with_metaclass(meta, *bases):
+        """
+            Returns a base class for a class to be created with the metaclass L{meta} and the given L{bases}
+            (same as C{six.with_metaclass}).
+        """
+        class metaclass(type):
+
+            def __new__(cls, name, this_bases, d):
+                return meta(name, bases, d)
+
+            @classmethod
+            def __prepare__(cls, name, this_bases):
+                return meta.__prepare__(name, bases)
+
+        return type.__new__(metaclass, str('temporary_class'), (), {})
+
+else:
+    from six import integer_types, iteritems, string_types, text_type, with_metaclass
+    from six.moves import range, zip
+
+    def byte_view(buffer):
+        """
+            Returns the bytes of the given L{buffer}, indexed as integers (a copy: the views of Python 2 are
+            indexed as strings).
+        """
+        return bytearray(buffer)
+
+    def typed_view(buffer, typecode):
+        """
+            Returns the items of the C{array} L{typecode} held by the given L{buffer} (a copy: the views of
+            Python 2 cannot be cast).
+        """
+        return array.array(str(typecode), bytes(buffer))
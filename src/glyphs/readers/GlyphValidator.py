@@ -0,0 +1,193 @@
+from __future__ import unicode_literals
+
+from collections import namedtuple
+
+try:  # transition with Python 3.6+
+    import collections.abc as collectionsABC
+except ImportError:
+    import collections as collectionsABC
+
+from glyphs.helpers import compat
+from glyphs.helpers.ImmutableObject import ImmutableObject
+from glyphs.helpers.PathTrie import PathTrie
+from glyphs.ro.ROGlyph import ROGlyph
+
+
+GlyphViolation = namedtuple("GlyphViolation", ["glyph", "kind", "path", "error"])
+"""
+    Violation of a glyph in a source: the glyph, the L{kind of violation<GlyphValidator.MISSING>}, the tuple of sub
+    paths down to the level where it occurred and the error raised by the translation function (C{None} for the
+    other kinds).
+"""
+
+ValidationReport = namedtuple("ValidationReport", ["values", "violations"])
+"""
+    Report of the validation of a source: the tuple of the values read with each glyph (C{None} for the glyphs in
+    violation) and the tuple of the L{violations<GlyphViolation>}, in the order of the glyphs.
+"""
+
+
+class GlyphValidator(ImmutableObject):
+    """
+        Validator of sources against a set of glyphs, compiled once and walking each source once.
+
+        A glyph is valid in a source if L{DictUtils.get<glyphs.utils.DictUtils.DictUtils.get>} reads it without
+        error. Unlike one call per glyph, all the violations are reported, with the path where they occurred, and
+        the levels shared by several glyphs are read once.
+    """
+
+    MISSING = 'missing'
+    """ Kind of violation of a path missing from the source (where C{KeyError} would be raised)."""
+
+    TYPE_MISMATCH = 'type_mismatch'
+    """ Kind of violation of a type not matching in the source (where C{TypeError} would be raised)."""
+
+    TRANSLATION = 'translation'
+    """ Kind of violation of a value the translation function of the glyph raised an error for."""
+
+    def __init__(self, glyphs, no_default=True, force_none_to_default_value=False):
+        """
+            Initializer for a validator.
+
+            @type glyphs: collections.abc.Iterable
+            @param no_default: C{True} if all the levels of the glyphs are required (see L{DictUtils.get<glyphs.
+            utils.DictUtils.DictUtils.get>}). If C{False}, a missing last level is valid and read as the default
+            value of the glyph.
+            @type no_default: bool
+            @param force_none_to_default_value: see L{DictUtils.get<glyphs.utils.DictUtils.DictUtils.get>}.
+            @type force_none_to_default_value: bool
+
+            @precondition: all(isinstance(g, ROGlyph) for g in glyphs)
+        """
+        glyphs = tuple(glyphs)
+        assert all(isinstance(g, ROGlyph) for g in glyphs)
+
+        self.__dict__["__glyphs"] = glyphs
+        self.__dict__["__edges"] = PathTrie(g.iter_r_path_type for g in glyphs).edges
+        self.__dict__["__no_default"] = no_default
+        self.__dict__["__force_none_to_default_value"] = force_none_to_default_value
+
+    @property
+    def glyphs(self):
+        """
+            Returns the glyphs validated, in order.
+
+            @rtype: tuple
+        """
+        return self.__dict__["__glyphs"]
+
+    def validate(self, source):
+        """
+            Returns the L{report<ValidationReport>} of the validation of the given L{source}.
+
+            @type source: collections.abc.Mapping
+
+            @rtype: ValidationReport
+        """
+        count = len(self.__dict__["__glyphs"])
+        values = [None] * count
+        violations = [None] * count
+
+        self.__walk(self.__dict__["__edges"], source, tuple(), values, violations)
+
+        return ValidationReport(tuple(values), tuple(v for v in violations if v is not None))
+
+    def is_valid(self, source):
+        """
+            Returns C{True} if the given L{source} is valid for all the glyphs. Otherwise, returns C{False}.
+
+            @type source: collections.abc.Mapping
+
+            @rtype: bool
+        """
+        return not self.validate(source).violations
+
+    def __walk(self, edges, node, prefix, values, violations):
+        """
+            Validates the given level of the trie of the glyphs, L{node} being the source at that level.
+
+            @param prefix: the sub paths leading to L{node}.
+            @type prefix: tuple
+            @param violations: per glyph, its violation or C{None}. Glyphs with a violation are not walked further.
+            @type violations: list
+        """
+        glyphs = self.__dict__["__glyphs"]
+        Container = collectionsABC.Container
+        text_type = compat.text_type
+
+        for sub_path, is_last, routes, children in edges:
+            path = prefix + (sub_path,)
+
+            if type(node) is not dict and not isinstance(node, collectionsABC.Mapping):
+                for index, _ in routes:
+                    if violations[index] is None:
+                        violations[index] = GlyphViolation(glyphs[index], GlyphValidator.MISSING, path, None)
+                continue
+
+            alive = False
+            for index, type_tuple in routes:
+                if violations[index] is not None:
+                    continue
+
+                if type_tuple is not None:
+                    key = type_tuple[0]
+                    if (
+                        key not in node
+                        or not isinstance(node[key], Container)  # saving the serialization cost as it is not going to work
+                        or type_tuple[1] != text_type(node[key])
+                        ):
+                        violations[index] = GlyphViolation(glyphs[index], GlyphValidator.TYPE_MISMATCH, path, None)
+                        continue
+
+                alive = True
+
+            if not alive:
+                continue
+
+            found = sub_path in node
+
+            if not is_last:
+                if found:
+                    self.__walk(children, node[sub_path], path, values, violations)
+                else:
+                    for index, _ in routes:
+                        if violations[index] is None:
+                            violations[index] = GlyphViolation(glyphs[index], GlyphValidator.MISSING, path, None)
+                continue
+
+            for index, _ in routes:
+                if violations[index] is not None:
+                    continue
+
+                if found:
+                    value = node[sub_path]
+                elif self.__dict__["__no_default"]:
+                    violations[index] = GlyphViolation(glyphs[index], GlyphValidator.MISSING, path, None)
+                    continue
+                else:
+                    value = glyphs[index].r_default_value
+
+                try:
+                    values[index] = self.__translate(glyphs[index], value)
+                except Exception as e:  # whatever the translation function raised
+                    violations[index] = GlyphViolation(glyphs[index], GlyphValidator.TRANSLATION, path, e)
+
+    def __translate(self, glyph, value):
+        """
+            Returns the L{value} read with the given L{glyph} defaulted and translated the same way L{DictUtils.get
+            <glyphs.utils.DictUtils.DictUtils.get>} does.
+        """
+        default_return = glyph.r_default_value
+        force_none_to_default_value = self.__dict__["__force_none_to_default_value"]
+
+        if value == default_return or (force_none_to_default_value and value is None):
+            return default_return
+
+        t = glyph.r_translation_function
+        if t:
+            value = t(value)
+
+            if value == default_return or (force_none_to_default_value and value is None):
+                return default_return
+
+        return value
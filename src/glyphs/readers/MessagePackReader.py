@@ -0,0 +1,543 @@
+from __future__ import unicode_literals
+
+import codecs
+import struct
+from collections import namedtuple
+
+try:  # transition with Python 3.6+
+    import collections.abc as collectionsABC
+except ImportError:
+    import collections as collectionsABC
+
+from glyphs.helpers import compat
+from glyphs.helpers.ImmutableObject import ImmutableObject
+from glyphs.helpers.PathTrie import PathTrie
+from glyphs.ro.ROGlyph import ROGlyph
+
+
+ExtType = namedtuple("ExtType", ["code", "data"])
+""" Value of a MessagePack extension type: its code and its data (bytes)."""
+
+_U16 = struct.Struct('>H')
+_U32 = struct.Struct('>I')
+_I8 = struct.Struct('>b')
+
+_SCALARS = {
+            0xca: struct.Struct('>f'),
+            0xcb: struct.Struct('>d'),
+            0xcc: struct.Struct('>B'),
+            0xcd: _U16,
+            0xce: _U32,
+            0xcf: struct.Struct('>Q'),
+            0xd0: _I8,
+            0xd1: struct.Struct('>h'),
+            0xd2: struct.Struct('>i'),
+            0xd3: struct.Struct('>q'),
+            }
+""" Decoders of the numbers, by first byte."""
+
+_FIXEXT_SIZES = {0xd4: 1, 0xd5: 2, 0xd6: 4, 0xd7: 8, 0xd8: 16}
+""" Size of the data of the fixed size extension types, by first byte."""
+
+_FIXED_WIDTHS = {
+                 0xc0: 1,
+                 0xc2: 1,
+                 0xc3: 1,
+                 0xca: 5,
+                 0xcb: 9,
+                 0xcc: 2,
+                 0xcd: 3,
+                 0xce: 5,
+                 0xcf: 9,
+                 0xd0: 2,
+                 0xd1: 3,
+                 0xd2: 5,
+                 0xd3: 9,
+                 0xd4: 3,
+                 0xd5: 4,
+                 0xd6: 6,
+                 0xd7: 10,
+                 0xd8: 18,
+                 }
+
+_WIDTHS = tuple(
+                1 if b < 0x80 or b >= 0xe0 else 1 + (b & 0x1f) if 0xa0 <= b < 0xc0 else _FIXED_WIDTHS.get(b, 0)
+                for b in compat.range(0x100)
+                )
+""" Number of bytes taken by the objects whose size only depends on their first byte, by first byte (0 for others)."""
+
+
+class MessagePackReader(ImmutableObject):
+    """
+        Reader of the values of a set of glyphs straight from MessagePack encoded bytes, without decoding the whole
+        source.
+
+        The bytes are walked once, through a view: the maps along the paths of the glyphs are scanned key by key,
+        everything else is skipped over using the length prefixes and only the values read with the glyphs (and
+        the values of their types) are decoded. The values are read with the same semantics as L{DictUtils.get
+        <glyphs.utils.DictUtils.DictUtils.get>} on the decoded source: paths, types, default values and
+        translation functions.
+
+        Values are decoded as C{msgpack.unpackb} does by default (strings to text, arrays to lists), except for
+        the extension types which are all decoded to L{ExtType}.
+
+        A map is scanned until all the keys looked for in it are found: when a key is duplicated in a map, its first
+        value is the one read. Duplicated keys are not well formed MessagePack but C{msgpack.unpackb} keeps their last
+        value: C{last_value_wins} reads that one instead, at the cost of scanning every map along the paths to its
+        end.
+    """
+
+    def __init__(self, glyphs, no_default=False, force_none_to_default_value=False, last_value_wins=False):
+        """
+            Initializer for a reader.
+
+            @type glyphs: collections.abc.Iterable
+            @param no_default: see L{DictUtils.get<glyphs.utils.DictUtils.DictUtils.get>}.
+            @type no_default: bool
+            @param force_none_to_default_value: see L{DictUtils.get<glyphs.utils.DictUtils.DictUtils.get>}.
+            @type force_none_to_default_value: bool
+            @param last_value_wins: C{True} to read the last value of a key duplicated in a map (as C{msgpack.unpackb}
+            does), C{False} to read its first value and stop scanning the map as soon as all the keys looked for in it
+            are found.
+            @type last_value_wins: bool
+
+            @precondition: all(isinstance(g, ROGlyph) for g in glyphs)
+        """
+        glyphs = tuple(glyphs)
+        assert all(isinstance(g, ROGlyph) for g in glyphs)
+
+        paths = tuple(tuple(g.iter_r_path_type) for g in glyphs)
+
+        self.__dict__["__glyphs"] = glyphs
+        self.__dict__["__paths"] = paths
+        self.__dict__["__level"] = MessagePackReader.__compile(PathTrie(paths).edges)
+        self.__dict__["__no_default"] = no_default
+        self.__dict__["__force_none_to_default_value"] = force_none_to_default_value
+        self.__dict__["__last_value_wins"] = last_value_wins
+
+    @property
+    def glyphs(self):
+        """
+            Returns the glyphs read, in order.
+
+            @rtype: tuple
+        """
+        return self.__dict__["__glyphs"]
+
+    def read(self, buffer):
+        """
+            Returns the tuple of the values read with each glyph from the given MessagePack encoded L{buffer}.
+
+            @param buffer: the encoded source (e.g. C{bytes}, C{bytearray}, C{memoryview}, C{mmap.mmap}).
+
+            @rtype: tuple
+
+            @raise KeyError: see L{DictUtils.get<glyphs.utils.DictUtils.DictUtils.get>}. Raised for the first glyph
+            (in order) in error, as calling it for each glyph in turn would.
+            @raise TypeError: see L{DictUtils.get<glyphs.utils.DictUtils.DictUtils.get>}.
+            @raise ValueError: if L{buffer} holds a byte MessagePack never uses.
+
+            @precondition: L{buffer} holds a well formed MessagePack object
+        """
+        glyphs = self.__dict__["__glyphs"]
+        count = len(glyphs)
+        values = [None] * count
+        errors = [None] * count
+
+        self.__walk(compat.byte_view(buffer), 0, self.__dict__["__level"], 0, values, errors)
+
+        for index in compat.range(count):
+            if errors[index] is not None:
+                raise errors[index]
+
+            values[index] = self.__translate(glyphs[index], values[index])
+
+        return tuple(values)
+
+    def __walk(self, view, pos, level, depth, values, errors):
+        """
+            Reads the given level of the trie of the glyphs from the object encoded at L{pos} in L{view}.
+
+            @param depth: the depth of L{level} in the trie.
+            @type depth: int
+            @param values: per glyph, its value before translation.
+            @type values: list
+            @param errors: per glyph, the error to raise or C{None}. Glyphs in error are not walked further.
+            @type errors: list
+        """
+        edges, wanted, lengths = level
+        count, pos = MessagePackReader.__map_header(view, pos)
+
+        if count is None:
+            for edge in edges:
+                for index, _ in edge.routes:
+                    if errors[index] is None:
+                        errors[index] = KeyError('Could not find {} in the given dictionary'.format(edge.sub_path))
+            return
+
+        found = MessagePackReader.__scan(view, pos, count, wanted, lengths, self.__dict__["__last_value_wins"])
+        types = {}
+        Container = collectionsABC.Container
+        text_type = compat.text_type
+
+        for sub_path, is_last, routes, children in edges:
+            alive = False
+            for index, type_tuple in routes:
+                if errors[index] is not None:
+                    continue
+
+                if type_tuple is not None:
+                    key = type_tuple[0]
+                    type_value = types.get(key, types)  # the dictionary itself is used as not-found sentinel
+                    if type_value is types:
+                        at = found.get(key)
+                        type_value = types[key] = types if at is None else MessagePackReader.__decode(view, at)[0]
+
+                    if (
+                        type_value is types
+                        or not isinstance(type_value, Container)  # saving the serialization cost as it is not going to work
+                        or type_tuple[1] != text_type(type_value)
+                        ):
+                        errors[index] = TypeError('Type mismatch for {} in the given dictionary'.format(sub_path))
+                        continue
+
+                alive = True
+
+            if not alive:
+                continue
+
+            at = found.get(sub_path)
+
+            if at is not None and not is_last:
+                self.__walk(view, at, children, depth + 1, values, errors)
+                continue
+
+            if at is not None:
+                value = MessagePackReader.__decode(view, at)[0]
+            elif self.__dict__["__no_default"] is True:
+                for index, _ in routes:
+                    if errors[index] is None:
+                        errors[index] = KeyError('Could not find {} in the given dictionary'.format(sub_path))
+                continue
+
+            for index, _ in routes:
+                if errors[index] is not None:
+                    continue
+
+                if at is not None:
+                    values[index] = value
+                elif is_last:
+                    values[index] = self.__dict__["__glyphs"][index].r_default_value
+                else:
+                    try:
+                        values[index] = self.__read_default(index, depth + 1)
+                    except (KeyError, TypeError,) as e:
+                        errors[index] = e
+
+    def __read_default(self, index, depth):
+        """
+            Returns the value read with the glyph at L{index}, from L{depth} down, in its default value (as
+            L{DictUtils.get<glyphs.utils.DictUtils.DictUtils.get>} does when an intermediary piece of the path is
+            missing).
+
+            @raise KeyError: see L{DictUtils.get<glyphs.utils.DictUtils.DictUtils.get>}
+            @raise TypeError: see L{DictUtils.get<glyphs.utils.DictUtils.DictUtils.get>}
+        """
+        Mapping = collectionsABC.Mapping
+        Container = collectionsABC.Container
+        text_type = compat.text_type
+        default_return = self.__dict__["__glyphs"][index].r_default_value
+        current = default_return
+
+        for _, sub_path, source_type in self.__dict__["__paths"][index][depth:]:
+            if not isinstance(current, Mapping):
+                raise KeyError('Could not find {} in the given dictionary'.format(sub_path))
+
+            if source_type is not None:
+                key = source_type[0]
+
+                if (key not in current
+                    or not isinstance(current[key], Container)  # saving the serialization cost as it is not going to work
+                    or source_type[1] != text_type(current[key])):
+                    raise TypeError('Type mismatch for {} in the given dictionary'.format(sub_path))
+
+            if sub_path in current:
+                current = current[sub_path]
+            elif self.__dict__["__no_default"] is True:
+                raise KeyError('Could not find {} in the given dictionary'.format(sub_path))
+            else:
+                current = default_return
+
+        return current
+
+    def __translate(self, glyph, value):
+        """
+            Returns the L{value} read with the given L{glyph} defaulted and translated the same way L{DictUtils.get
+            <glyphs.utils.DictUtils.DictUtils.get>} does.
+        """
+        default_return = glyph.r_default_value
+        force_none_to_default_value = self.__dict__["__force_none_to_default_value"]
+
+        if value == default_return or (force_none_to_default_value and value is None):
+            return default_return
+
+        t = glyph.r_translation_function
+        if t:
+            value = t(value)
+
+            if value == default_return or (force_none_to_default_value and value is None):
+                return default_return
+
+        return value
+
+    @staticmethod
+    def __compile(edges):
+        """
+            Returns the level of the reader matching the given L{edges} of the trie: the edges (their children
+            being levels as well), the dictionary of the UTF-8 encoded keys to look for in the map (sub paths and
+            keys of the types) to the keys and the set of the lengths of the encoded keys.
+
+            @rtype: tuple
+        """
+        wanted = {}
+
+        for edge in edges:
+            wanted[edge.sub_path.encode('utf-8')] = edge.sub_path
+            for _, type_tuple in edge.routes:
+                if type_tuple is not None:
+                    wanted[type_tuple[0].encode('utf-8')] = type_tuple[0]
+
+        return (
+                tuple(edge._replace(children=MessagePackReader.__compile(edge.children)) for edge in edges),
+                wanted,
+                frozenset(len(k) for k in wanted),
+                )
+
+    @staticmethod
+    def __map_header(view, pos):
+        """
+            Returns the pair of the number of entries of the map encoded at L{pos} in L{view} (C{None} if it is not
+            a map) and of the position of its first entry.
+
+            @rtype: tuple
+        """
+        b = view[pos]
+
+        if 0x80 <= b <= 0x8f:
+            return b & 0x0f, pos + 1
+        if b == 0xde:
+            return _U16.unpack_from(view, pos + 1)[0], pos + 3
+        if b == 0xdf:
+            return _U32.unpack_from(view, pos + 1)[0], pos + 5
+        return None, pos
+
+    @staticmethod
+    def __scan(view, pos, count, wanted, lengths, last_value_wins):
+        """
+            Returns the dictionary of the L{wanted} keys found among the L{count} entries of the map starting at
+            L{pos} in L{view} to the positions of their values.
+
+            @param last_value_wins: C{True} to scan the whole map and keep the last value of a duplicated key,
+            C{False} to keep its first value and stop as soon as all the L{wanted} keys are found.
+            @type last_value_wins: bool
+
+            @rtype: dict
+        """
+        found = {}
+        total = len(wanted)
+        skip = MessagePackReader.__skip
+        widths = _WIDTHS
+
+        for _ in compat.range(count):
+            b = view[pos]
+
+            if 0xa0 <= b <= 0xbf:
+                length = b & 0x1f
+                start = pos + 1
+            elif b == 0xd9:
+                length = view[pos + 1]
+                start = pos + 2
+            elif b == 0xda:
+                length = _U16.unpack_from(view, pos + 1)[0]
+                start = pos + 3
+            elif b == 0xdb:
+                length = _U32.unpack_from(view, pos + 1)[0]
+                start = pos + 5
+            else:  # not a string: cannot be a sub path.
+                pos = skip(view, skip(view, pos))
+                continue
+
+            pos = start + length
+
+            if length in lengths:
+                key = wanted.get(bytes(view[start:pos]))
+
+                if key is not None:
+                    if last_value_wins:
+                        found[key] = pos
+                    elif key not in found:
+                        found[key] = pos
+                        if len(found) == total:
+                            return found
+
+            width = widths[view[pos]]
+            pos = pos + width if width else skip(view, pos)
+
+        return found
+
+    @staticmethod
+    def __skip(view, pos):
+        """
+            Returns the position following the object encoded at L{pos} in L{view}, without decoding it.
+
+            @rtype: int
+
+            @raise ValueError: if a byte MessagePack never uses is met.
+        """
+        widths = _WIDTHS
+        remaining = 1
+
+        while remaining:
+            remaining -= 1
+            b = view[pos]
+            width = widths[b]
+
+            if width:
+                pos += width
+            elif b <= 0x8f:
+                remaining += (b & 0x0f) << 1
+                pos += 1
+            elif b <= 0x9f:
+                remaining += b & 0x0f
+                pos += 1
+            elif b == 0xc4 or b == 0xd9:
+                pos += 2 + view[pos + 1]
+            elif b == 0xc5 or b == 0xda:
+                pos += 3 + _U16.unpack_from(view, pos + 1)[0]
+            elif b == 0xc6 or b == 0xdb:
+                pos += 5 + _U32.unpack_from(view, pos + 1)[0]
+            elif b == 0xc7:
+                pos += 3 + view[pos + 1]
+            elif b == 0xc8:
+                pos += 4 + _U16.unpack_from(view, pos + 1)[0]
+            elif b == 0xc9:
+                pos += 6 + _U32.unpack_from(view, pos + 1)[0]
+            elif b == 0xdc:
+                remaining += _U16.unpack_from(view, pos + 1)[0]
+                pos += 3
+            elif b == 0xdd:
+                remaining += _U32.unpack_from(view, pos + 1)[0]
+                pos += 5
+            elif b == 0xde:
+                remaining += _U16.unpack_from(view, pos + 1)[0] << 1
+                pos += 3
+            elif b == 0xdf:
+                remaining += _U32.unpack_from(view, pos + 1)[0] << 1
+                pos += 5
+            else:
+                raise ValueError('Invalid MessagePack byte 0x{:02x} at {}'.format(b, pos))
+
+        return pos
+
+    @staticmethod
+    def __decode(view, pos):
+        """
+            Returns the pair of the object encoded at L{pos} in L{view} and of the position following it.
+
+            @rtype: tuple
+
+            @raise ValueError: if a byte MessagePack never uses is met.
+        """
+        b = view[pos]
+
+        if b <= 0x7f:
+            return b, pos + 1
+        if b >= 0xe0:
+            return b - 0x100, pos + 1
+        if b <= 0x8f:
+            return MessagePackReader.__decode_map(view, pos + 1, b & 0x0f)
+        if b <= 0x9f:
+            return MessagePackReader.__decode_array(view, pos + 1, b & 0x0f)
+        if b <= 0xbf:
+            end = pos + 1 + (b & 0x1f)
+            return codecs.utf_8_decode(view[pos + 1:end], None, True)[0], end
+        if b == 0xc0:
+            return None, pos + 1
+        if b == 0xc2:
+            return False, pos + 1
+        if b == 0xc3:
+            return True, pos + 1
+
+        scalar = _SCALARS.get(b)
+        if scalar is not None:
+            return scalar.unpack_from(view, pos + 1)[0], pos + 1 + scalar.size
+
+        if b == 0xd9 or b == 0xc4:
+            start, length = pos + 2, view[pos + 1]
+        elif b == 0xda or b == 0xc5:
+            start, length = pos + 3, _U16.unpack_from(view, pos + 1)[0]
+        elif b == 0xdb or b == 0xc6:
+            start, length = pos + 5, _U32.unpack_from(view, pos + 1)[0]
+        elif b == 0xdc:
+            return MessagePackReader.__decode_array(view, pos + 3, _U16.unpack_from(view, pos + 1)[0])
+        elif b == 0xdd:
+            return MessagePackReader.__decode_array(view, pos + 5, _U32.unpack_from(view, pos + 1)[0])
+        elif b == 0xde:
+            return MessagePackReader.__decode_map(view, pos + 3, _U16.unpack_from(view, pos + 1)[0])
+        elif b == 0xdf:
+            return MessagePackReader.__decode_map(view, pos + 5, _U32.unpack_from(view, pos + 1)[0])
+        elif b in _FIXEXT_SIZES:
+            end = pos + 2 + _FIXEXT_SIZES[b]
+            return ExtType(_I8.unpack_from(view, pos + 1)[0], bytes(view[pos + 2:end])), end
+        elif b == 0xc7:
+            start, length = pos + 3, view[pos + 1]
+        elif b == 0xc8:
+            start, length = pos + 4, _U16.unpack_from(view, pos + 1)[0]
+        elif b == 0xc9:
+            start, length = pos + 6, _U32.unpack_from(view, pos + 1)[0]
+        else:
+            raise ValueError('Invalid MessagePack byte 0x{:02x} at {}'.format(b, pos))
+
+        end = start + length
+
+        if b >= 0xd9:  # str 8, 16 and 32
+            return codecs.utf_8_decode(view[start:end], None, True)[0], end
+        if b <= 0xc6:  # bin 8, 16 and 32
+            return bytes(view[start:end]), end
+        return ExtType(_I8.unpack_from(view, start - 1)[0], bytes(view[start:end])), end
+
+    @staticmethod
+    def __decode_array(view, pos, count):
+        """
+            Returns the pair of the list of the L{count} objects encoded from L{pos} in L{view} and of the position
+            following them.
+
+            @rtype: tuple
+        """
+        decode = MessagePackReader.__decode
+        items = []
+
+        for _ in compat.range(count):
+            item, pos = decode(view, pos)
+            items.append(item)
+
+        return items, pos
+
+    @staticmethod
+    def __decode_map(view, pos, count):
+        """
+            Returns the pair of the dictionary of the L{count} entries encoded from L{pos} in L{view} and of the
+            position following them. Keys which are arrays are decoded to tuples.
+
+            @rtype: tuple
+        """
+        decode = MessagePackReader.__decode
+        items = {}
+
+        for _ in compat.range(count):
+            key, pos = decode(view, pos)
+            if isinstance(key, list):
+                key = tuple(key)
+            items[key], pos = decode(view, pos)
+
+        return items, pos
@@ -0,0 +1 @@
+# this space for rent
\ No newline at end of file
@@ -0,0 +1,391 @@
+from __future__ import unicode_literals
+
+import hashlib
+import io
+import json
+import os
+import pickle
+import sys
+
+import glyphs
+from glyphs.helpers import compat
+from glyphs.helpers.FileUtils import FileUtils
+from glyphs.readers.GlyphValidator import GlyphValidator
+from glyphs.readers.MessagePackReader import MessagePackReader
+from glyphs.ro.ROGlyph import ROGlyph
+from glyphs.rw.RWGlyph import RWGlyph
+from glyphs.rw.ResettableGlyph import ResettableGlyph
+from glyphs.utils.BooleanUtils import BooleanUtils
+from glyphs.utils.DictUtils import DictUtils
+from glyphs.utils.StringUtils import StringUtils
+from glyphs.writers.JSONPayloadWriter import JSONPayloadWriter
+from glyphs.writers.PayloadBuilder import PayloadBuilder
+
+
+class GlyphRegistry(object):
+    """
+        Registry of named glyph sets declared in a specification (JSON) and of the named translation functions
+        they refer to.
+
+        Building thousands of glyphs out of a specification takes time, and so does compiling them: the registry
+        can save the built glyph sets and their compiled forms into an artifact file which later processes load
+        instead. The artifact is rebuilt whenever the specification, the library version, its code or the artifact
+        format changes.
+
+        The compiled forms saved are the tries of the paths of each glyph set (used by L{DictUtils<glyphs.utils.
+        DictUtils.DictUtils>} when reading or writing several glyphs at once) and, with their default settings,
+        its L{validator<GlyphRegistry.validator>} and L{MessagePack reader<GlyphRegistry.message_pack_reader>}
+        and, for the glyph sets made of R/W glyphs, its L{payload builder<GlyphRegistry.payload_builder>} and
+        L{JSON writer<GlyphRegistry.json_payload_writer>}. L{Payload templates<glyphs.writers.PayloadTemplate.
+        PayloadTemplate>} are compiled into functions, which cannot be saved.
+
+        A specification maps each glyph set name to the list of its glyphs. Each glyph is a mapping of the keyword
+        arguments of its class, plus a C{"type"} (C{"ROGlyph"} by default, C{"RWGlyph"} or C{"ResettableGlyph"}).
+        The translation functions are given by name (see L{GlyphRegistry.register_translation_function}).
+
+        e.g.
+        {"issue": [{"r_path": "key"}, {"type": "RWGlyph", "r_path": "fields>id", "r_translation_function": "int"}]}
+    """
+
+    ARTIFACT_FORMAT = 2
+    """ Version of the format of the artifact files."""
+
+    GLYPH_TYPES = {
+                   'ROGlyph': ROGlyph,
+                   'RWGlyph': RWGlyph,
+                   'ResettableGlyph': ResettableGlyph,
+                   }
+    """ Glyph classes by name, as found in the specifications."""
+
+    DEFAULT_TRANSLATION_FUNCTIONS = {
+                                     'int': int,
+                                     'float': float,
+                                     'bool': bool,
+                                     'list': list,
+                                     'tuple': tuple,
+                                     'unicode': compat.text_type,
+                                     'StringUtils.to_unicode': StringUtils.to_unicode,
+                                     'StringUtils.to_unicode_not_empty': StringUtils.to_unicode_not_empty,
+                                     'StringUtils.to_unicode_not_none': StringUtils.to_unicode_not_none,
+                                     'StringUtils.to_unicode_not_empty_not_none': StringUtils.to_unicode_not_empty_not_none,
+                                     'BooleanUtils.to_boolean': BooleanUtils.to_boolean,
+                                     }
+    """ Translation functions available to all the registries, by name."""
+
+    __code_fingerprint = None
+    """ Hash of the source files of the package, computed on first use (see L{GlyphRegistry.__artifact_header})."""
+
+    def __init__(self):
+        """
+            Initializer for an empty registry.
+        """
+        self.__translation_functions = dict(GlyphRegistry.DEFAULT_TRANSLATION_FUNCTIONS)
+        self.__glyph_sets = {}
+        self.__compiled = {}
+
+    def register_translation_function(self, name, function):
+        """
+            Registers the given translation L{function} under L{name}, for the specifications to refer to it.
+
+            @type name: six.text_type
+
+            @precondition: callable(function)
+        """
+        assert callable(function)
+
+        self.__translation_functions[name] = function
+
+    @property
+    def names(self):
+        """
+            Returns the names of the glyph sets of this registry, sorted.
+
+            @rtype: tuple
+        """
+        return tuple(sorted(self.__glyph_sets))
+
+    def glyph_set(self, name):
+        """
+            Returns the glyphs of the glyph set of the given L{name}, in the order of the specification.
+
+            @type name: six.text_type
+
+            @rtype: tuple
+
+            @raise KeyError: if there is no glyph set of that name
+        """
+        return self.__glyph_sets[name]
+
+    def validator(self, name):
+        """
+            Returns the L{validator<GlyphValidator>} (with its default settings) of the glyph set of the given
+            L{name}.
+
+            @type name: six.text_type
+
+            @rtype: GlyphValidator
+
+            @raise KeyError: if there is no glyph set of that name
+        """
+        return self.__compiled_object(name, GlyphValidator)
+
+    def message_pack_reader(self, name):
+        """
+            Returns the L{MessagePack reader<MessagePackReader>} (with its default settings) of the glyph set of
+            the given L{name}.
+
+            @type name: six.text_type
+
+            @rtype: MessagePackReader
+
+            @raise KeyError: if there is no glyph set of that name
+        """
+        return self.__compiled_object(name, MessagePackReader)
+
+    def payload_builder(self, name):
+        """
+            Returns the L{payload builder<PayloadBuilder>} of the glyph set of the given L{name}.
+
+            @type name: six.text_type
+
+            @rtype: PayloadBuilder
+
+            @raise KeyError: if there is no glyph set of that name
+
+            @precondition: all(isinstance(g, RWGlyph) for g in self.glyph_set(name))
+        """
+        return self.__compiled_object(name, PayloadBuilder)
+
+    def json_payload_writer(self, name):
+        """
+            Returns the L{JSON writer<JSONPayloadWriter>} (with the default encoder) of the glyph set of the given
+            L{name}.
+
+            @type name: six.text_type
+
+            @rtype: JSONPayloadWriter
+
+            @raise KeyError: if there is no glyph set of that name
+
+            @precondition: all(isinstance(g, RWGlyph) for g in self.glyph_set(name))
+        """
+        return self.__compiled_object(name, JSONPayloadWriter)
+
+    def __contains__(self, name):
+        return name in self.__glyph_sets
+
+    def load_spec(self, spec):
+        """
+            Builds and registers the glyph sets of the given specification.
+
+            @param spec: the specification (see L{GlyphRegistry}).
+            @type spec: collections.abc.Mapping
+
+            @return: this registry
+            @rtype: GlyphRegistry
+
+            @raise KeyError: if a glyph type or a translation function is unknown
+        """
+        for name, glyph_specs in compat.iteritems(spec):
+            self.__glyph_sets[name] = tuple(self.__build(glyph_spec) for glyph_spec in glyph_specs)
+            self.__compiled.pop(name, None)
+
+        return self
+
+    def load(self, spec_path, artifact_path=None):
+        """
+            Registers the glyph sets of the specification (JSON) file at L{spec_path}, out of the artifact file at
+            L{artifact_path} when it is up to date. Otherwise, builds them and (re)writes the artifact file.
+
+            @type spec_path: six.text_type
+            @param artifact_path: (Optional) path of the artifact file. If C{None}, it is next to the
+            specification file.
+            @type artifact_path: six.text_type
+
+            @return: C{True} if the glyph sets were loaded out of the artifact file. Otherwise, C{False}.
+            @rtype: bool
+        """
+        if artifact_path is None:
+            artifact_path = spec_path + '.artifact'
+
+        with open(spec_path, 'rb') as f:
+            spec_bytes = f.read()
+
+        header = self.__artifact_header(spec_bytes)
+
+        content = self.__read_artifact(artifact_path, header)
+        loaded = content is not None
+
+        if loaded:
+            glyph_sets, tries, compiled = content
+        else:
+            spec = json.loads(spec_bytes.decode('utf-8'))
+            glyph_sets = dict(
+                              (name, tuple(self.__build(glyph_spec) for glyph_spec in glyph_specs))
+                              for name, glyph_specs in compat.iteritems(spec)
+                              )
+            tries = dict((name, DictUtils.tries(g)) for name, g in compat.iteritems(glyph_sets))
+            compiled = dict((name, GlyphRegistry.__compile(g)) for name, g in compat.iteritems(glyph_sets))
+            self.__write_artifact(artifact_path, header, (glyph_sets, tries, compiled,))
+
+        for name, (r_trie, w_trie) in compat.iteritems(tries):
+            DictUtils.cache_tries(glyph_sets[name], r_trie, w_trie)
+
+        self.__glyph_sets.update(glyph_sets)
+        self.__compiled.update(compiled)
+        return loaded
+
+    def __compiled_object(self, name, compiled_type):
+        """
+            Returns the object of the given L{compiled_type} (a class taking the glyphs) compiled for the glyph
+            set of the given L{name}, compiling it on first use if it was not loaded.
+
+            @raise KeyError: if there is no glyph set of that name
+        """
+        compiled = self.__compiled.get(name)
+        if compiled is None:
+            compiled = self.__compiled[name] = {}
+
+        compiled_object = compiled.get(compiled_type.__name__)
+        if compiled_object is None:
+            compiled_object = compiled[compiled_type.__name__] = compiled_type(self.__glyph_sets[name])
+
+        return compiled_object
+
+    @staticmethod
+    def __compile(glyph_set):
+        """
+            Returns the objects compiled for the given L{glyph_set} saved into the artifacts, by name of their
+            class.
+
+            @rtype: dict
+        """
+        compiled_types = [GlyphValidator, MessagePackReader]
+        if glyph_set and all(isinstance(g, RWGlyph) for g in glyph_set):
+            compiled_types.extend((PayloadBuilder, JSONPayloadWriter,))
+
+        return dict((t.__name__, t(glyph_set)) for t in compiled_types)
+
+    def __build(self, glyph_spec):
+        """
+            Returns the glyph described by the given L{glyph_spec}.
+
+            @type glyph_spec: collections.abc.Mapping
+
+            @rtype: ROGlyph
+        """
+        kwargs = dict(glyph_spec)
+        glyph_type = GlyphRegistry.GLYPH_TYPES[kwargs.pop('type', 'ROGlyph')]
+
+        for key, value in list(kwargs.items()):
+            if value is None:
+                continue
+            if key.endswith('_translation_function'):
+                kwargs[key] = self.__translation_functions[value]
+            elif key.endswith('_types') or key == 'reset_w_type':
+                if isinstance(value, list):  # JSON arrays: the types must be given as a tuple.
+                    kwargs[key] = tuple(value)
+
+        return glyph_type(**kwargs)
+
+    def __artifact_header(self, spec_bytes):
+        """
+            Returns the header identifying the artifact of the given specification. The code of the package is
+            part of it: the objects saved are pickled, a change of their classes makes the artifact stale even if
+            the version of the package is the same.
+
+            @rtype: tuple
+        """
+        return (
+                GlyphRegistry.ARTIFACT_FORMAT,
+                glyphs.__version__,
+                GlyphRegistry.__get_code_fingerprint(),
+                sys.version_info[:2],
+                hashlib.sha256(spec_bytes).hexdigest(),
+                )
+
+    @staticmethod
+    def __get_code_fingerprint():
+        """
+            Returns the hash of the source files of the package, computing it on first call.
+
+            @rtype: six.text_type
+        """
+        fingerprint = GlyphRegistry.__code_fingerprint
+
+        if fingerprint is None:
+            digest = hashlib.sha256()
+            root = os.path.dirname(os.path.abspath(glyphs.__file__))
+
+            for directory, sub_directories, file_names in os.walk(root):
+                sub_directories.sort()
+                for file_name in sorted(file_names):
+                    if not file_name.endswith('.py'):
+                        continue
+
+                    path = os.path.join(directory, file_name)
+                    digest.update(os.path.relpath(path, root).replace(os.sep, '/').encode('utf-8') + b'\0')
+                    with open(path, 'rb') as f:
+                        digest.update(f.read())
+
+            fingerprint = GlyphRegistry.__code_fingerprint = digest.hexdigest()
+
+        return fingerprint
+
+    def __read_artifact(self, artifact_path, header):
+        """
+            Returns the content of the artifact file at L{artifact_path} if it exists and has the given
+            L{header}: the glyph sets, the tries of their paths and their compiled objects, by glyph set name.
+            Otherwise, returns C{None}.
+
+            @rtype: tuple
+        """
+        try:
+            with open(artifact_path, 'rb') as f:
+                unpickler = pickle.Unpickler(f)
+                if unpickler.load() != header:
+                    return None
+                functions = self.__translation_functions
+                unpickler.persistent_load = lambda name: functions[name]
+                glyph_sets, tries, compiled = unpickler.load()
+                return glyph_sets, tries, compiled
+        except (
+                IOError,
+                OSError,
+                EOFError,
+                KeyError,
+                AttributeError,
+                ImportError,
+                TypeError,
+                ValueError,
+                pickle.UnpicklingError,
+                ):
+            # missing, stale (e.g. a class renamed or changed) or unreadable: rebuilt.
+            return None
+
+    def __write_artifact(self, artifact_path, header, content):
+        """
+            Writes (atomically) the given L{content} (see L{GlyphRegistry.__read_artifact}) into the artifact file
+            at L{artifact_path}.
+        """
+        # the translation functions are saved by name, whether they can be pickled or not. The classes are saved by
+        # reference, as pickle does: a class registered as a function may also be the class of an object saved.
+        names = dict(
+                     (id(f), name)
+                     for name, f in compat.iteritems(self.__translation_functions)
+                     if not isinstance(f, type)
+                     )
+
+        buf = io.BytesIO()
+        pickler = pickle.Pickler(buf, pickle.HIGHEST_PROTOCOL)
+        pickler.persistent_id = lambda obj: names.get(id(obj))
+        pickler.dump(header)
+        pickler.dump(content)  # at once: the compiled objects refer to the glyphs of the glyph sets.
+
+        FileUtils.write_atomically(artifact_path, lambda f: f.write(buf.getvalue()))
+
+    __slots__ = (
+                 '__translation_functions',
+                 '__glyph_sets',
+                 '__compiled',
+                 )
@@ -5,8 +5,8 @@ try:  # transition with Python 3.6+
 except ImportError:
     import collections as collectionsABC
 
+from glyphs.helpers import compat
 from glyphs.helpers.ImmutableObject import ImmutableObject
-import six
 
 
 class ROGlyph(ImmutableObject):
@@ -84,7 +84,10 @@ class ROGlyph(ImmutableObject):
         self.__dict__["__r_default_value"] = r_default_value
 
     def __repr__(self):
-        return "{}({},)".format(self.__class__.name, self.r_path,)
+        return "{}({},)".format(
+                                self.__class__.__name__,
+                                ROGlyph.NAME_SPACE_SEPARATOR.join(sub_path for _, sub_path, _ in self.iter_r_path_type),
+                                )
 
     @property
     def iter_r_path_type(self):
@@ -210,12 +213,12 @@ class ROGlyph(ImmutableObject):
                                 )
         """
 
-        if isinstance(path, six.text_type):
+        if isinstance(path, compat.text_type):
             path_tuple = tuple(path.split(ROGlyph.NAME_SPACE_SEPARATOR))
         else:
             assert isinstance(path, collectionsABC.Sequence)  # pre
             path_tuple = tuple(path)
-            assert all(isinstance(u, six.text_type) for u in path_tuple)  # pre
+            assert all(isinstance(u, compat.text_type) for u in path_tuple)  # pre
 
         assert path_tuple
 
@@ -223,11 +226,11 @@ class ROGlyph(ImmutableObject):
 
         if types is None:
             types_tuple = tuple()
-        elif isinstance(types, six.text_type):
+        elif isinstance(types, compat.text_type):
             types_tuple = tuple(None if x == '' else x for x in types.split(ROGlyph.NAME_SPACE_SEPARATOR))
         else:
             assert isinstance(types, tuple)
-            assert all(l is None or isinstance(l, six.text_type) for l in types)
+            assert all(l is None or isinstance(l, compat.text_type) for l in types)
             types_tuple = types
 
         types_tuple = tuple(None if x is None else tuple(x.split(ROGlyph.KEY_VALUE_SEPARATOR)) for x in types_tuple)
@@ -243,7 +246,7 @@ class ROGlyph(ImmutableObject):
         return tuple(
                       (idx == max_index, sub_path, type_name,)
                       for idx, (sub_path, type_name,) in enumerate(
-                                                                  six.moves.zip(
+                                                                  compat.zip(
                                                                                  path_tuple,
                                                                                  types_tuple,
                                                                                )
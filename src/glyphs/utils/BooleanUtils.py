@@ -1,8 +1,14 @@
 from __future__ import unicode_literals
 
+from glyphs.helpers.CacheUtils import CacheUtils
 from glyphs.utils.StringUtils import StringUtils
 
-from glyphs.backports.lru_cache import lru_cache
+
+_CACHE_SIZE = 128
+""" Maximum number of values whose boolean is cached."""
+
+_CACHE = {}
+""" Booleans of the values (with their type) already converted (see L{CacheUtils})."""
 
 
 class BooleanUtils(object):
@@ -14,7 +20,6 @@ class BooleanUtils(object):
     """ Set of values considered to be C{True}."""
 
     @staticmethod
-    @lru_cache(typed=True)
     def to_boolean(value):
         """
             Returns the boolean (from the L{true values<BooleanUtils.TRUE_VALUES>}) representation of the
@@ -23,6 +28,17 @@ class BooleanUtils(object):
             @postcondition: (value is None) == (return is None)
             @postcondition: return is None or isinstance(return, bool)
         """
-        return (value if value is None or isinstance(value, bool) else StringUtils.to_unicode(value).lower()) in BooleanUtils.TRUE_VALUES
+        key = (value, type(value),)
+        entry = _CACHE.get(key)
+
+        if entry is not None:
+            # CacheUtils.get, inlined: the cost of the call is the cost of the lookup.
+            entry[1] = next(CacheUtils.STAMPS)
+            result = entry[0]
+        else:
+            result = (value if value is None or isinstance(value, bool) else StringUtils.to_unicode(value).lower()) in BooleanUtils.TRUE_VALUES
+            CacheUtils.put(_CACHE, key, result, _CACHE_SIZE)
+
+        return result
 
     __slots__ = tuple()
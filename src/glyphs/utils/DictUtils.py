@@ -1,19 +1,46 @@
 from __future__ import unicode_literals
 
+from collections import namedtuple
+
+from glyphs.helpers import compat
+from glyphs.helpers.CacheUtils import CacheUtils
 from glyphs.helpers.ImmutableType import ImmutableType
+from glyphs.helpers.PathTrie import PathTrie
 from glyphs.ro.ROGlyph import ROGlyph
 from glyphs.rw.RWGlyph import RWGlyph
 from glyphs.rw.ResettableGlyph import ResettableGlyph
 
-import six
-
 try:  # transition with Python 3.6+
     import collections.abc as collectionsABC
 except ImportError:
     import collections as collectionsABC
 
 
-class DictUtils(six.with_metaclass(ImmutableType)):
+_MISSING = object()
+""" Sentinel for the keys not found in a dictionary."""
+
+# The caches below are shared by all threads without a lock, evicting their least recently used glyph set when full
+# (see CacheUtils): a trie built twice by racing threads is built the same.
+_TRIE_CACHE_SIZE = 128
+""" Maximum number of glyph sets whose tries are cached (per kind of path)."""
+
+_R_TRIES = {}
+""" Tries of the read paths of glyph sets, by glyph set."""
+
+_W_TRIES = {}
+""" Tries of the write paths of glyph sets, by glyph set."""
+
+_TRACER = None
+""" Tracer of the calls to DictUtils.get, if any (see DictUtils.set_tracer)."""
+
+GlyphDiff = namedtuple("GlyphDiff", ["changed", "added", "removed"])
+"""
+    Differences between two sources for a set of glyphs: the tuples of the glyphs (in order) whose value changed,
+    which are only in the new source and which are only in the old source.
+"""
+
+
+class DictUtils(compat.with_metaclass(ImmutableType)):
     """
         Utility methods for working with glyphs and dictionaries.
     """
@@ -50,7 +77,7 @@ class DictUtils(six.with_metaclass(ImmutableType)):
             @raise TypeError: if any intermediary pieces of the path does not match the expected type found in L{source}
         """
         Mapping = collectionsABC.Mapping
-        assert isinstance(source, Mapping)
+        assert type(source) is dict or isinstance(source, Mapping)
         assert isinstance(glyph, ROGlyph)
 
         # other preconditions tested below
@@ -58,47 +85,228 @@ class DictUtils(six.with_metaclass(ImmutableType)):
         current_dict = source
         Container = collectionsABC.Container
         default_return = glyph.r_default_value
+        text_type = compat.text_type
+        missing = _MISSING
+
+        # opt-in tracing (see DictUtils.set_tracer): the time is read after each step of a sampled call.
+        tracer = _TRACER
+        times = None if tracer is None else tracer.sample(glyph)
+        if times is not None:
+            clock = compat.clock_ns
+            times.append(clock())
+
+        try:
+            for _, sub_path, source_type in glyph.iter_r_path_type:
+
+                if type(current_dict) is dict:
+                    # fast path for the exact built-in type: no ABC instance checks, one lookup per key.
+                    if source_type is not None:
+                        type_value = current_dict.get(source_type[0], missing)
+
+                        if type(type_value) is text_type:
+                            if source_type[1] != type_value:
+                                raise TypeError('Type mismatch for {} in the given dictionary'.format(sub_path))
+                        elif (type_value is missing
+                              or not isinstance(type_value, Container)  # saving the serialization cost as it is not going to work
+                              or source_type[1] != text_type(type_value)):
+                            raise TypeError('Type mismatch for {} in the given dictionary'.format(sub_path))
+
+                        if times is not None:
+                            times.append(clock())
+
+                    current_dict = current_dict.get(sub_path, missing)
+
+                    if times is not None:
+                        times.append(clock())
+
+                    if current_dict is missing:
+                        if no_default is True:
+                            raise KeyError('Could not find {} in the given dictionary'.format(sub_path))
+                        current_dict = default_return
+
+                    continue
+
+                if not isinstance(current_dict, Mapping):
+                    raise KeyError('Could not find {} in the given dictionary'.format(sub_path))
+
+                if isinstance(source_type, tuple):
+                    key = source_type[0]
+
+                    if (key not in current_dict
+                        or not isinstance(current_dict[key], Container)  # saving the serialization cost as it is not going to work
+                        or source_type[1] != text_type(current_dict[key])):
+                        raise TypeError('Type mismatch for {} in the given dictionary'.format(sub_path))
+
+                    if times is not None:
+                        times.append(clock())
+                else:
+                    assert source_type is None
+
+                # Cannot be current_dict.get() because not all collections.Mapping have get().
+                if sub_path in current_dict:
+                    current_dict = current_dict[sub_path]
+                elif no_default is True:
+                    raise KeyError('Could not find {} in the given dictionary'.format(sub_path))
+                else:
+                    current_dict = default_return
+
+                if times is not None:
+                    times.append(clock())
 
-        for _, sub_path, source_type in glyph.iter_r_path_type:
+            if (
+                current_dict == default_return  # type could be different in the case of string vs unicode.
+                or (force_none_to_default_value and current_dict is None)
+                ):
+                return default_return
 
-            if not isinstance(current_dict, Mapping):
-                raise KeyError('Could not find {} in the given dictionary'.format(sub_path))
+            t = glyph.r_translation_function
+            if t:
+                current_dict = t(current_dict)
 
-            if isinstance(source_type, tuple):
-                key = source_type[0]
+                if times is not None:
+                    times.append(clock())
 
-                if (key not in current_dict
-                    or not isinstance(current_dict[key], Container)  # saving the serialization cost as it is not going to work
-                    or source_type[1] != six.text_type(current_dict[key])):
-                    raise TypeError('Type mismatch for {} in the given dictionary'.format(sub_path))
-            else:
-                assert source_type is None
+                if (
+                    current_dict == default_return  # type could be different in the case of string vs unicode.
+                    or (force_none_to_default_value and current_dict is None)
+                    ):
+                    return default_return
 
-            # Cannot be current_dict.get() because not all collections.Mapping have get().
-            if sub_path in current_dict:
-                current_dict = current_dict[sub_path]
-            elif no_default is True:
-                raise KeyError('Could not find {} in the given dictionary'.format(sub_path))
-            else:
-                current_dict = default_return
+            return current_dict
+        except (KeyError, TypeError,):
+            if times is not None:
+                times.append(None)  # failed
+            raise
+        finally:
+            if times is not None:
+                tracer.record(glyph, times)
 
-        if (
-            current_dict == default_return  # type could be different in the case of string vs unicode.
-            or (force_none_to_default_value and current_dict is None)
-            ):
-            return default_return
+    @staticmethod
+    def get_many(source, glyphs, no_default=False, force_none_to_default_value=False):
+        """
+            Returns the tuple of the values of the given L{glyphs} (in order) stored in the given L{source}, the
+            same as calling L{DictUtils.get} for each glyph.
 
-        t = glyph.r_translation_function
-        if t:
-            current_dict = t(current_dict)
+            The read paths of L{glyphs} are walked once: shared levels are read once. The glyphs whose path is not
+            fully in L{source} (a level is missing, the types do not match...) are read again with L{DictUtils.get},
+            to get their default value or their error.
 
-            if (
-                current_dict == default_return  # type could be different in the case of string vs unicode.
-                or (force_none_to_default_value and current_dict is None)
-                ):
-                return default_return
+            @type source: collections.abc.Mapping
+            @type glyphs: collections.abc.Iterable
+            @param no_default: see L{DictUtils.get}.
+            @type no_default: bool
+            @param force_none_to_default_value: see L{DictUtils.get}.
+            @type force_none_to_default_value: bool
+
+            @rtype: tuple
+
+            @raise KeyError: see L{DictUtils.get} (for the first glyph, in order, raising an error).
+            @raise TypeError: see L{DictUtils.get} (for the first glyph, in order, raising an error).
+
+            @precondition: all(isinstance(g, ROGlyph) for g in glyphs)
+        """
+        assert type(source) is dict or isinstance(source, collectionsABC.Mapping)
+
+        glyphs = glyphs if type(glyphs) is tuple else tuple(glyphs)
+        assert all(isinstance(g, ROGlyph) for g in glyphs)
+
+        get = DictUtils.get
+
+        if _TRACER is not None:  # each glyph read on its own, so the reads are traced.
+            return tuple(get(source, g, no_default, force_none_to_default_value) for g in glyphs)
+
+        values = [_MISSING] * len(glyphs)
+        DictUtils.__get_many(DictUtils.__r_trie(glyphs).edges, source, values, [True] * len(glyphs))
+
+        missing = _MISSING
+
+        for index, g in enumerate(glyphs):
+            value = values[index]
 
-        return current_dict
+            if value is missing:
+                values[index] = get(source, g, no_default, force_none_to_default_value)
+                continue
+
+            default_return = g.r_default_value
+
+            # as DictUtils.get does with the value found.
+            if value == default_return or (force_none_to_default_value and value is None):
+                values[index] = default_return
+                continue
+
+            t = g.r_translation_function
+            if t:
+                value = t(value)
+
+                if value == default_return or (force_none_to_default_value and value is None):
+                    value = default_return
+
+            values[index] = value
+
+        return tuple(values)
+
+    @staticmethod
+    def set_tracer(tracer):
+        """
+            Installs the given L{tracer} of the calls to L{DictUtils.get} (wherever they come from), replacing the
+            one installed if any. Tracing is off by default.
+
+            For each call, C{tracer.sample(glyph)} returns C{None} if the call is not traced. Otherwise, it
+            returns a list to which the time (C{compat.clock_ns}) is appended at the start of the call and after
+            each step: the check of the types of a level (if any), the lookup of a level and the translation (if
+            any, with the comparisons to the default value). If the call raises a C{KeyError} or a C{TypeError},
+            C{None} is appended. The call then ends with C{tracer.record(glyph, times)}.
+
+            See L{GlyphTracer<glyphs.extraction.GlyphTracer.GlyphTracer>}.
+
+            @param tracer: the tracer, C{None} to stop tracing.
+
+            @return: the tracer replaced (C{None} if there was none).
+        """
+        global _TRACER
+
+        previous = _TRACER
+        _TRACER = tracer
+        return previous
+
+    @staticmethod
+    def tries(glyphs):
+        """
+            Returns the pair of the L{tries<PathTrie>} of the read paths and of the write paths of the given
+            L{glyphs} (the latter being C{None} unless they are all R/W glyphs), as compiled by the methods reading
+            or writing several glyphs at once (e.g. L{DictUtils.get_many}, L{DictUtils.delta}).
+
+            @type glyphs: collections.abc.Iterable
+
+            @rtype: tuple
+
+            @precondition: all(isinstance(g, ROGlyph) for g in glyphs)
+        """
+        glyphs = tuple(glyphs)
+        assert all(isinstance(g, ROGlyph) for g in glyphs)
+
+        return (
+                DictUtils.__r_trie(glyphs),
+                DictUtils.__w_trie(glyphs) if all(isinstance(g, RWGlyph) for g in glyphs) else None,
+                )
+
+    @staticmethod
+    def cache_tries(glyphs, r_trie, w_trie=None):
+        """
+            Caches the given tries of the glyph set L{glyphs} (see L{DictUtils.tries}), e.g. loaded from an
+            artifact, so that they are not compiled again.
+
+            @type glyphs: tuple
+            @type r_trie: PathTrie
+            @param w_trie: (Optional) the trie of the write paths, if any.
+            @type w_trie: PathTrie
+        """
+        assert isinstance(r_trie, PathTrie)
+        assert w_trie is None or isinstance(w_trie, PathTrie)
+
+        for cache, trie in ((_R_TRIES, r_trie), (_W_TRIES, w_trie)):
+            if trie is not None:
+                CacheUtils.put(cache, glyphs, trie, _TRIE_CACHE_SIZE)
 
     @staticmethod
     def in_(source, glyph):
@@ -112,17 +320,41 @@ class DictUtils(six.with_metaclass(ImmutableType)):
             @rtype: BooleanType
         """
         Mapping = collectionsABC.Mapping
-        assert isinstance(source, Mapping)
+        assert type(source) is dict or isinstance(source, Mapping)
 
         assert isinstance(glyph, ROGlyph)
         # other preconditions tested below
 
         current_dict = source
         Container = collectionsABC.Container
+        text_type = compat.text_type
+        missing = _MISSING
         iter_r_path_type = glyph.iter_r_path_type
         is_last = False
 
         for is_last, sub_path, source_type in iter_r_path_type:
+            if type(current_dict) is dict:
+                # fast path for the exact built-in type: no ABC instance checks, one lookup per key.
+                if source_type is not None:
+                    type_value = current_dict.get(source_type[0], missing)
+
+                    if type(type_value) is text_type:
+                        if source_type[1] != type_value:
+                            return False
+                    elif (
+                          type_value is missing
+                          or not isinstance(type_value, Container)  # saving the serialization cost as it is not going to work
+                          or source_type[1] != text_type(type_value)
+                          ):
+                        return False
+
+                current_dict = current_dict.get(sub_path, missing)
+
+                if current_dict is missing:
+                    return False
+
+                continue
+
             if isinstance(source_type, tuple):
                 assert len(source_type) == 2
 
@@ -131,7 +363,7 @@ class DictUtils(six.with_metaclass(ImmutableType)):
                 if (
                     key not in current_dict
                     or not isinstance(current_dict[key], Container)  # saving the serialization cost as it is not going to work
-                    or source_type[1] != six.text_type(current_dict[key])
+                    or source_type[1] != text_type(current_dict[key])
                     ):
                     return False
             else:
@@ -144,6 +376,48 @@ class DictUtils(six.with_metaclass(ImmutableType)):
 
         return is_last
 
+    @staticmethod
+    def diff(old, new, glyphs):
+        """
+            Returns the L{differences<GlyphDiff>} between L{old} and L{new} for the given L{glyphs}.
+
+            A glyph is in a source if L{DictUtils.in_} returns C{True} for it. The value of a glyph in both sources
+            changed if the values found differ and their translations (when the glyph has a L{translation
+            function<glyphs.ro.ROGlyph.ROGlyph.r_translation_function>}) differ as well.
+
+            The read paths of L{glyphs} are walked once, in both sources at once: shared levels are read once and
+            the sub dictionaries which are the same object in both sources are skipped.
+
+            @type old: collections.abc.Mapping
+            @type new: collections.abc.Mapping
+            @type glyphs: collections.abc.Iterable
+
+            @rtype: GlyphDiff
+
+            @precondition: all(isinstance(g, ROGlyph) for g in glyphs)
+        """
+        glyphs = tuple(glyphs)
+        assert all(isinstance(g, ROGlyph) for g in glyphs)
+
+        # per glyph: 1 if found in old, 2 if found in new, 3 if found in both with a different value.
+        states = [0] * len(glyphs)
+
+        DictUtils.__diff(
+                         DictUtils.__r_trie(glyphs).edges,
+                         glyphs,
+                         old,
+                         new,
+                         [True] * len(glyphs),
+                         [True] * len(glyphs),
+                         states,
+                         )
+
+        return GlyphDiff(
+                         tuple(g for g, state in compat.zip(glyphs, states) if state == 3),
+                         tuple(g for g, state in compat.zip(glyphs, states) if state == 2),
+                         tuple(g for g, state in compat.zip(glyphs, states) if state == 1),
+                         )
+
     @staticmethod
     def set(destination, glyph, value):
         """
@@ -167,6 +441,20 @@ class DictUtils(six.with_metaclass(ImmutableType)):
         if value is not None or glyph.w_allow_none:
             DictUtils.__set(destination, glyph.iter_w_path_type, value)
 
+    @staticmethod
+    def set_translated(destination, glyph, value):
+        """
+            Same as L{DictUtils.set} for a L{value} already translated (e.g. by the caller, once for several
+            payloads): the translation function of the glyph is not applied.
+
+            @type destination: collections.abc.MutableMapping
+            @type glyph: RWGlyph
+        """
+        assert isinstance(glyph, RWGlyph)
+
+        if value is not None or glyph.w_allow_none:
+            DictUtils.__set(destination, glyph.iter_w_path_type, value)
+
     @staticmethod
     def set_reset_value(destination, glyph):
         """
@@ -186,12 +474,57 @@ class DictUtils(six.with_metaclass(ImmutableType)):
         # so we have to allow the depth mismatch
         DictUtils.__set(destination, glyph.iter_reset_w_path_type, glyph.reset_value,)
 
+    @staticmethod
+    def delta(old, new, glyphs, touched=None):
+        """
+            Returns the minimal payload bringing L{old} to L{new} for the given L{glyphs}: a new dictionary
+            holding, at their L{write path and types<glyphs.rw.RWGlyph.RWGlyph.iter_w_path_type>}, the values of
+            L{new} which differ from L{old}.
+
+            The write paths of L{glyphs} are walked once, in both sources at once, and the sub dictionaries which
+            are the same object in both sources are skipped. The values are copied as is (not translated) and the
+            types of their write path are written along with them.
+
+            The values of L{old} removed from L{new} are written as resets for the L{resettable glyphs<glyphs.rw.
+            ResettableGlyph.ResettableGlyph>} (see L{DictUtils.set_reset_value}) and are left out for the other
+            glyphs, as a payload cannot express them.
+
+            @type old: collections.abc.Mapping
+            @type new: collections.abc.Mapping
+            @type glyphs: collections.abc.Iterable
+            @param touched: (Optional) tree of the key paths written into L{new} (see L{glyphs.writers.
+            TrackingMapping.TrackingMapping.touched}). If given, L{old} is ignored and the values of L{new} under
+            those key paths are the ones considered as changed.
+            @type touched: dict
+
+            @rtype: dict
+
+            @precondition: all(isinstance(g, RWGlyph) for g in glyphs)
+        """
+        glyphs = tuple(glyphs)
+        assert all(isinstance(g, RWGlyph) for g in glyphs)
+
+        payload = {}
+        removed = []
+
+        if touched is None:
+            DictUtils.__delta(DictUtils.__w_trie(glyphs).edges, old, new, None, payload, removed,)
+        elif touched:
+            DictUtils.__delta(DictUtils.__w_trie(glyphs).edges, _MISSING, new, touched, payload, removed,)
+
+        for index in sorted(removed):
+            glyph = glyphs[index]
+            if isinstance(glyph, ResettableGlyph):
+                DictUtils.set_reset_value(payload, glyph)
+
+        return payload
+
     @staticmethod
     def __set(destination, w_path_type, value,):
         """
             Sets the given L{value} in the L{destination} using L{target_source_names}.
 
-            It recursively builds the sub dictionaries if the number of source names is greater than
+            It builds the sub dictionaries if the number of source names is greater than
             one. Each name is then used as depth in the L{destination}. When on the last element
             of L{target_source_names} the key and value from L{root_type_key_values} is set and the
             method returns.
@@ -203,12 +536,12 @@ class DictUtils(six.with_metaclass(ImmutableType)):
 
             @precondition: next(w_path_type, None,) is not None
         """
-        assert isinstance(destination, collectionsABC.MutableMapping), type(destination)
+        assert type(destination) is dict or isinstance(destination, collectionsABC.MutableMapping), type(destination)
         # other preconditions tested below
 
         is_last, sub_path, type_tuple, = next(w_path_type,)
 
-        if is_last is False:
+        while is_last is False:
             sub_dict = destination.get(sub_path)
             if sub_dict is None:
                 sub_dict = {}
@@ -222,8 +555,10 @@ class DictUtils(six.with_metaclass(ImmutableType)):
                         # dev check
                         assert destination[key] == type_value
 
-            DictUtils.__set(sub_dict, w_path_type, value,)
-            return
+            destination = sub_dict
+            assert type(destination) is dict or isinstance(destination, collectionsABC.MutableMapping), type(destination)
+
+            is_last, sub_path, type_tuple, = next(w_path_type,)
 
         if type_tuple is not None:
             key, type_value, = type_tuple
@@ -236,4 +571,222 @@ class DictUtils(six.with_metaclass(ImmutableType)):
 
         destination[sub_path] = value
 
+    @staticmethod
+    def __w_trie(glyphs):
+        """
+            Returns the L{trie<PathTrie>} of the L{write paths<glyphs.rw.RWGlyph.RWGlyph.iter_w_path_type>} of the
+            given L{glyphs}, compiled once per glyph set.
+
+            @type glyphs: tuple
+
+            @rtype: PathTrie
+        """
+        trie = CacheUtils.get(_W_TRIES, glyphs)
+
+        if trie is None:
+            trie = CacheUtils.put(_W_TRIES, glyphs, PathTrie(g.iter_w_path_type for g in glyphs), _TRIE_CACHE_SIZE)
+
+        return trie
+
+    @staticmethod
+    def __r_trie(glyphs):
+        """
+            Returns the L{trie<PathTrie>} of the L{read paths<glyphs.ro.ROGlyph.ROGlyph.iter_r_path_type>} of the
+            given L{glyphs}, compiled once per glyph set.
+
+            @type glyphs: tuple
+
+            @rtype: PathTrie
+        """
+        trie = CacheUtils.get(_R_TRIES, glyphs)
+
+        if trie is None:
+            trie = CacheUtils.put(_R_TRIES, glyphs, PathTrie(g.iter_r_path_type for g in glyphs), _TRIE_CACHE_SIZE)
+
+        return trie
+
+    @staticmethod
+    def __type_matches(node, type_tuple):
+        """
+            Returns C{True} if the given L{node} holds the type described by L{type_tuple} (see L{DictUtils.get}).
+            Otherwise, returns C{False}.
+
+            @rtype: bool
+        """
+        type_value = DictUtils.__child(node, type_tuple[0])
+
+        if type(type_value) is compat.text_type:
+            return type_tuple[1] == type_value
+
+        return (
+                type_value is not _MISSING
+                and isinstance(type_value, collectionsABC.Container)  # saving the serialization cost as it is not going to work
+                and type_tuple[1] == compat.text_type(type_value)
+                )
+
+    @staticmethod
+    def __diff(edges, glyphs, old, new, old_found, new_found, states,):
+        """
+            Records in L{states} the differences between L{old} and L{new} for the given level of a read path
+            trie.
+
+            @param old_found: per path, C{False} if the types of the levels above did not match in L{old}.
+            @type old_found: list
+            @param new_found: per path, C{False} if the types of the levels above did not match in L{new}.
+            @type new_found: list
+        """
+        child = DictUtils.__child
+        type_matches = DictUtils.__type_matches
+
+        for sub_path, is_last, routes, children in edges:
+            old_value = child(old, sub_path)
+            new_value = child(new, sub_path)
+
+            same_types = True
+            for index, type_tuple in routes:
+                if type_tuple is not None:
+                    if old_found[index] and not type_matches(old, type_tuple):
+                        old_found[index] = False
+                    if new_found[index] and not type_matches(new, type_tuple):
+                        new_found[index] = False
+                if old_found[index] is not new_found[index]:
+                    same_types = False
+
+            if old_value is new_value and same_types:
+                # same object (or missing from both) and same types: nothing changed below.
+                continue
+
+            if not is_last:
+                DictUtils.__diff(children, glyphs, old_value, new_value, old_found, new_found, states,)
+                continue
+
+            for index, _ in routes:
+                in_old = old_found[index] and old_value is not _MISSING
+                in_new = new_found[index] and new_value is not _MISSING
+
+                if in_old and in_new:
+                    if old_value != new_value:
+                        t = glyphs[index].r_translation_function
+                        if t is None or t(old_value) != t(new_value):
+                            states[index] = 3
+                elif in_old:
+                    states[index] = 1
+                elif in_new:
+                    states[index] = 2
+
+    @staticmethod
+    def __get_many(edges, node, values, found):
+        """
+            Records in L{values} the values found in L{node} for the given level of a read path trie.
+
+            @param found: per path, C{False} if a level above is missing or its types did not match (the value is
+            left out).
+            @type found: list
+        """
+        child = DictUtils.__child
+        type_matches = DictUtils.__type_matches
+
+        for sub_path, is_last, routes, children in edges:
+            reached = False
+            for index, type_tuple in routes:
+                if found[index] and type_tuple is not None and not type_matches(node, type_tuple):
+                    found[index] = False
+                reached = reached or found[index]
+
+            if not reached:
+                continue
+
+            value = child(node, sub_path)
+
+            if value is _MISSING:
+                for index, _ in routes:
+                    found[index] = False
+            elif is_last:
+                for index, _ in routes:
+                    if found[index]:
+                        values[index] = value
+            else:
+                DictUtils.__get_many(children, value, values, found)
+
+    @staticmethod
+    def __child(node, key):
+        """
+            Returns the value of L{key} in L{node} if L{node} is a mapping holding it. Otherwise, returns
+            L{_MISSING}.
+        """
+        if type(node) is dict:
+            return node.get(key, _MISSING)
+
+        if isinstance(node, collectionsABC.Mapping) and key in node:
+            return node[key]
+
+        return _MISSING
+
+    @staticmethod
+    def __delta(edges, old, new, touched, payload, removed,):
+        """
+            Writes into L{payload} the values of L{new} which differ from L{old} (or which are under L{touched}
+            when it is not C{None}) for the given level of a write path trie, and adds to L{removed} the indexes of
+            the paths whose value is not in L{new} anymore.
+
+            @param touched: C{True} if all the key paths of the level were written into, a tree of the key paths
+            written into otherwise. C{None} if the values are to be compared with L{old}.
+
+            @return: the lowest index of the paths written into L{payload}, C{None} if none is.
+            @rtype: int
+        """
+        child = DictUtils.__child
+        first = None
+
+        for sub_path, is_last, routes, children in edges:
+            new_value = child(new, sub_path)
+
+            if touched is None:
+                old_value = child(old, sub_path)
+                if old_value is new_value:
+                    continue
+                sub_touched = None
+            else:
+                sub_touched = True if touched is True else touched.get(sub_path)
+                if sub_touched is None:
+                    continue
+                old_value = _MISSING
+
+            if is_last:
+                if touched is None and old_value is not _MISSING and new_value is not _MISSING and old_value == new_value:
+                    continue
+
+                if new_value is _MISSING:
+                    removed.extend(index for index, _ in routes)
+                    continue
+
+                for _, type_tuple in routes:
+                    if type_tuple is not None and type_tuple[0] not in payload:
+                        payload[type_tuple[0]] = type_tuple[1]
+
+                payload[sub_path] = new_value
+
+                index = routes[0][0]  # routes are in the order of the paths.
+                if first is None or index < first:
+                    first = index
+                continue
+
+            sub_payload = {}
+            index = DictUtils.__delta(children, old_value, new_value, sub_touched, sub_payload, removed,)
+
+            if sub_payload:
+                payload[sub_path] = sub_payload
+
+                # as with DictUtils.set for each glyph in turn, the type is the one of the first path written.
+                for route_index, type_tuple in routes:
+                    if route_index == index:
+                        if type_tuple is not None and type_tuple[0] not in payload:
+                            payload[type_tuple[0]] = type_tuple[1]
+                        break
+
+                if first is None or index < first:
+                    first = index
+
+        return first
+
     __slots__ = tuple()
@@ -0,0 +1,81 @@
+from __future__ import unicode_literals
+
+from glyphs.helpers import compat
+from glyphs.helpers.ImmutableType import ImmutableType
+from glyphs.ro.ROGlyph import ROGlyph
+from glyphs.utils.DictUtils import DictUtils
+from glyphs.utils.PredicateUtils import PredicateUtils
+
+
+class ExtractionUtils(compat.with_metaclass(ImmutableType)):
+    """
+        Utility methods for extracting the values of a set of glyphs out of a stream of sources.
+    """
+
+    @staticmethod
+    def iter_extract(sources, glyphs, predicate=None, no_default=False, force_none_to_default_value=False,
+                     interner=None):
+        """
+            Returns a new iterator through the values of the given L{glyphs} read out of each source of
+            L{sources}, as one tuple per source (in the order of L{glyphs}).
+
+            If a L{predicate<glyphs.utils.PredicateUtils.PredicateUtils>} is given, the sources not matching it
+            are dropped before any extraction takes place. The values read while evaluating the predicate are
+            reused for the extraction: no path is walked twice for the same source.
+
+            @type sources: collections.abc.Iterable
+            @type glyphs: collections.abc.Iterable
+            @param predicate: (Optional) the predicate the sources must match to be extracted.
+            @type predicate: tuple
+            @param no_default: passed to L{DictUtils.get<glyphs.utils.DictUtils.DictUtils.get>}.
+            @type no_default: bool
+            @param force_none_to_default_value: passed to L{DictUtils.get<glyphs.utils.DictUtils.DictUtils.get>}.
+            @type force_none_to_default_value: bool
+            @param interner: (Optional) interner through which the extracted strings are passed, so equal
+            strings read with the same glyph share the same object.
+            @type interner: glyphs.extraction.StringInterner.StringInterner
+
+            @rtype: collections.abc.Iterator
+
+            @raise KeyError: see L{DictUtils.get<glyphs.utils.DictUtils.DictUtils.get>}
+            @raise TypeError: see L{DictUtils.get<glyphs.utils.DictUtils.DictUtils.get>}
+
+            @precondition: all(isinstance(g, ROGlyph) for g in glyphs)
+        """
+        glyphs = tuple(glyphs)
+        assert all(isinstance(g, ROGlyph) for g in glyphs)
+
+        get = DictUtils.get
+
+        if predicate is None:
+            if interner is None:
+                for source in sources:
+                    yield tuple(get(source, g, no_default, force_none_to_default_value,) for g in glyphs)
+            else:
+                intern = interner.intern
+                for source in sources:
+                    yield tuple(intern(g, get(source, g, no_default, force_none_to_default_value,)) for g in glyphs)
+            return
+
+        matches = PredicateUtils.compile(predicate, no_default, force_none_to_default_value,)
+        unresolved = PredicateUtils.UNRESOLVED
+
+        for source in sources:
+            resolved = {}
+
+            if not matches(source, resolved):
+                continue
+
+            values = []
+            for g in glyphs:
+                value = resolved.get(g, unresolved)
+                if value is unresolved:
+                    # never resolved or could not be: reading it again either reads it or raises the error.
+                    value = get(source, g, no_default, force_none_to_default_value,)
+                if interner is not None:
+                    value = interner.intern(g, value)
+                values.append(value)
+
+            yield tuple(values)
+
+    __slots__ = tuple()
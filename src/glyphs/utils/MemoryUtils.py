@@ -0,0 +1,262 @@
+from __future__ import unicode_literals
+
+from collections import deque
+import json
+import os
+import platform
+import sys
+import types
+
+try:  # Python 3.4+
+    import tracemalloc
+except ImportError:
+    tracemalloc = None
+
+import glyphs
+from glyphs.helpers import compat
+from glyphs.helpers.ImmutableType import ImmutableType
+from glyphs.ro.ROGlyph import ROGlyph
+
+
+class MemoryUtils(compat.with_metaclass(ImmutableType)):
+    """
+        Utility methods for measuring the memory held by glyphs, glyph sets, the caches of the package and
+        extraction results, in a live process.
+
+        Sizes are measured by walking the objects and adding up their C{sys.getsizeof}, each object being counted
+        once. Classes, modules and functions (e.g. the translation functions) are shared code and are not counted.
+        When C{tracemalloc} is tracing, the report also holds the memory allocated by the code of the package.
+    """
+
+    SNAPSHOT_FORMAT = 1
+    """ Format of the reports (see L{MemoryUtils.report})."""
+
+    CACHES = (
+              ('glyphs.utils.DictUtils', '_R_TRIES',),
+              ('glyphs.utils.DictUtils', '_W_TRIES',),
+              ('glyphs.utils.BooleanUtils', '_CACHE',),
+              )
+    """ Pairs of module and name of the caches of the package."""
+
+    __SHARED_TYPES = (type, types.ModuleType, types.FunctionType, types.BuiltinFunctionType, types.MethodType,)
+
+    @staticmethod
+    def sizeof(obj, seen=None):
+        """
+            Returns the size in bytes of the given L{obj} and of all the objects it references (items of the
+            containers, attributes in C{__dict__} and C{__slots__}).
+
+            @param seen: (Optional) the identities of the objects already counted, which are not counted again.
+            Filled with the identities of the objects counted.
+            @type seen: set
+
+            @rtype: int
+        """
+        seen = set() if seen is None else seen
+        shared_types = MemoryUtils.__SHARED_TYPES
+        getsizeof = sys.getsizeof
+        total = 0
+        pending = [obj]
+
+        while pending:
+            o = pending.pop()
+            if id(o) in seen or isinstance(o, shared_types) or o is None or o is True or o is False:
+                continue
+            seen.add(id(o))
+            total += getsizeof(o)
+
+            if isinstance(o, dict):
+                pending.extend(o)
+                pending.extend(o.values())
+            elif isinstance(o, (list, tuple, set, frozenset, deque,)):
+                pending.extend(o)
+
+            d = getattr(o, '__dict__', None)
+            if type(d) is dict:
+                pending.append(d)
+
+            for cls in type(o).__mro__:
+                slots = cls.__dict__.get('__slots__', ())
+                for name in (slots,) if isinstance(slots, compat.string_types) else slots:
+                    if name.startswith('__') and not name.endswith('__'):
+                        name = '_{}{}'.format(cls.__name__.lstrip('_'), name)
+                    value = getattr(o, name, seen)  # seen is used as not-found sentinel
+                    if value is not seen:
+                        pending.append(value)
+
+        return total
+
+    @staticmethod
+    def report(glyph_sets=None, results=None, interners=None, trace_top=10):
+        """
+            Returns the report of the memory held by the given glyph sets, by the caches of the package, by the
+            given interners and by the given results. The report is a dictionary which can be dumped as JSON (see
+            L{MemoryUtils.dumps}) and compared with another one (see L{MemoryUtils.diff}):
+                - C{format}, C{glyphs_version}, C{python}: what produced the report.
+                - C{glyph_sets}: per glyph set, its number of glyphs, its size and the size of each of its glyphs
+                (keyed by their representation) on its own.
+                - C{caches}: per L{cache<MemoryUtils.CACHES>} (of the modules imported), its number of entries and
+                its size.
+                - C{interners}, C{results}: per name, the size.
+                - C{total}: the size of everything above.
+                - C{tracemalloc}: C{None} if C{tracemalloc} is not tracing. Otherwise, the current and peak sizes
+                traced, the size allocated by the files of the package and the L{trace_top} lines of the package
+                allocating the most.
+
+            Each object is counted once: in the first category referencing it, in the order above.
+
+            @param glyph_sets: (Optional) the glyph sets: a mapping of names to glyphs or a L{GlyphRegistry
+            <glyphs.registry.GlyphRegistry.GlyphRegistry>}.
+            @param results: (Optional) the results (e.g. lists of extracted values), by name.
+            @type results: collections.abc.Mapping
+            @param interners: (Optional) the L{interners<glyphs.extraction.StringInterner.StringInterner>}, by
+            name.
+            @type interners: collections.abc.Mapping
+            @param trace_top: the number of lines of the package reported when C{tracemalloc} is tracing.
+            @type trace_top: int
+
+            @rtype: dict
+        """
+        seen = set()
+        sizeof = MemoryUtils.sizeof
+
+        if glyph_sets is not None and hasattr(glyph_sets, 'glyph_set'):
+            glyph_sets = dict((name, glyph_sets.glyph_set(name)) for name in glyph_sets.names)
+
+        sets_report = {}
+        for name, glyph_set in compat.iteritems(glyph_sets or {}):
+            glyph_set = tuple(glyph_set)
+            assert all(isinstance(g, ROGlyph) for g in glyph_set)
+
+            glyphs_report = {}
+            for g in glyph_set:
+                key = repr(g)
+                suffix = 1
+                while key in glyphs_report:
+                    suffix += 1
+                    key = '{}#{}'.format(repr(g), suffix)
+                glyphs_report[key] = sizeof(g)
+
+            sets_report[name] = {
+                                 'count': len(glyph_set),
+                                 'bytes': sizeof(glyph_set, seen),
+                                 'glyphs': glyphs_report,
+                                 }
+
+        caches_report = {}
+        for module_name, name in MemoryUtils.CACHES:
+            module = sys.modules.get(module_name)  # not imported: nothing cached.
+            cache = getattr(module, name, None)
+            if cache is not None:
+                caches_report['{}.{}'.format(module_name, name)] = {
+                                                                    'entries': len(cache),
+                                                                    'bytes': sizeof(cache, seen),
+                                                                    }
+
+        interners_report = dict(
+                                (name, {'bytes': sizeof(interner, seen)})
+                                for name, interner in compat.iteritems(interners or {})
+                                )
+        results_report = dict(
+                              (name, {'bytes': sizeof(result, seen)})
+                              for name, result in compat.iteritems(results or {})
+                              )
+
+        return {
+                'format': MemoryUtils.SNAPSHOT_FORMAT,
+                'glyphs_version': glyphs.__version__,
+                'python': '{} {}'.format(platform.python_implementation(), platform.python_version()),
+                'glyph_sets': sets_report,
+                'caches': caches_report,
+                'interners': interners_report,
+                'results': results_report,
+                'total': sum(
+                             r['bytes']
+                             for category in (sets_report, caches_report, interners_report, results_report,)
+                             for r in category.values()
+                             ),
+                'tracemalloc': MemoryUtils.__trace(trace_top),
+                }
+
+    @staticmethod
+    def dumps(report):
+        """
+            Returns the JSON snapshot of the given L{report}, with sorted keys so that snapshots diff line by line.
+
+            @type report: dict
+
+            @rtype: six.text_type
+        """
+        return json.dumps(report, indent=2, sort_keys=True)
+
+    @staticmethod
+    def diff(old, new):
+        """
+            Returns the differences between the reports (or their JSON snapshots, once loaded) L{old} and L{new},
+            e.g. produced by two versions of the package: per path (the keys down to a number, joined with '/'),
+            the triplet of the old number, the new number and the difference. Numbers only in one of the reports
+            have C{None} as the other number and as the difference. Numbers which did not change are left out.
+
+            @type old: dict
+            @type new: dict
+
+            @rtype: dict
+        """
+        differences = {}
+        MemoryUtils.__diff(old, new, (), differences)
+        return differences
+
+    @staticmethod
+    def __diff(old, new, path, differences):
+        """
+            Adds to L{differences} the differences between the values L{old} and L{new} found at L{path}.
+        """
+        if isinstance(old, dict) or isinstance(new, dict):
+            old = old if isinstance(old, dict) else {}
+            new = new if isinstance(new, dict) else {}
+            for key in set(old) | set(new):
+                MemoryUtils.__diff(old.get(key), new.get(key), path + (compat.text_type(key),), differences)
+            return
+
+        numbers = compat.integer_types + (float,)
+        old = old if isinstance(old, numbers) and not isinstance(old, bool) else None
+        new = new if isinstance(new, numbers) and not isinstance(new, bool) else None
+
+        if old is None and new is None or old == new:
+            return
+
+        differences['/'.join(path)] = (old, new, None if old is None or new is None else new - old,)
+
+    @staticmethod
+    def __trace(top):
+        """
+            Returns the C{tracemalloc} part of a report (C{None} if it is not tracing).
+
+            @rtype: dict
+        """
+        if tracemalloc is None or not tracemalloc.is_tracing():
+            return None
+
+        current, peak = tracemalloc.get_traced_memory()
+        package = os.path.dirname(os.path.abspath(glyphs.__file__))
+        itself = os.path.splitext(os.path.abspath(__file__))[0]  # allocating while measuring
+        statistics = tuple(
+                           s for s in tracemalloc.take_snapshot().statistics('lineno')
+                           if os.path.abspath(s.traceback[0].filename).startswith(package)
+                           and os.path.splitext(os.path.abspath(s.traceback[0].filename))[0] != itself
+                           )
+
+        return {
+                'current': current,
+                'peak': peak,
+                'package': sum(s.size for s in statistics),
+                'top': dict(
+                            (
+                             '{}:{}'.format(os.path.relpath(s.traceback[0].filename, package), s.traceback[0].lineno),
+                             s.size,
+                             )
+                            for s in statistics[:top]
+                            ),
+                }
+
+    __slots__ = tuple()
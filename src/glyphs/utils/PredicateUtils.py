@@ -0,0 +1,290 @@
+from __future__ import unicode_literals
+
+from glyphs.helpers import compat
+from glyphs.helpers.ImmutableType import ImmutableType
+from glyphs.ro.ROGlyph import ROGlyph
+from glyphs.utils.DictUtils import DictUtils
+
+
+class PredicateUtils(compat.with_metaclass(ImmutableType)):
+    """
+        Utility methods for building predicates over glyphs and compiling them into callables.
+
+        A predicate is a plain tuple whose first element is one of the operators of this class (e.g.
+        L{PredicateUtils.EQ}). Predicates are built with the factory methods (L{PredicateUtils.eq},
+        L{PredicateUtils.and_}, etc.) and are infinitely shareable, just as glyphs are.
+    """
+
+    EQ = 'eq'
+    """ Operator of a predicate matching a value equal to a given value."""
+
+    IN = 'in'
+    """ Operator of a predicate matching a value member of a given set of values."""
+
+    RANGE = 'range'
+    """ Operator of a predicate matching a value within given bounds."""
+
+    EXISTS = 'exists'
+    """ Operator of a predicate matching a source which has the full path and types of a glyph."""
+
+    AND = 'and'
+    """ Operator of a predicate matching when all of its sub predicates match."""
+
+    OR = 'or'
+    """ Operator of a predicate matching when any of its sub predicates match."""
+
+    NOT = 'not'
+    """ Operator of a predicate matching when its sub predicate does not match."""
+
+    UNRESOLVED = object()
+    """
+        Marker stored in the resolved values for a glyph which could not be read from the source (i.e.
+        L{DictUtils.get} raised a C{KeyError} or a C{TypeError}).
+    """
+
+    @staticmethod
+    def eq(glyph, value):
+        """
+            Returns a predicate matching a source where the value read with L{glyph} is equal to L{value}.
+
+            @type glyph: ROGlyph
+
+            @rtype: tuple
+        """
+        assert isinstance(glyph, ROGlyph)
+
+        return (PredicateUtils.EQ, glyph, value,)
+
+    @staticmethod
+    def in_(glyph, values):
+        """
+            Returns a predicate matching a source where the value read with L{glyph} is one of L{values}.
+
+            @type glyph: ROGlyph
+            @param values: the accepted values.
+            @type values: collections.abc.Iterable
+
+            @rtype: tuple
+
+            @precondition: all(isinstance(v, collections.abc.Hashable) for v in values)
+        """
+        assert isinstance(glyph, ROGlyph)
+
+        return (PredicateUtils.IN, glyph, frozenset(values),)
+
+    @staticmethod
+    def range_(glyph, low=None, high=None):
+        """
+            Returns a predicate matching a source where the value read with L{glyph} is greater than or equal
+            to L{low} and strictly lower than L{high}.
+
+            @type glyph: ROGlyph
+            @param low: the inclusive lower bound. If C{None}, there is no lower bound.
+            @param high: the exclusive upper bound. If C{None}, there is no upper bound.
+
+            @rtype: tuple
+
+            @precondition: low is not None or high is not None
+        """
+        assert isinstance(glyph, ROGlyph)
+        assert low is not None or high is not None
+
+        return (PredicateUtils.RANGE, glyph, low, high,)
+
+    @staticmethod
+    def exists(glyph):
+        """
+            Returns a predicate matching a source for which L{DictUtils.in_} returns C{True} with L{glyph}.
+
+            @type glyph: ROGlyph
+
+            @rtype: tuple
+        """
+        assert isinstance(glyph, ROGlyph)
+
+        return (PredicateUtils.EXISTS, glyph,)
+
+    @staticmethod
+    def and_(*predicates):
+        """
+            Returns a predicate matching a source when all the given L{predicates} match.
+
+            @rtype: tuple
+
+            @precondition: len(predicates) > 0
+        """
+        assert predicates
+
+        return (PredicateUtils.AND, predicates,)
+
+    @staticmethod
+    def or_(*predicates):
+        """
+            Returns a predicate matching a source when any of the given L{predicates} match.
+
+            @rtype: tuple
+
+            @precondition: len(predicates) > 0
+        """
+        assert predicates
+
+        return (PredicateUtils.OR, predicates,)
+
+    @staticmethod
+    def not_(predicate):
+        """
+            Returns a predicate matching a source when the given L{predicate} does not match.
+
+            @rtype: tuple
+        """
+        return (PredicateUtils.NOT, predicate,)
+
+    @staticmethod
+    def compile(predicate, no_default=False, force_none_to_default_value=False):
+        """
+            Returns a callable evaluating the given L{predicate} against a source.
+
+            The callable takes the source and, optionally, a dictionary of the values resolved so far (keyed by
+            glyph). Each glyph is read at most once per dictionary: the values read while evaluating are stored
+            in it so they can be reused by the caller (e.g. to extract the rest of the record), and values already
+            in it are not read again. Glyphs which could not be read are stored as L{PredicateUtils.UNRESOLVED}.
+
+            The sub predicates of L{PredicateUtils.and_} and L{PredicateUtils.or_} are evaluated from the cheapest
+            to the most expensive (the deeper the path, the more expensive) and the evaluation stops as soon as
+            the outcome is known.
+
+            @param no_default: passed to L{DictUtils.get} when reading values.
+            @type no_default: bool
+            @param force_none_to_default_value: passed to L{DictUtils.get} when reading values.
+            @type force_none_to_default_value: bool
+
+            @rtype: collections.abc.Callable
+        """
+        evaluate, _ = PredicateUtils.__compile(predicate, no_default, force_none_to_default_value,)
+
+        def matches(source, resolved=None):
+            """
+                Returns C{True} if the source matches the compiled predicate. Otherwise, returns C{False}.
+
+                @type source: collections.abc.Mapping
+                @param resolved: (Optional) values resolved so far, keyed by glyph. Filled with the values
+                read during the evaluation.
+                @type resolved: dict
+
+                @rtype: bool
+            """
+            return evaluate(source, {} if resolved is None else resolved)
+
+        return matches
+
+    @staticmethod
+    def __compile(predicate, no_default, force_none_to_default_value,):
+        """
+            Returns a pair of the callable evaluating L{predicate} against a source and a dictionary of resolved
+            values, and of the estimated cost of that evaluation.
+
+            @rtype: tuple
+        """
+        assert isinstance(predicate, tuple) and predicate, predicate
+
+        operator = predicate[0]
+
+        if operator in (PredicateUtils.AND, PredicateUtils.OR):
+            compiled = sorted(
+                              (
+                               PredicateUtils.__compile(p, no_default, force_none_to_default_value,)
+                               for p in predicate[1]
+                               ),
+                              key=lambda pair: pair[1],
+                              )
+            evaluators = tuple(e for e, _ in compiled)
+            cost = sum(c for _, c in compiled)
+
+            if operator == PredicateUtils.AND:
+                def evaluate(source, resolved):
+                    for e in evaluators:
+                        if not e(source, resolved):
+                            return False
+                    return True
+            else:
+                def evaluate(source, resolved):
+                    for e in evaluators:
+                        if e(source, resolved):
+                            return True
+                    return False
+
+            return evaluate, cost
+
+        if operator == PredicateUtils.NOT:
+            sub_evaluate, cost = PredicateUtils.__compile(predicate[1], no_default, force_none_to_default_value,)
+
+            def evaluate(source, resolved):
+                return not sub_evaluate(source, resolved)
+
+            return evaluate, cost
+
+        glyph = predicate[1]
+        assert isinstance(glyph, ROGlyph)
+
+        cost = sum(1 for _ in glyph.iter_r_path_type)
+
+        if operator == PredicateUtils.EXISTS:
+            in_ = DictUtils.in_
+
+            def evaluate(source, resolved):
+                try:
+                    return in_(source, glyph)
+                except TypeError:  # a level above is not a container (e.g. a number or None)
+                    return False
+
+            return evaluate, cost
+
+        if glyph.r_translation_function is not None:
+            cost += 1
+
+        get = DictUtils.get
+        unresolved = PredicateUtils.UNRESOLVED
+
+        def resolve(source, resolved):
+            value = resolved.get(glyph, resolved)  # the dictionary itself is used as not-found sentinel
+            if value is resolved:
+                try:
+                    value = get(source, glyph, no_default, force_none_to_default_value,)
+                except (KeyError, TypeError,):
+                    value = unresolved
+                resolved[glyph] = value
+            return value
+
+        if operator == PredicateUtils.EQ:
+            expected = predicate[2]
+
+            def evaluate(source, resolved):
+                value = resolve(source, resolved)
+                return value is not unresolved and value == expected
+
+        elif operator == PredicateUtils.IN:
+            expected = predicate[2]
+
+            def evaluate(source, resolved):
+                value = resolve(source, resolved)
+                try:
+                    return value is not unresolved and value in expected
+                except TypeError:  # unhashable value
+                    return False
+
+        else:
+            assert operator == PredicateUtils.RANGE, operator
+            low, high = predicate[2], predicate[3]
+
+            def evaluate(source, resolved):
+                value = resolve(source, resolved)
+                if value is unresolved or value is None:
+                    return False
+                try:
+                    return (low is None or low <= value) and (high is None or value < high)
+                except TypeError:  # value not comparable with the bounds
+                    return False
+
+        return evaluate, cost
+
+    __slots__ = tuple()
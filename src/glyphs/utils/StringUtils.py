@@ -1,6 +1,6 @@
 from __future__ import unicode_literals
 
-import six
+from glyphs.helpers import compat
 
 
 class StringUtils(object):
@@ -18,7 +18,7 @@ class StringUtils(object):
             @postcondition: return is None or isinstance(return, six.text_type)
         """
 
-        return value if value is None else six.text_type(value)
+        return value if value is None else compat.text_type(value)
 
     @staticmethod
     def to_unicode_not_empty(value):
@@ -49,7 +49,7 @@ class StringUtils(object):
         if value is None:
             raise ValueError()
 
-        return six.text_type(value)
+        return compat.text_type(value)
 
     @staticmethod
     def to_unicode_not_empty_not_none(value):
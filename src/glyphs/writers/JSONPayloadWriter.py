@@ -0,0 +1,199 @@
+from __future__ import unicode_literals
+
+import json
+
+from glyphs.helpers import compat
+from glyphs.helpers.ImmutableObject import ImmutableObject
+from glyphs.helpers.PathTrie import PathTrie
+from glyphs.rw.RWGlyph import RWGlyph
+
+
+class JSONPayloadWriter(ImmutableObject):
+    """
+        Writer of JSON payloads from the values of a set of R/W glyphs, without building the nested dictionaries.
+
+        The written JSON parses to the same dictionary as the one built by calling L{DictUtils.set<glyphs.utils.
+        DictUtils.DictUtils.set>} for each glyph (in order) into an empty dictionary: the translation functions,
+        the types (discriminators) and whether C{None} is allowed are honoured the same way.
+    """
+
+    def __init__(self, glyphs, encoder=None):
+        """
+            Initializer for a writer.
+
+            The write paths of the L{glyphs} are compiled once into an emission plan in which the keys and types
+            are already encoded.
+
+            @type glyphs: collections.abc.Iterable
+            @param encoder: (Optional) the encoder used for the keys and values. If C{None}, an encoder with the
+            same settings as C{json.dumps} defaults is used.
+            @type encoder: json.JSONEncoder
+
+            @precondition: all(isinstance(g, RWGlyph) for g in glyphs)
+            @precondition: len(glyphs) > 0
+            @precondition: no write path of L{glyphs} is a prefix of another (as with L{DictUtils.set<glyphs.utils.
+            DictUtils.DictUtils.set>}, a value cannot be a dictionary as well).
+        """
+        glyphs = tuple(glyphs)
+        assert glyphs
+        assert all(isinstance(g, RWGlyph) for g in glyphs)
+
+        if encoder is None:
+            encoder = json.JSONEncoder()
+
+        encode = encoder.encode
+        key_separator = encoder.key_separator
+
+        def compile_edges(edges):
+            return tuple(
+                         (
+                          encode(e.sub_path) + key_separator,
+                          e.is_last,
+                          tuple(
+                                (index, None if t is None else (t[0], encode(t[0]) + key_separator + encode(t[1])),)
+                                for index, t in e.routes
+                                ),
+                          compile_edges(e.children),
+                          # bit mask of the glyphs written below the key: it is written if any of their values is.
+                          sum(1 << index for index, _ in e.routes),
+                          )
+                         for e in edges
+                         )
+
+        self.__dict__["__glyphs"] = glyphs
+        self.__dict__["__plan"] = compile_edges(PathTrie(g.iter_w_path_type for g in glyphs).edges)
+        self.__dict__["__encoder"] = encoder  # rather than its bound method, which Python 2 cannot pickle.
+        self.__dict__["__item_separator"] = encoder.item_separator
+
+    @property
+    def glyphs(self):
+        """
+            Returns the glyphs written by this writer, in order.
+
+            @rtype: tuple
+        """
+        return self.__dict__["__glyphs"]
+
+    def dumps(self, values):
+        """
+            Returns the JSON payload of the given L{values}.
+
+            @param values: the values to write, keyed by glyph. The glyphs of this writer missing from L{values}
+            are not written.
+            @type values: collections.abc.Mapping
+
+            @rtype: six.text_type
+        """
+        return ''.join(self.__iter_chunks(values))
+
+    def write(self, values, fp, encoding=None):
+        """
+            Writes the JSON payload of the given L{values} into the file-like object L{fp}, chunk by chunk as it
+            is produced.
+
+            @param values: the values to write, keyed by glyph. The glyphs of this writer missing from L{values}
+            are not written.
+            @type values: collections.abc.Mapping
+            @param fp: the file-like object written into. Text is written into it unless an L{encoding} is given.
+            @param encoding: (Optional) encoding of the bytes written into L{fp}.
+            @type encoding: six.text_type
+        """
+        write = fp.write
+
+        if encoding is None:
+            text_type = compat.text_type  # Python 2: the encoder may return native strings
+            for chunk in self.__iter_chunks(values):
+                write(text_type(chunk))
+        else:
+            for chunk in self.__iter_chunks(values):
+                write(chunk.encode(encoding))
+
+    def __iter_chunks(self, values):
+        """
+            Returns an iterator through the text chunks making up the JSON payload of the given L{values}, produced
+            as it is iterated.
+
+            @rtype: collections.abc.Iterator
+        """
+        glyphs = self.__dict__["__glyphs"]
+        present = [False] * len(glyphs)
+        translated = [None] * len(glyphs)
+        missing = present  # any private object will do
+        mask = 0  # bit mask of the present values
+
+        for index, glyph in enumerate(glyphs):
+            value = values.get(glyph, missing)
+
+            if value is missing:
+                continue
+
+            if glyph.w_translation_function:
+                value = glyph.w_translation_function(value)
+
+            if value is not None or glyph.w_allow_none:
+                present[index] = True
+                translated[index] = value
+                mask |= 1 << index
+
+        if not mask:
+            return iter(('{}',))
+
+        return self.__iter_object(self.__dict__["__plan"], present, mask, translated)
+
+    def __iter_object(self, plan, present, mask, translated):
+        """
+            Returns an iterator through the text chunks of the JSON object of the given level of the L{plan}.
+
+            @param mask: bit mask of the L{present} values.
+            @type mask: int
+
+            @precondition: any(edge[4] & mask for edge in plan)
+        """
+        encode = self.__dict__["__encoder"].encode
+        item_separator = self.__dict__["__item_separator"]
+        separator = '{'  # before the first item, then between items
+        written_types = None
+
+        for encoded_key, is_last, routes, children, below in plan:
+            if not below & mask:
+                continue
+
+            if is_last:
+                value_index = None
+
+                for index, encoded_type in routes:
+                    if not present[index]:
+                        continue
+
+                    value_index = index
+
+                    if encoded_type is not None:
+                        if written_types is None:
+                            written_types = set()
+                        if encoded_type[0] not in written_types:
+                            written_types.add(encoded_type[0])
+                            yield separator + encoded_type[1]
+                            separator = item_separator
+
+                yield separator + encoded_key + encode(translated[value_index])
+                separator = item_separator
+                continue
+
+            yield separator + encoded_key
+            separator = item_separator
+
+            for chunk in self.__iter_object(children, present, mask, translated):
+                yield chunk
+
+            # the type is written by the first value creating the nested object.
+            for index, encoded_type in routes:
+                if present[index]:
+                    if encoded_type is not None:
+                        if written_types is None:
+                            written_types = set()
+                        if encoded_type[0] not in written_types:
+                            written_types.add(encoded_type[0])
+                            yield item_separator + encoded_type[1]
+                    break
+
+        yield '}'
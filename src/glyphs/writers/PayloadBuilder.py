@@ -0,0 +1,136 @@
+from __future__ import unicode_literals
+
+from glyphs.helpers.ImmutableObject import ImmutableObject
+from glyphs.helpers.PathTrie import PathTrie
+from glyphs.rw.RWGlyph import RWGlyph
+from glyphs.rw.ResettableGlyph import ResettableGlyph
+
+
+class PayloadBuilder(ImmutableObject):
+    """
+        Builder of payloads mixing values and resets of a set of R/W glyphs, compiled once and reusable across
+        entities.
+
+        The write paths of all the glyphs and the reset paths of the L{resettable glyphs<glyphs.rw.ResettableGlyph.
+        ResettableGlyph>} are merged into a single trie: building a payload walks each shared level once and checks
+        each type (discriminator) once per level.
+
+        A payload is the same as the one built by calling L{DictUtils.set<glyphs.utils.DictUtils.DictUtils.set>}
+        for each value (in the order of the glyphs) and then L{DictUtils.set_reset_value<glyphs.utils.DictUtils.
+        DictUtils.set_reset_value>} for each reset (in the order of the glyphs) into an empty dictionary.
+    """
+
+    def __init__(self, glyphs):
+        """
+            Initializer for a builder.
+
+            @type glyphs: collections.abc.Iterable
+
+            @precondition: all(isinstance(g, RWGlyph) for g in glyphs)
+            @precondition: len(glyphs) > 0
+            @precondition: no write or reset path of L{glyphs} is a prefix of another (as with L{DictUtils.set
+            <glyphs.utils.DictUtils.DictUtils.set>}, a value cannot be a dictionary as well).
+        """
+        glyphs = tuple(glyphs)
+        assert glyphs
+        assert all(isinstance(g, RWGlyph) for g in glyphs)
+
+        resettable_glyphs = tuple(g for g in glyphs if isinstance(g, ResettableGlyph))
+        paths = [g.iter_w_path_type for g in glyphs]
+        paths.extend(g.iter_reset_w_path_type for g in resettable_glyphs)
+
+        self.__dict__["__glyphs"] = glyphs
+        self.__dict__["__reset_indexes"] = dict(
+                                                (g, index)
+                                                for index, g in enumerate(resettable_glyphs, len(glyphs))
+                                                )
+        self.__dict__["__route_count"] = len(paths)
+        self.__dict__["__plan"] = PathTrie(paths).edges
+
+    @property
+    def glyphs(self):
+        """
+            Returns the glyphs of this builder, in order.
+
+            @rtype: tuple
+        """
+        return self.__dict__["__glyphs"]
+
+    def build(self, values, resets=tuple()):
+        """
+            Returns a new payload holding the given L{values} and L{resets}.
+
+            @param values: the values to write, keyed by glyph. The glyphs of this builder missing from L{values}
+            are not written.
+            @type values: collections.abc.Mapping
+            @param resets: the glyphs whose reset value is written.
+            @type resets: collections.abc.Iterable
+
+            @rtype: dict
+
+            @precondition: all(isinstance(g, ResettableGlyph) and g in self.glyphs for g in resets)
+        """
+        route_count = self.__dict__["__route_count"]
+        present = [False] * route_count
+        translated = [None] * route_count
+        missing = present  # any private object will do
+
+        for index, glyph in enumerate(self.__dict__["__glyphs"]):
+            value = values.get(glyph, missing)
+
+            if value is missing:
+                continue
+
+            if glyph.w_translation_function:
+                value = glyph.w_translation_function(value)
+
+            if value is not None or glyph.w_allow_none:
+                present[index] = True
+                translated[index] = value
+
+        reset_indexes = self.__dict__["__reset_indexes"]
+        for glyph in resets:
+            index = reset_indexes[glyph]
+            present[index] = True
+            translated[index] = glyph.reset_value
+
+        payload = {}
+        PayloadBuilder.__build(self.__dict__["__plan"], present, translated, payload)
+        return payload
+
+    @staticmethod
+    def __build(plan, present, translated, destination):
+        """
+            Writes into L{destination} the given level of the L{plan}.
+        """
+        for sub_path, is_last, routes, children in plan:
+
+            if is_last:
+                value_index = None
+
+                for index, type_tuple in routes:
+                    if present[index]:
+                        value_index = index
+
+                        if type_tuple is not None and type_tuple[0] not in destination:
+                            destination[type_tuple[0]] = type_tuple[1]
+
+                if value_index is not None:
+                    destination[sub_path] = translated[value_index]
+
+                continue
+
+            # the nested dictionary (and its type) is created by the first value below it.
+            for index, type_tuple in routes:
+                if present[index]:
+                    break
+            else:
+                continue
+
+            sub_dict = {}
+            destination[sub_path] = sub_dict
+
+            if type_tuple is not None and type_tuple[0] not in destination:
+                destination[type_tuple[0]] = type_tuple[1]
+
+            PayloadBuilder.__build(children, present, translated, sub_dict)
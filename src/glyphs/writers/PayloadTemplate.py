@@ -0,0 +1,141 @@
+from __future__ import unicode_literals
+
+from glyphs.helpers import compat
+from glyphs.helpers.ImmutableObject import ImmutableObject
+from glyphs.rw.RWGlyph import RWGlyph
+from glyphs.utils.DictUtils import DictUtils
+
+
+class _Slot(object):
+    """
+        Place of the value of a glyph in the skeleton of a template.
+    """
+
+    def __init__(self, index):
+        self.index = index
+
+    __slots__ = ('index',)
+
+
+class PayloadTemplate(ImmutableObject):
+    """
+        Template of the payloads written with a set of R/W glyphs, for building the same shape of payload over and
+        over.
+
+        The skeleton of the payload (its nested dictionaries, the types written along the values and the order of
+        the keys) is worked out once, when the template is compiled, and turned into a function building the whole
+        payload at once: one dictionary per level and nothing else, no lookup of the keys already written.
+
+        A payload is the same, key order included, as the one built by calling L{DictUtils.set<glyphs.utils.
+        DictUtils.DictUtils.set>} for each value (in the order of the glyphs) into an empty dictionary. When a value
+        is C{None} (after translation) and its glyph does not allow it, the payload has another shape: it is built
+        that way instead.
+    """
+
+    def __init__(self, glyphs):
+        """
+            Initializer for a template.
+
+            @type glyphs: collections.abc.Iterable
+
+            @precondition: all(isinstance(g, RWGlyph) for g in glyphs)
+            @precondition: len(glyphs) > 0
+            @precondition: no write path of L{glyphs} is a prefix of another (as with L{DictUtils.set<glyphs.utils.
+            DictUtils.DictUtils.set>}, a value cannot be a dictionary as well).
+        """
+        glyphs = tuple(glyphs)
+        assert glyphs
+        assert all(isinstance(g, RWGlyph) for g in glyphs)
+
+        # the skeleton is written as the payloads would be, with the places of the values instead of the values.
+        skeleton = {}
+        for index, g in enumerate(glyphs):
+            DictUtils.set_translated(skeleton, g, _Slot(index))
+
+        self.__dict__["__glyphs"] = glyphs
+        self.__dict__["__translations"] = tuple(
+                                                (index, g.w_translation_function)
+                                                for index, g in enumerate(glyphs)
+                                                if g.w_translation_function
+                                                )
+        self.__dict__["__build"] = PayloadTemplate.__compile(
+                                                             skeleton,
+                                                             tuple(i for i, g in enumerate(glyphs) if not g.w_allow_none),
+                                                             )
+
+    @property
+    def glyphs(self):
+        """
+            Returns the glyphs of this template, in order.
+
+            @rtype: tuple
+        """
+        return self.__dict__["__glyphs"]
+
+    def build(self, values):
+        """
+            Returns a new payload holding the given L{values}.
+
+            @param values: the value of each glyph, in the order of the glyphs.
+            @type values: collections.abc.Sequence
+
+            @rtype: dict
+
+            @precondition: len(values) == len(self.glyphs)
+        """
+        assert len(values) == len(self.__dict__["__glyphs"])
+
+        translations = self.__dict__["__translations"]
+        if translations:
+            values = list(values)
+            for index, t in translations:
+                values[index] = t(values[index])
+
+        payload = self.__dict__["__build"](values)
+
+        if payload is None:  # a value is left out: another shape.
+            payload = {}
+            set_translated = DictUtils.set_translated
+            for g, value in compat.zip(self.__dict__["__glyphs"], values):
+                set_translated(payload, g, value)
+
+        return payload
+
+    @staticmethod
+    def __compile(skeleton, required):
+        """
+            Returns the function building a payload with the given L{skeleton} out of the (translated) values. The
+            function returns C{None} if any of the values at the indexes of L{required} is C{None}.
+
+            @rtype: collections.abc.Callable
+        """
+        namespace = {}
+
+        def expression(node):
+            items = []
+            for key, value in compat.iteritems(node):
+                key_name = '_k{}'.format(len(namespace))
+                namespace[key_name] = key
+
+                if isinstance(value, dict):
+                    value = expression(value)
+                elif isinstance(value, _Slot):
+                    value = 'v[{}]'.format(value.index)
+                else:
+                    name = '_c{}'.format(len(namespace))
+                    namespace[name] = value
+                    value = name
+
+                items.append('{}: {}'.format(key_name, value))
+
+            return '{' + ', '.join(items) + '}'
+
+        lines = ['def build(v):']
+        if required:
+            lines.append('    if ' + ' or '.join('v[{}] is None'.format(i) for i in required) + ':')
+            lines.append('        return None')
+        lines.append('    return ' + expression(skeleton))
+
+        # only names and indexes go into the source: keys and types are bound as globals of the function.
+        exec(compile('\n'.join(lines), '<PayloadTemplate>', 'exec'), namespace)
+        return namespace['build']
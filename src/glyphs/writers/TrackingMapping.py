@@ -0,0 +1,118 @@
+from __future__ import unicode_literals
+
+try:  # transition with Python 3.6+
+    import collections.abc as collectionsABC
+except ImportError:
+    import collections as collectionsABC
+
+from glyphs.utils.DictUtils import DictUtils
+
+
+class TrackingMapping(collectionsABC.MutableMapping):
+    """
+        Mutable mapping wrapping another one and recording the key paths written into it, at any depth.
+
+        Writing through the wrapper (e.g. with L{DictUtils.set<glyphs.utils.DictUtils.DictUtils.set>} or
+        L{DictUtils.set_reset_value<glyphs.utils.DictUtils.DictUtils.set_reset_value>}) records the key path of
+        the write, so that only the values which changed can be sent back: see L{TrackingMapping.delta}.
+
+        The nested mutable mappings are wrapped when read through the wrapper. A new value written under a key
+        records the whole value as changed, including whatever is written into it afterwards.
+    """
+
+    def __init__(self, data, _path=tuple(), _touched=None):
+        """
+            Initializer for a tracking mapping.
+
+            @param data: the wrapped mapping.
+            @type data: collections.abc.MutableMapping
+        """
+        assert type(data) is dict or isinstance(data, collectionsABC.MutableMapping)
+
+        self.__data = data
+        self.__path = _path
+        self.__touched = {} if _touched is None else _touched
+
+    @property
+    def data(self):
+        """
+            Returns the wrapped mapping.
+
+            @rtype: collections.abc.MutableMapping
+        """
+        return self.__data
+
+    @property
+    def touched(self):
+        """
+            Returns the tree of the key paths written into: each key maps to C{True} if it was written into, or to
+            the tree of the key paths written into below it.
+
+            The tree is shared by all the wrappers of the same root mapping.
+
+            @rtype: dict
+        """
+        return self.__touched
+
+    def delta(self, glyphs):
+        """
+            Returns the minimal payload holding, for the given L{glyphs}, the values written into the wrapped
+            mapping along with the types of their write path.
+
+            @type glyphs: collections.abc.Iterable
+
+            @rtype: dict
+
+            @see: L{DictUtils.delta<glyphs.utils.DictUtils.DictUtils.delta>}
+        """
+        return DictUtils.delta(None, self.__data, glyphs, touched=self.__touched,)
+
+    def clear_touched(self):
+        """
+            Forgets all the key paths written into so far (e.g. once the delta was sent).
+        """
+        self.__touched.clear()
+
+    def __touch(self, key):
+        """
+            Records the key path of the given L{key} as written into.
+        """
+        tree = self.__touched
+
+        for sub_path in self.__path:
+            sub_tree = tree.get(sub_path)
+            if sub_tree is True:
+                return  # already recorded as a whole
+            if sub_tree is None:
+                sub_tree = tree[sub_path] = {}
+            tree = sub_tree
+
+        tree[key] = True
+
+    def __getitem__(self, key):
+        value = self.__data[key]
+
+        if type(value) is dict or isinstance(value, collectionsABC.MutableMapping):
+            return TrackingMapping(value, self.__path + (key,), self.__touched)
+
+        return value
+
+    def __setitem__(self, key, value):
+        self.__data[key] = value
+        self.__touch(key)
+
+    def __delitem__(self, key):
+        del self.__data[key]
+        self.__touch(key)
+
+    def __contains__(self, key):
+        return key in self.__data
+
+    def __iter__(self):
+        return iter(self.__data)
+
+    def __len__(self):
+        return len(self.__data)
+
+    def __repr__(self):
+        return "{}({!r})".format(self.__class__.__name__, self.__data)
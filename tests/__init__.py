@@ -0,0 +1,11 @@
+"""
+    Tests of the package, run from the root of the repository with C{python -m pytest tests} or C{python -m unittest
+    discover tests}. The package is imported from C{src}.
+"""
+import os
+import sys
+
+SRC = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src')
+
+if SRC not in sys.path:
+    sys.path.insert(0, SRC)
@@ -0,0 +1,96 @@
+"""
+    Random sources, paths and glyphs shared by the tests comparing the package against a simpler implementation.
+    All of them take the C{random.Random} to draw from, so that each test is reproducible from its seed.
+"""
+from __future__ import unicode_literals
+
+import tests  # noqa: F401 (puts src on the path)
+
+from glyphs.rw.RWGlyph import RWGlyph
+
+
+KEYS = ('a', 'b', 't')
+""" Keys of the random sources and paths, by default."""
+
+LEAVES = (1, 'x', '1', None)
+""" Values of the random sources which are not dictionaries, by default."""
+
+
+def random_source(r, keys=KEYS, leaves=LEAVES, probability=0.7, depth=0):
+    """
+        Returns a random source: one of the L{leaves}, or a dictionary of some of the L{keys} (each one with the
+        given L{probability}) to random sources, up to 4 levels deep.
+    """
+    if depth > 3 or r.random() < 0.3:
+        return r.choice(leaves)
+    return dict((k, random_source(r, keys, leaves, probability, depth + 1)) for k in keys if r.random() < probability)
+
+
+def mutate(r, value, keys=KEYS, leaves=LEAVES, add_probability=0, depth=0):
+    """
+        Returns a random mutation of the given source L{value}: values replaced by random sources, keys removed and
+        (with the given L{add_probability} per dictionary) keys set. Half of the dictionaries are returned as they
+        are (the same object), the others are copied before being mutated.
+    """
+    if not isinstance(value, dict):
+        return random_source(r, keys, leaves, depth=depth) if r.random() < 0.3 else value
+    if r.random() < 0.5:
+        return value  # the same object
+
+    value = dict(value)
+    for k in list(value):
+        if r.random() < 0.1:
+            del value[k]
+        else:
+            value[k] = mutate(r, value[k], keys, leaves, add_probability, depth + 1)
+    if add_probability and r.random() < add_probability:
+        value[r.choice(keys)] = random_source(r, keys, leaves, depth=depth + 1)
+    return value
+
+
+def random_path(r, keys=KEYS, max_depth=4):
+    """
+        Returns a random path (tuple) of 1 to L{max_depth} of the L{keys}.
+    """
+    return tuple(r.choice(keys) for _ in range(r.randint(1, max_depth)))
+
+
+def random_types(r, path, types):
+    """
+        Returns random types (tuple) for the levels of the given L{path}, each one of the given L{types}.
+    """
+    return tuple(r.choice(types) for _ in path)
+
+
+def fits(path, paths, same=False):
+    """
+        Returns C{True} if the value of the given L{path} can be written along the values of the given L{paths}: none
+        of them is a prefix of the other, as a value cannot be a dictionary as well. If L{same}, L{path} may be one
+        of L{paths}.
+    """
+    return not any((not same or p != path) and (p[:len(path)] == path or path[:len(p)] == p) for p in paths)
+
+
+def random_rw_glyphs(r, translation_functions=(None,), same=False, count=8):
+    """
+        Returns a list of up to L{count} random R/W glyphs whose values can be written together (see L{fits}), with
+        random types, some of them allowing C{None} and each one with one of the L{translation_functions}.
+    """
+    glyphs = []
+    paths = set()
+
+    for _ in range(r.randint(1, count)):
+        path = random_path(r, 'abc')
+        if not fits(path, paths, same):
+            continue
+        paths.add(path)
+
+        types = random_types(r, path, (None, 't:x', 'u:y'))
+        glyphs.append(RWGlyph(
+                              path,
+                              w_types=types if any(types) else None,
+                              w_allow_none=r.random() < 0.3,
+                              w_translation_function=r.choice(translation_functions),
+                              ))
+
+    return glyphs
@@ -0,0 +1,84 @@
+from __future__ import unicode_literals
+
+import threading
+import unittest
+
+import tests  # noqa: F401 (puts src on the path)
+
+from glyphs.helpers.CacheUtils import CacheUtils
+from glyphs.utils.BooleanUtils import BooleanUtils
+
+
+class CacheUtilsTest(unittest.TestCase):
+    """
+        Bounded caches evicting their least recently used entries.
+    """
+
+    def test_get_put(self):
+        cache = {}
+        self.assertIsNone(CacheUtils.get(cache, 'a'))
+        self.assertEqual(CacheUtils.put(cache, 'a', 1, 4), 1)
+        self.assertEqual(CacheUtils.get(cache, 'a'), 1)
+
+        # replacing a value of a full cache evicts nothing.
+        for k in 'bcd':
+            CacheUtils.put(cache, k, k, 4)
+        CacheUtils.put(cache, 'a', 2, 4)
+        self.assertEqual(sorted(cache), ['a', 'b', 'c', 'd'])
+        self.assertEqual(CacheUtils.get(cache, 'a'), 2)
+
+    def test_eviction(self):
+        cache = {}
+        for i in range(8):
+            CacheUtils.put(cache, i, i, 8)
+
+        # used since cached: the most recently used ones.
+        for i in (0, 1, 2):
+            CacheUtils.get(cache, i)
+
+        # the least recently used quarter is evicted, not the whole cache.
+        CacheUtils.put(cache, 8, 8, 8)
+        self.assertEqual(sorted(cache), [0, 1, 2, 5, 6, 7, 8])
+
+        CacheUtils.put(cache, 9, 9, 8)
+        self.assertEqual(len(cache), 8)
+        CacheUtils.put(cache, 10, 10, 8)
+        self.assertEqual(sorted(cache), [0, 1, 2, 7, 8, 9, 10])
+
+        # a cache of a single entry.
+        cache = {}
+        CacheUtils.put(cache, 'a', 1, 1)
+        CacheUtils.put(cache, 'b', 2, 1)
+        self.assertEqual(list(cache), ['b'])
+
+    def test_threads(self):
+        cache = {}
+        errors = []
+
+        def run(offset):
+            try:
+                for i in range(2000):
+                    key = (offset + i) % 50
+                    value = CacheUtils.get(cache, key)
+                    if value is None:
+                        value = CacheUtils.put(cache, key, key * 2, 16)
+                    assert value == key * 2
+            except Exception as e:  # reported by the main thread
+                errors.append(e)
+
+        threads = [threading.Thread(target=run, args=(t * 7,)) for t in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        self.assertEqual(errors, [])
+        self.assertLessEqual(len(cache), 16 + len(threads))
+
+    def test_boolean_utils(self):
+        # cached along with the type: 1 and True are different values.
+        self.assertIs(BooleanUtils.to_boolean('True'), True)
+        self.assertIs(BooleanUtils.to_boolean('no'), False)
+        self.assertIs(BooleanUtils.to_boolean(True), True)
+        self.assertIs(BooleanUtils.to_boolean(1), False)
+        self.assertIs(BooleanUtils.to_boolean(True), True)
@@ -0,0 +1,107 @@
+from __future__ import unicode_literals
+
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+import tests  # noqa: F401 (puts src on the path)
+
+from glyphs.extraction.ColumnCache import ColumnCache
+from glyphs.extraction.GlyphColumn import GlyphColumn
+from glyphs.ro.ROGlyph import ROGlyph
+
+
+class ColumnCacheTest(unittest.TestCase):
+    """
+        Extraction of the columns of a NDJSON file, and their cache.
+    """
+
+    RECORDS = (
+               {'key': 'X-1', 'fields': {'id': '3'}},
+               {'key': 'X-2', 'fields': {'id': None}},
+               {'fields': {'id': '5'}},
+               {'key': None, 'fields': {}},
+               )
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'records.ndjson')
+        self.cache = ColumnCache(os.path.join(self.directory, 'cache'))
+        self.write_records(ColumnCacheTest.RECORDS)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def write_records(self, records):
+        with open(self.path, 'wb') as f:
+            for record in records:
+                f.write(json.dumps(record).encode('utf-8') + b'\n\n')  # blank lines are skipped
+
+    def read(self, glyphs, **kwargs):
+        """
+            Returns, per column of the given L{glyphs}, the pair of its values and of its mask.
+        """
+        columns = self.cache.columns(self.path, glyphs, **kwargs)
+        try:
+            return [(list(c), list(bytearray(c.mask))) for c in columns]
+        finally:
+            for c in columns:
+                c.close()
+
+    def column_files(self):
+        return sorted(
+                      name
+                      for _, _, names in os.walk(self.cache.directory)
+                      for name in names
+                      if name.endswith(ColumnCache.COLUMN_SUFFIX)
+                      )
+
+    def test_columns(self):
+        valid, null, missing = GlyphColumn.VALID, GlyphColumn.NULL, GlyphColumn.MISSING
+        glyphs = (ROGlyph('key'), ROGlyph('fields>id', r_translation_function=int))
+
+        self.assertEqual(
+                         self.read(glyphs),
+                         [
+                          (['X-1', 'X-2', None, None], [valid, valid, null, null]),  # the default value for X-3
+                          ([3, None, 5, None], [valid, null, valid, null]),
+                          ],
+                         )
+        expected = [
+                    (['X-1', 'X-2', None, None], [valid, valid, missing, null]),
+                    ([3, None, 5, None], [valid, null, valid, missing]),
+                    ]
+        self.assertEqual(self.read(glyphs, no_default=True), expected)
+        self.assertEqual(len(self.column_files()), 4)
+
+        # read back from the cache: the same columns, no new file.
+        self.assertEqual(self.read(glyphs, no_default=True), expected)
+        self.assertEqual(len(self.column_files()), 4)
+
+    def test_file_modified(self):
+        glyphs = (ROGlyph('key'),)
+        self.read(glyphs)
+
+        self.write_records(ColumnCacheTest.RECORDS[:2])
+        os.utime(self.path, (0, 0))
+
+        self.assertEqual(self.read(glyphs), [(['X-1', 'X-2'], [GlyphColumn.VALID, GlyphColumn.VALID])])
+
+    def test_translation_error(self):
+        # the errors of the translation functions are raised rather than cached as missing values.
+        glyphs = (ROGlyph('key'), ROGlyph('fields>id', r_translation_function=int))
+
+        for value, error in (([], TypeError), ('x', ValueError)):
+            self.write_records(ColumnCacheTest.RECORDS + ({'fields': {'id': value}},))
+            with self.assertRaises(error):
+                self.read(glyphs)
+            self.assertEqual(self.column_files(), [])
+
+    def test_type_mismatch(self):
+        glyphs = (ROGlyph('fields>id', r_types='xsi:Status>'),)
+
+        with self.assertRaises(TypeError):
+            self.read(glyphs)
+        self.assertEqual(self.column_files(), [])
@@ -0,0 +1,208 @@
+from __future__ import unicode_literals
+
+import random
+import unittest
+
+try:  # transition with Python 3.6+
+    import collections.abc as collectionsABC
+except ImportError:
+    import collections as collectionsABC
+
+import tests  # noqa: F401 (puts src on the path)
+from tests.generators import random_path, random_source, random_types
+
+from glyphs.ro.ROGlyph import ROGlyph
+from glyphs.rw.RWGlyph import RWGlyph
+from glyphs.utils.DictUtils import DictUtils
+
+
+class _Mapping(collectionsABC.MutableMapping):
+    """
+        Mapping which is not a C{dict}: read and written through the generic path of L{DictUtils}.
+    """
+
+    def __init__(self, items):
+        self.__items = items
+
+    def __getitem__(self, key):
+        return self.__items[key]
+
+    def __setitem__(self, key, value):
+        self.__items[key] = value
+
+    def __delitem__(self, key):
+        del self.__items[key]
+
+    def __iter__(self):
+        return iter(self.__items)
+
+    def __len__(self):
+        return len(self.__items)
+
+
+def _as_mapping(value):
+    """
+        Returns a copy of L{value} in which all the dictionaries are L{_Mapping}s.
+    """
+    if isinstance(value, dict):
+        return _Mapping(dict((k, _as_mapping(v)) for k, v in value.items()))
+    return value
+
+
+def _as_dict(value):
+    """
+        Returns a copy of L{value} in which all the mappings are dictionaries.
+    """
+    if isinstance(value, collectionsABC.Mapping):
+        return dict((k, _as_dict(v)) for k, v in value.items())
+    return value
+
+
+def _translate(value):
+    return 'translated', _as_dict(value)
+
+
+def _raise(error):
+    raise error
+
+
+def _outcome(function, *args):
+    """
+        Returns the result of the call (its mappings as dictionaries), or the type and message of the error it
+        raised.
+    """
+    try:
+        return 'ok', _as_dict(function(*args))
+    except (KeyError, TypeError) as e:
+        return type(e), str(e)
+
+
+class DictUtilsTest(unittest.TestCase):
+    """
+        L{DictUtils} on a few sources and glyphs, through the fast path for C{dict} sources and the generic path for
+        other mappings.
+    """
+
+    SOURCE = {'key': 'X-1', 'fields': {'xsi': 'Status', 'status': {'id': '3'}, 'labels': None}}
+
+    def assertOutcomes(self, function, *args):
+        """
+            Asserts the outcome of the call to L{function} with the source, then with the source as a L{_Mapping},
+            is the last of the L{args}.
+        """
+        args, expected = args[:-1], args[-1]
+        for source in (DictUtilsTest.SOURCE, _as_mapping(DictUtilsTest.SOURCE)):
+            self.assertEqual(_outcome(function, source, *args), expected)
+
+    def test_get(self):
+        status = ROGlyph('fields>status>id', r_types='>xsi:Status', r_translation_function=int)
+        self.assertOutcomes(DictUtils.get, status, ('ok', 3))
+        self.assertOutcomes(DictUtils.get, ROGlyph('key'), ('ok', 'X-1'))
+
+        # the last level is missing: the default value, unless all the levels are required.
+        name = ROGlyph('fields>status>name', r_default_value='none')
+        self.assertOutcomes(DictUtils.get, name, ('ok', 'none'))
+        missing_name = _outcome(_raise, KeyError('Could not find name in the given dictionary'))
+        self.assertOutcomes(DictUtils.get, name, True, missing_name)
+
+        # an intermediary level is missing (read as the default value) or is not a mapping.
+        missing_id = _outcome(_raise, KeyError('Could not find id in the given dictionary'))
+        self.assertOutcomes(DictUtils.get, ROGlyph('fields>other>id'), missing_id)
+        self.assertOutcomes(DictUtils.get, ROGlyph('key>id'), missing_id)
+
+        # the type of a level does not match.
+        user = ROGlyph('fields>status>id', r_types='>xsi:User')
+        self.assertOutcomes(DictUtils.get, user, (TypeError, 'Type mismatch for status in the given dictionary'))
+
+        # None read as it is, or replaced by the default value.
+        labels = ROGlyph('fields>labels', r_default_value='none')
+        self.assertOutcomes(DictUtils.get, labels, ('ok', None))
+        self.assertOutcomes(DictUtils.get, labels, False, True, ('ok', 'none'))
+
+    def test_in(self):
+        self.assertOutcomes(DictUtils.in_, ROGlyph('fields>status>id', r_types='>xsi:Status'), ('ok', True))
+        self.assertOutcomes(DictUtils.in_, ROGlyph('fields>labels'), ('ok', True))
+        self.assertOutcomes(DictUtils.in_, ROGlyph('fields>status>name'), ('ok', False))
+        self.assertOutcomes(DictUtils.in_, ROGlyph('fields>other>id'), ('ok', False))
+        self.assertOutcomes(DictUtils.in_, ROGlyph('fields>status>id', r_types='>xsi:User'), ('ok', False))
+
+    def test_set(self):
+        for destination in ({}, _Mapping({})):
+            DictUtils.set(destination, RWGlyph('fields>status>id', w_types='>xsi:Status'), 3)
+            DictUtils.set(destination, RWGlyph('key'), 'X-1')
+            DictUtils.set(destination, RWGlyph('fields>status>name', w_translation_function=None), None)
+
+            # the type next to the level it is the type of, the values as text, None not written.
+            self.assertEqual(
+                             _as_dict(destination),
+                             {'key': 'X-1', 'fields': {'xsi': 'Status', 'status': {'id': '3'}}},
+                             )
+
+
+class DictUtilsFastPathTest(unittest.TestCase):
+    """
+        The fast path of L{DictUtils} for C{dict} sources against the generic path for other mappings, on random
+        sources and glyphs.
+    """
+
+    KEYS = ('a', 'b', 't')
+
+    LEAVES = (1, 'x', 'a', None, [1], ['x'], ('a',), b'a', 3.0)
+
+    TYPES = (None, None, None, None, None, None, 't:x', 't:a', 't:1', 't:None', "t:['x']")
+
+    RUNS = 3000
+
+    def random_source(self, r):
+        return random_source(r, DictUtilsFastPathTest.KEYS, DictUtilsFastPathTest.LEAVES, 0.8)
+
+    def random_path(self, r):
+        path = random_path(r, DictUtilsFastPathTest.KEYS)
+        return path, random_types(r, path, DictUtilsFastPathTest.TYPES)
+
+    def test_get_and_in(self):
+        r = random.Random(29)
+
+        for _ in range(DictUtilsFastPathTest.RUNS):
+            source = self.random_source(r)
+            if not isinstance(source, dict):
+                continue
+            mapping = _as_mapping(source)
+
+            path, types = self.random_path(r)
+            glyph = ROGlyph(
+                            path,
+                            r_types=types,
+                            r_default_value=r.choice((None, 'x', 1, {'a': 1})),
+                            r_translation_function=r.choice((None, _translate)),
+                            )
+
+            for no_default in (False, True):
+                for force_none_to_default_value in (False, True):
+                    self.assertEqual(
+                                     _outcome(DictUtils.get, source, glyph, no_default, force_none_to_default_value),
+                                     _outcome(DictUtils.get, mapping, glyph, no_default, force_none_to_default_value),
+                                     (source, glyph),
+                                     )
+
+            self.assertEqual(_outcome(DictUtils.in_, source, glyph), _outcome(DictUtils.in_, mapping, glyph))
+
+    def test_set(self):
+        r = random.Random(2029)
+
+        for _ in range(DictUtilsFastPathTest.RUNS):
+            destination = {}
+            mapping = _Mapping({})
+
+            for _ in range(r.randint(1, 4)):
+                path, types = self.random_path(r)
+                glyph = RWGlyph(path, w_types=types, w_translation_function=None)
+                value = r.choice(DictUtilsFastPathTest.LEAVES)
+
+                try:
+                    DictUtils.set(destination, glyph, value)
+                except (AssertionError, AttributeError, TypeError):  # a path through a value or a type clash
+                    break
+                DictUtils.set(mapping, glyph, value)
+
+                self.assertEqual(_as_dict(mapping), destination)
@@ -0,0 +1,169 @@
+from __future__ import unicode_literals
+
+import copy
+import random
+import unittest
+
+import tests  # noqa: F401 (puts src on the path)
+from tests.generators import fits, mutate, random_path, random_source, random_types
+
+from glyphs.rw.RWGlyph import RWGlyph
+from glyphs.rw.ResettableGlyph import ResettableGlyph
+from glyphs.utils.DictUtils import DictUtils
+from glyphs.writers.TrackingMapping import TrackingMapping
+
+
+def _has(source, glyph):
+    try:
+        return DictUtils.in_(source, glyph)
+    except TypeError:  # a level of the path is not a mapping
+        return False
+
+
+def _is_touched(touched, path):
+    """
+        Returns C{True} if the key L{path} or one of its prefixes was written into.
+    """
+    for key in path:
+        touched = touched.get(key)
+        if touched is None or touched is True:
+            return touched is True
+    return True
+
+
+class DictUtilsDeltaTest(unittest.TestCase):
+    """
+        L{DictUtils.delta} against writing each changed value with L{DictUtils.set} in turn (then each reset), on
+        random sources and glyph sets.
+    """
+
+    KEYS = ('a', 'b', 'c')
+
+    RUNS = 3000
+
+    def random_source(self, r):
+        return random_source(r, DictUtilsDeltaTest.KEYS)
+
+    def mutate(self, r, value):
+        return mutate(r, value, DictUtilsDeltaTest.KEYS)
+
+    def random_glyphs(self, r):
+        glyphs = []
+        paths = set()
+
+        for _ in range(r.randint(1, 6)):
+            path = random_path(r, DictUtilsDeltaTest.KEYS)
+            if not fits(path, paths):
+                continue
+            paths.add(path)
+
+            # the types of a level may differ from a path to another: the first path written wins.
+            types = random_types(r, path, (None, None, 't:x', 'u:y'))
+            if r.random() < 0.3:
+                glyphs.append(ResettableGlyph(
+                                              ('reset',) + path,
+                                              'RESET',
+                                              path,
+                                              w_types=types,
+                                              w_translation_function=None,
+                                              w_allow_none=True,
+                                              ))
+            else:
+                glyphs.append(RWGlyph(path, w_types=types, w_translation_function=None, w_allow_none=True))
+
+        return glyphs
+
+    def expected_delta(self, glyphs, changed, removed):
+        payload = {}
+        for g, value in changed:
+            DictUtils.set(payload, g, value)
+        for g in removed:
+            if isinstance(g, ResettableGlyph):
+                DictUtils.set_reset_value(payload, g)
+        return payload
+
+    def test_delta_example(self):
+        key = RWGlyph('key')
+        status = RWGlyph('fields>status>id', w_types='>xsi:Status', w_translation_function=None)
+        assignee = ResettableGlyph('fields>unassign', True, 'fields>assignee', w_translation_function=None)
+        points = RWGlyph('fields>points', w_translation_function=None)
+        glyphs = (key, status, assignee, points)
+
+        old = {'key': 'X-1', 'fields': {'xsi': 'Status', 'status': {'id': '3'}, 'assignee': 'someone', 'points': 2}}
+        new = {'key': 'X-1', 'fields': {'xsi': 'Status', 'status': {'id': '4'}, 'points': 2}}
+
+        # the status changed (with its type), the assignee was removed (reset), the rest is the same.
+        self.assertEqual(
+                         DictUtils.delta(old, new, glyphs),
+                         {'fields': {'xsi': 'Status', 'status': {'id': '4'}, 'unassign': True}},
+                         )
+        self.assertEqual(
+                         DictUtils.delta(new, old, glyphs),
+                         {'fields': {'xsi': 'Status', 'status': {'id': '3'}, 'assignee': 'someone'}},
+                         )
+        self.assertEqual(DictUtils.delta(old, old, glyphs), {})
+
+        # the values written into a tracking mapping, whether they changed or not.
+        tracking = TrackingMapping(copy.deepcopy(new))
+        DictUtils.set(tracking, points, 2)
+        DictUtils.set(tracking, key, 'X-2')
+        self.assertEqual(tracking.delta(glyphs), {'key': 'X-2', 'fields': {'points': 2}})
+
+    def test_delta(self):
+        r = random.Random(32)
+
+        for _ in range(DictUtilsDeltaTest.RUNS):
+            new = self.random_source(r)
+            if not isinstance(new, dict):
+                continue
+            old = self.mutate(r, new)
+            glyphs = self.random_glyphs(r)
+
+            changed = []
+            removed = []
+            for g in glyphs:
+                if _has(new, g):
+                    value = DictUtils.get(new, g)
+                    if not (_has(old, g) and DictUtils.get(old, g) == value):
+                        changed.append((g, value))
+                elif _has(old, g):
+                    removed.append(g)
+
+            try:
+                expected = self.expected_delta(glyphs, changed, removed)
+            except AssertionError:  # types clashing on a level
+                continue
+
+            self.assertEqual(DictUtils.delta(old, new, glyphs), expected, (old, new, glyphs))
+
+    def test_tracking_mapping(self):
+        r = random.Random(2032)
+
+        for _ in range(DictUtilsDeltaTest.RUNS):
+            data = self.random_source(r)
+            if not isinstance(data, dict):
+                continue
+            glyphs = self.random_glyphs(r)
+
+            tracking = TrackingMapping(copy.deepcopy(data))
+            try:
+                for g in glyphs:
+                    if r.random() < 0.5:
+                        DictUtils.set(tracking, g, r.choice((1, 'y', None)))
+            except (AssertionError, AttributeError, TypeError):  # a path through a value or types clashing
+                continue
+
+            # the values under the key paths written into changed, or were removed (e.g. by a new sub dictionary).
+            new = tracking.data
+            touched = [g for g in glyphs if _is_touched(tracking.touched, tuple(p for _, p, _ in g.iter_w_path_type))]
+            changed = [(g, DictUtils.get(new, g)) for g in touched if _has(new, g)]
+            removed = [g for g in touched if not _has(new, g)]
+
+            try:
+                expected = self.expected_delta(glyphs, changed, removed)
+            except AssertionError:
+                continue
+
+            self.assertEqual(tracking.delta(glyphs), expected, (data, new, glyphs))
+            tracking.clear_touched()
+            self.assertEqual(tracking.delta(glyphs), {})
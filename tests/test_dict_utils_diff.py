@@ -0,0 +1,85 @@
+from __future__ import unicode_literals
+
+import random
+import unittest
+
+import tests  # noqa: F401 (puts src on the path)
+from tests.generators import mutate, random_path, random_source, random_types
+
+from glyphs.ro.ROGlyph import ROGlyph
+from glyphs.utils.DictUtils import DictUtils
+
+
+class DictUtilsDiffTest(unittest.TestCase):
+    """
+        L{DictUtils.diff} against comparing each glyph in turn with L{DictUtils.in_} and L{DictUtils.get}, on
+        random sources and glyph sets.
+    """
+
+    RUNS = 5000
+
+    def expected_diff(self, old, new, glyphs, raw_glyphs):
+        changed = []
+        added = []
+        removed = []
+
+        for g, raw in zip(glyphs, raw_glyphs):
+            in_old = DictUtils.in_(old, g)
+            in_new = DictUtils.in_(new, g)
+
+            if in_old and in_new:
+                # changed if the values differ, and their translations as well.
+                if (DictUtils.get(old, raw) != DictUtils.get(new, raw)
+                    and DictUtils.get(old, g) != DictUtils.get(new, g)):
+                    changed.append(g)
+            elif in_old:
+                removed.append(g)
+            elif in_new:
+                added.append(g)
+
+        return tuple(changed), tuple(added), tuple(removed)
+
+    def test_diff_example(self):
+        key = ROGlyph('key')
+        status = ROGlyph('fields>status>id', r_types='>xsi:Status', r_translation_function=int)
+        assignee = ROGlyph('fields>assignee')
+        labels = ROGlyph('fields>labels')
+        points = ROGlyph('fields>points', r_translation_function=int)
+        glyphs = (key, status, assignee, labels, points)
+
+        old = {'key': 'X-1', 'fields': {'xsi': 'Status', 'status': {'id': '3'}, 'assignee': 'someone', 'points': '2'}}
+        new = {'key': 'X-1', 'fields': {'xsi': 'Status', 'status': {'id': '4'}, 'labels': ['a'], 'points': '02'}}
+
+        # the points differ, but not once translated.
+        diff = DictUtils.diff(old, new, glyphs)
+        self.assertEqual((diff.changed, diff.added, diff.removed), ((status,), (labels,), (assignee,)))
+        self.assertEqual(tuple(DictUtils.diff(new, old, glyphs)), ((status,), (assignee,), (labels,)))
+        self.assertEqual(tuple(DictUtils.diff(old, old, glyphs)), ((), (), ()))
+
+    def test_diff(self):
+        r = random.Random(33)
+        compared = 0
+
+        for _ in range(DictUtilsDiffTest.RUNS):
+            old = random_source(r)
+            new = mutate(r, old, add_probability=0.2)
+            if not isinstance(old, dict) or not isinstance(new, dict):
+                continue
+
+            glyphs = []
+            raw_glyphs = []
+            for _ in range(r.randint(1, 6)):
+                path = random_path(r)
+                types = random_types(r, path, (None, None, 't:x', 't:1'))
+                glyphs.append(ROGlyph(path, r_types=types, r_translation_function=r.choice((None, str))))
+                raw_glyphs.append(ROGlyph(path, r_types=types))
+
+            try:
+                expected = self.expected_diff(old, new, glyphs, raw_glyphs)
+            except TypeError:  # in_ going through a value which is not a mapping
+                continue
+
+            self.assertEqual(tuple(DictUtils.diff(old, new, glyphs)), expected, (old, new, glyphs))
+            compared += 1
+
+        self.assertGreater(compared, DictUtilsDiffTest.RUNS // 4)
@@ -0,0 +1,152 @@
+from __future__ import unicode_literals
+
+import os
+import pickle
+import random
+import shutil
+import tempfile
+import unittest
+
+import tests  # noqa: F401 (puts src on the path)
+
+from glyphs.extraction.GlyphAggregator import GlyphAggregator, OVERFLOW
+from glyphs.ro.ROGlyph import ROGlyph
+
+
+KEY = ROGlyph('key')
+VALUE = ROGlyph('value')
+
+
+def _group_by(sources):
+    """
+        Returns the aggregates of the given L{sources} grouped by key, in memory: key to count, sum, minimum and
+        maximum.
+
+        @rtype: dict
+    """
+    groups = {}
+    for source in sources:
+        key = source.get('key')
+        value = source.get('value')
+        count, total, minimum, maximum = groups.get(key, (0, None, None, None))
+        if value is not None:
+            if total is None:
+                total = minimum = maximum = value
+            else:
+                total, minimum, maximum = total + value, min(minimum, value), max(maximum, value)
+        groups[key] = (count + 1, total, minimum, maximum)
+    return groups
+
+
+class GlyphAggregatorTest(unittest.TestCase):
+    """
+        L{GlyphAggregator} in memory, spilling to disk and overflowing, against an in-memory group-by.
+    """
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def random_sources(self, r, count, keys):
+        return [
+                {'key': r.choice(keys), 'value': r.choice((None, 1, 2.5, -3, 10))}
+                for _ in range(count)
+                ]
+
+    def results(self, aggregator):
+        return dict((key, tuple(aggregate)) for key, aggregate in aggregator.iter_results())
+
+    def test_example(self):
+        sources = (
+                   {'key': 'b', 'value': 2},
+                   {'key': 'a', 'value': 5},
+                   {'key': 'b', 'value': None},
+                   {'key': None, 'value': 1},
+                   {'key': 'b', 'value': -1},
+                   )
+        aggregator = GlyphAggregator(KEY, VALUE).consume(sources)
+
+        # None first, then sorted by key.
+        self.assertEqual(
+                         [(key, tuple(aggregate)) for key, aggregate in aggregator.iter_results()],
+                         [(None, (1, 1, 1, 1)), ('a', (1, 5, 5, 5)), ('b', (3, 1, -1, 2))],
+                         )
+        self.assertEqual(
+                         list(GlyphAggregator(KEY).consume(sources).iter_results())[2],
+                         ('b', (3, None, None, None)),
+                         )
+
+    def test_spill(self):
+        r = random.Random(27)
+        key_sets = (
+                    ['k{}'.format(i) for i in range(40)] + [None],
+                    # numbers equal across types (1, 1.0 and True) share their group, wherever they are spilled.
+                    list(range(40)) + [1.0, True, 2.0, 0.5],
+                    [('t', i) for i in range(40)],
+                    )
+
+        for (max_groups, partitions), keys in zip(((1, 1), (3, 4), (10, 16)) * 3, key_sets * 3):
+            sources = self.random_sources(r, 600, keys)
+
+            with GlyphAggregator(KEY, VALUE, max_groups, self.directory, partitions=partitions) as aggregator:
+                aggregator.consume(sources)
+                self.assertTrue(os.listdir(self.directory))
+                self.assertEqual(self.results(aggregator), _group_by(sources))
+
+                # iterated one partition at a time: sorted by key within each partition.
+                results = list(aggregator.iter_results())
+                self.assertEqual(len(results), len(set(k for k, _ in results)))
+
+            self.assertEqual(os.listdir(self.directory), [])
+
+    def test_merge(self):
+        r = random.Random(127)
+        keys = ['k{}'.format(i) for i in range(30)]
+        sources = self.random_sources(r, 3000, keys)
+
+        merged = GlyphAggregator(KEY, VALUE, 5, self.directory, partitions=4)
+        for start in range(0, len(sources), 1000):
+            part = GlyphAggregator(KEY, VALUE, 5, self.directory, partitions=4).consume(sources[start:start + 1000])
+            merged.merge(part)
+
+        with merged:
+            self.assertEqual(self.results(merged), _group_by(sources))
+
+            # the order does not depend on the order of the merges.
+            other = GlyphAggregator(KEY, VALUE, 5, self.directory, partitions=4)
+            for start in (2000, 0, 1000):
+                other.merge(GlyphAggregator(KEY, VALUE, partitions=4).consume(sources[start:start + 1000]))
+            with other:
+                self.assertEqual(list(other.iter_results()), list(merged.iter_results()))
+
+    def test_overflow(self):
+        r = random.Random(227)
+        keys = ['k{}'.format(i) for i in range(20)]
+        sources = self.random_sources(r, 1000, keys)
+
+        aggregator = GlyphAggregator(KEY, VALUE, max_groups=5).consume(sources)
+        results = self.results(aggregator)
+        expected = _group_by(sources)
+
+        # the first 4 keys met have their own group, the sources of the others are in the overflow group.
+        first = []
+        for source in sources:
+            if source['key'] not in first:
+                first.append(source['key'])
+        self.assertEqual(set(results), set(first[:4]) | set((OVERFLOW,)))
+        for key in first[:4]:
+            self.assertEqual(results[key], expected[key])
+        overflowed = [dict(s, key=OVERFLOW) for s in sources if s['key'] not in first[:4]]
+        self.assertEqual(results[OVERFLOW], _group_by(overflowed)[OVERFLOW])
+
+        # the overflow group is unpickled as the same object, and sorted last.
+        self.assertIs(pickle.loads(pickle.dumps(OVERFLOW)), OVERFLOW)
+        self.assertIs(list(aggregator.iter_results())[-1][0], OVERFLOW)
+
+    def test_overflow_key(self):
+        aggregator = GlyphAggregator(KEY, max_groups=2, overflow_key='other')
+        aggregator.consume({'key': k} for k in ('a', 'b', 'c', 'a'))
+
+        self.assertEqual(self.results(aggregator), {'a': (2, None, None, None), 'other': (2, None, None, None)})
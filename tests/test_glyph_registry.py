@@ -0,0 +1,154 @@
+from __future__ import unicode_literals
+
+import json
+import os
+import pickle
+import shutil
+import tempfile
+import unittest
+
+import tests  # noqa: F401 (puts src on the path)
+
+from glyphs.readers.GlyphValidator import GlyphValidator
+from glyphs.rw.RWGlyph import RWGlyph
+from glyphs.registry.GlyphRegistry import GlyphRegistry
+from glyphs.utils.DictUtils import DictUtils
+from glyphs.writers.JSONPayloadWriter import JSONPayloadWriter
+
+
+class GlyphRegistryTest(unittest.TestCase):
+    """
+        Round trips of the glyph sets and of their compiled forms through the artifact files.
+    """
+
+    SPEC = {
+            'issue': [
+                      {'type': 'RWGlyph', 'r_path': 'key'},
+                      {'type': 'RWGlyph', 'r_path': 'fields>status>id', 'r_types': [None, None, 'xsi:Status'],
+                       'r_translation_function': 'int', 'w_translation_function': None},
+                      {'type': 'ResettableGlyph', 'r_path': 'fields>assignee', 'reset_w_path': 'fields>unassign',
+                       'reset_value': True},
+                      ],
+            'keys': [{'r_path': 'key'}],
+            }
+
+    SOURCE = {'key': 'X-1', 'fields': {'status': {'xsi': 'Status', 'id': '3'}, 'assignee': 'someone'}}
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.spec_path = os.path.join(self.directory, 'glyphs.json')
+        self.write_spec(GlyphRegistryTest.SPEC)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def write_spec(self, spec):
+        with open(self.spec_path, 'wb') as f:
+            f.write(json.dumps(spec).encode('utf-8'))
+
+    def test_artifact(self):
+        built = GlyphRegistry()
+        self.assertFalse(built.load(self.spec_path))
+
+        loaded = GlyphRegistry()
+        self.assertTrue(loaded.load(self.spec_path))
+        self.assertEqual(loaded.names, ('issue', 'keys'))
+
+        glyphs = loaded.glyph_set('issue')
+        self.assertEqual(DictUtils.get_many(GlyphRegistryTest.SOURCE, glyphs), ('X-1', 3, 'someone'))
+
+        # the compiled objects are loaded, on the glyphs of the glyph set.
+        validator = loaded.validator('issue')
+        self.assertIsInstance(validator, GlyphValidator)
+        self.assertIs(validator.glyphs, glyphs)
+        self.assertIs(loaded.validator('issue'), validator)
+        self.assertEqual(validator.validate(GlyphRegistryTest.SOURCE).values, ('X-1', 3, 'someone'))
+
+        writer = loaded.json_payload_writer('issue')
+        self.assertIsInstance(writer, JSONPayloadWriter)
+        self.assertEqual(
+                         json.loads(writer.dumps({glyphs[0]: 'X-2', glyphs[1]: 4})),
+                         {'key': 'X-2', 'fields': {'status': {'id': 4}}},
+                         )
+        self.assertEqual(
+                         loaded.payload_builder('issue').build({}, (glyphs[2],)),
+                         {'fields': {'unassign': True}},
+                         )
+        self.assertEqual(loaded.message_pack_reader('keys').read(b'\x81\xa3key\xa3X-3'), ('X-3',))
+
+        # the tries of the paths are cached for the glyph sets: write paths only for the sets of R/W glyphs.
+        r_trie, w_trie = DictUtils.tries(glyphs)
+        self.assertEqual((r_trie.count, w_trie.count), (3, 3))
+        self.assertIsNone(DictUtils.tries(loaded.glyph_set('keys'))[1])
+
+    def test_load_spec(self):
+        registry = GlyphRegistry().load_spec(GlyphRegistryTest.SPEC)
+
+        validator = registry.validator('keys')
+        self.assertIs(registry.validator('keys'), validator)
+        self.assertTrue(validator.is_valid({'key': 1}))
+
+        with self.assertRaises(KeyError):
+            registry.validator('unknown')
+
+    def test_stale_artifact(self):
+        GlyphRegistry().load(self.spec_path)
+
+        spec = dict(GlyphRegistryTest.SPEC)
+        spec['keys'] = [{'r_path': 'id'}]
+        self.write_spec(spec)
+
+        registry = GlyphRegistry()
+        self.assertFalse(registry.load(self.spec_path))
+        self.assertTrue(registry.validator('keys').is_valid({'id': 1}))
+        self.assertTrue(GlyphRegistry().load(self.spec_path))
+
+    def test_unloadable_artifact(self):
+        registry = GlyphRegistry()
+        registry.load(self.spec_path)
+        with open(self.spec_path, 'rb') as f:
+            header = registry._GlyphRegistry__artifact_header(f.read())
+
+        for content in (
+                        b'cglyphs.ro.ROGlyph\nRenamedGlyph\n.',  # a class renamed: AttributeError
+                        b'cglyphs.renamed\nROGlyph\n.',  # a module renamed: ImportError
+                        pickle.dumps(1),  # content of another shape: TypeError
+                        pickle.dumps((1, 2)),  # ValueError
+                        ):
+            with open(self.spec_path + '.artifact', 'wb') as f:
+                pickle.Pickler(f, 2).dump(header)
+                f.write(content)
+
+            registry = GlyphRegistry()
+            self.assertFalse(registry.load(self.spec_path), content)
+            self.assertTrue(registry.validator('keys').is_valid({'key': 1}))
+            self.assertTrue(GlyphRegistry().load(self.spec_path))
+
+    def test_code_changed(self):
+        GlyphRegistry().load(self.spec_path)
+
+        fingerprint = GlyphRegistry._GlyphRegistry__get_code_fingerprint()
+        try:
+            GlyphRegistry._GlyphRegistry__code_fingerprint = 'other code'
+            self.assertFalse(GlyphRegistry().load(self.spec_path))
+        finally:
+            GlyphRegistry._GlyphRegistry__code_fingerprint = fingerprint
+
+        self.assertFalse(GlyphRegistry().load(self.spec_path))
+        self.assertTrue(GlyphRegistry().load(self.spec_path))
+
+    def test_class_translation_function(self):
+        # a class registered as a translation function is saved by reference, not by name: here RWGlyph is the
+        # class of the glyphs saved as well, and int is a translation function. A registry which does not know
+        # the name "glyph" loads the artifact.
+        saving = GlyphRegistry()
+        saving.register_translation_function('glyph', RWGlyph)
+        self.assertFalse(saving.load(self.spec_path))
+
+        loaded = GlyphRegistry()
+        self.assertTrue(loaded.load(self.spec_path))
+
+        glyphs = loaded.glyph_set('issue')
+        self.assertIs(type(glyphs[1]), RWGlyph)
+        self.assertIs(glyphs[1].r_translation_function, int)
+        self.assertEqual(DictUtils.get_many(GlyphRegistryTest.SOURCE, glyphs), ('X-1', 3, 'someone'))
@@ -0,0 +1,142 @@
+from __future__ import unicode_literals
+
+import json
+import unittest
+
+import tests  # noqa: F401 (puts src on the path)
+
+from glyphs.extraction.GlyphTracer import GlyphTracer
+from glyphs.ro.ROGlyph import ROGlyph
+from glyphs.utils.DictUtils import DictUtils
+from glyphs.utils.ExtractionUtils import ExtractionUtils
+
+
+KEY = ROGlyph('key')
+STATUS = ROGlyph('fields>status>id', r_types='>xsi:Status>', r_translation_function=int)
+
+SOURCE = {'key': 'X-1', 'fields': {'xsi': 'Status', 'status': {'id': '3'}}}
+
+
+class _Spy(object):
+    """
+        Tracer counting the calls it is asked to sample, none of them traced.
+    """
+
+    def __init__(self):
+        self.sampled = []
+
+    def sample(self, glyph):
+        self.sampled.append(glyph)
+        return None
+
+    def record(self, glyph, times):
+        raise AssertionError('not sampled')
+
+
+class GlyphTracerTest(unittest.TestCase):
+    """
+        Tracing of the reads of glyphs through L{DictUtils}, off unless a tracer is installed.
+    """
+
+    def setUp(self):
+        self.assertIsNone(DictUtils.set_tracer(None))  # off by default, and after each test
+
+    def tearDown(self):
+        DictUtils.set_tracer(None)
+
+    def test_off(self):
+        spy = _Spy()
+
+        # a tracer which is not installed is never asked.
+        tracer = GlyphTracer(sample_rate=1)
+        DictUtils.get(SOURCE, STATUS)
+        DictUtils.get_many(SOURCE, (KEY, STATUS))
+        self.assertEqual(tracer.report()['glyphs'], {})
+
+        # installed: every call is sampled, get_many reading each glyph on its own.
+        self.assertIsNone(DictUtils.set_tracer(spy))
+        self.assertEqual(DictUtils.get(SOURCE, STATUS), 3)
+        self.assertEqual(DictUtils.get_many(SOURCE, (KEY, STATUS)), ('X-1', 3))
+        self.assertEqual(list(ExtractionUtils.iter_extract([SOURCE], (KEY,))), [('X-1',)])
+        self.assertEqual(spy.sampled, [STATUS, KEY, STATUS, KEY])
+
+        # uninstalled: back to the calls without sampling.
+        self.assertIs(DictUtils.set_tracer(None), spy)
+        DictUtils.get(SOURCE, STATUS)
+        DictUtils.get_many(SOURCE, (KEY, STATUS))
+        self.assertEqual(len(spy.sampled), 4)
+
+    def test_sample_rate(self):
+        with GlyphTracer(sample_rate=3) as tracer:
+            for _ in range(10):
+                DictUtils.get(SOURCE, STATUS)
+            DictUtils.get(SOURCE, KEY)
+
+        # the first call, then one in 3.
+        glyphs = tracer.report()['glyphs']
+        self.assertEqual((glyphs[repr(STATUS)]['calls'], glyphs[repr(STATUS)]['sampled']), (10, 4))
+        self.assertEqual((glyphs[repr(KEY)]['calls'], glyphs[repr(KEY)]['sampled']), (1, 0))
+        self.assertEqual(glyphs[repr(KEY)]['steps'], [])
+        self.assertEqual(tracer.sample_rate, 3)
+
+        tracer.clear()
+        self.assertEqual(tracer.report()['glyphs'], {})
+
+    def test_steps(self):
+        with GlyphTracer(sample_rate=1) as tracer:
+            for _ in range(5):
+                DictUtils.get(SOURCE, STATUS)
+
+        report = json.loads(tracer.dumps())
+        self.assertEqual((report['format'], report['sample_rate']), (GlyphTracer.FORMAT, 1))
+
+        status = report['glyphs'][repr(STATUS)]
+        self.assertEqual((status['calls'], status['sampled'], status['errors']), (5, 5, 0))
+
+        # in the order of the read, the type of a level checked before its lookup.
+        self.assertEqual(
+                         [s['step'] for s in status['steps']],
+                         ['fields', 'fields>status [xsi]', 'fields>status', 'fields>status>id', GlyphTracer.TRANSLATION,
+                          GlyphTracer.TOTAL],
+                         )
+        for step in status['steps']:
+            self.assertEqual(step['count'], 5)
+            self.assertEqual(sum(step['buckets'].values()), 5)
+            self.assertEqual(step['mean_ns'], step['total_ns'] // 5)
+            self.assertLessEqual(step['max_ns'], step['total_ns'])
+
+        total = status['steps'][-1]
+        self.assertGreaterEqual(total['total_ns'], sum(s['total_ns'] for s in status['steps'][:-1]))
+
+    def test_errors(self):
+        with GlyphTracer(sample_rate=1) as tracer:
+            with self.assertRaises(KeyError):
+                DictUtils.get({'key': 'X-1'}, STATUS, no_default=True)
+            with self.assertRaises(TypeError):
+                DictUtils.get({'fields': {'xsi': 'Other', 'status': {}}}, STATUS)
+            # the default value: not translated.
+            self.assertIsNone(DictUtils.get({'fields': {'xsi': 'Status', 'status': {}}}, STATUS))
+
+        status = tracer.report()['glyphs'][repr(STATUS)]
+        self.assertEqual((status['calls'], status['sampled'], status['errors']), (3, 3, 2))
+
+        # the steps reached only.
+        self.assertEqual(
+                         [(s['step'], s['count']) for s in status['steps']],
+                         [('fields', 3), ('fields>status [xsi]', 1), ('fields>status', 1), ('fields>status>id', 1),
+                          (GlyphTracer.TOTAL, 3)],
+                         )
+
+    def test_install(self):
+        first = GlyphTracer()
+        second = GlyphTracer()
+
+        self.assertIs(first.start(), first)
+        with second:
+            self.assertIs(DictUtils.set_tracer(second), second)
+
+            # stopping a tracer which is not installed leaves the installed one.
+            first.stop()
+            self.assertIs(DictUtils.set_tracer(second), second)
+
+        self.assertIsNone(DictUtils.set_tracer(None))
@@ -0,0 +1,109 @@
+from __future__ import unicode_literals
+
+import random
+import unittest
+
+import tests  # noqa: F401 (puts src on the path)
+from tests.generators import random_path, random_source, random_types
+
+from glyphs.readers.GlyphValidator import GlyphValidator
+from glyphs.ro.ROGlyph import ROGlyph
+from glyphs.utils.DictUtils import DictUtils
+
+
+class GlyphValidatorTest(unittest.TestCase):
+    """
+        L{GlyphValidator} against reading each glyph in turn with L{DictUtils.get}, on random sources and glyph
+        sets.
+    """
+
+    RUNS = 5000
+
+    def expected_kind(self, source, glyph, no_default, force_none_to_default_value):
+        """
+            Returns the pair of the kind of violation of the L{glyph} in L{source} (C{None} if it is valid) and of
+            the value read.
+        """
+        try:
+            return None, DictUtils.get(source, glyph, no_default, force_none_to_default_value)
+        except KeyError:
+            return GlyphValidator.MISSING, None
+        except TypeError as e:
+            if 'Type mismatch' in str(e):
+                return GlyphValidator.TYPE_MISMATCH, None
+            return GlyphValidator.TRANSLATION, None  # e.g. int(None)
+        except ValueError:
+            return GlyphValidator.TRANSLATION, None
+
+    def test_validate_example(self):
+        key = ROGlyph('key')
+        status = ROGlyph('fields>status>id', r_types='>xsi:Status', r_translation_function=int)
+        assignee = ROGlyph('fields>assignee>name')
+        points = ROGlyph('fields>points', r_translation_function=int)
+        resolution = ROGlyph('fields>resolution', r_default_value='none')
+        glyphs = (key, status, assignee, points, resolution)
+
+        valid = {'key': 'X-1', 'fields': {'xsi': 'Status', 'status': {'id': '3'}, 'assignee': {'name': 'a'},
+                                          'points': '2', 'resolution': 'done'}}
+        invalid = {'key': 'X-1', 'fields': {'xsi': 'User', 'status': {'id': '3'}, 'assignee': 'someone',
+                                            'points': 'two'}}
+
+        report = GlyphValidator(glyphs).validate(valid)
+        self.assertEqual((report.values, report.violations), (('X-1', 3, 'a', 2, 'done'), ()))
+
+        # every violation, with the path where it was found, and None for the values which could not be read.
+        report = GlyphValidator(glyphs).validate(invalid)
+        self.assertEqual(report.values, ('X-1', None, None, None, None))
+        self.assertEqual(
+                         [(v.glyph, v.kind, v.path) for v in report.violations],
+                         [
+                          (status, GlyphValidator.TYPE_MISMATCH, ('fields', 'status')),
+                          (assignee, GlyphValidator.MISSING, ('fields', 'assignee', 'name')),
+                          (points, GlyphValidator.TRANSLATION, ('fields', 'points')),
+                          (resolution, GlyphValidator.MISSING, ('fields', 'resolution')),
+                          ],
+                         )
+        self.assertIsInstance(report.violations[2].error, ValueError)
+
+        # the last level may be missing when the default values are allowed.
+        report = GlyphValidator(glyphs, no_default=False).validate(invalid)
+        self.assertEqual(report.values[4], 'none')
+        self.assertEqual([v.glyph for v in report.violations], [status, assignee, points])
+
+    def test_validate(self):
+        r = random.Random(34)
+        kinds = set()
+
+        for _ in range(GlyphValidatorTest.RUNS):
+            source = random_source(r, leaves=(1, 'x', '1', None, 'z'))
+            if not isinstance(source, dict):
+                continue
+
+            glyphs = []
+            for _ in range(r.randint(1, 6)):
+                path = random_path(r)
+                glyphs.append(ROGlyph(
+                                      path,
+                                      r_types=random_types(r, path, (None, None, 't:x', 't:1')),
+                                      r_translation_function=r.choice((None, int)),
+                                      r_default_value=r.choice((None, 0)),
+                                      ))
+            no_default = r.random() < 0.5
+            force_none_to_default_value = r.random() < 0.5
+
+            validator = GlyphValidator(glyphs, no_default, force_none_to_default_value)
+            report = validator.validate(source)
+            violations = dict((v.glyph, v.kind) for v in report.violations)
+
+            for index, g in enumerate(glyphs):
+                kind, value = self.expected_kind(source, g, no_default, force_none_to_default_value)
+                self.assertEqual(violations.get(g), kind, (source, g))
+                self.assertEqual(report.values[index], value, (source, g))
+                kinds.add(kind)
+
+            self.assertEqual(validator.is_valid(source), not violations)
+
+        self.assertEqual(
+                         kinds,
+                         set((None, GlyphValidator.MISSING, GlyphValidator.TYPE_MISMATCH, GlyphValidator.TRANSLATION,)),
+                         )
@@ -0,0 +1,76 @@
+from __future__ import unicode_literals
+
+import os
+import subprocess
+import sys
+import unittest
+
+from tests import SRC
+
+
+class ImportTimeTest(unittest.TestCase):
+    """
+        What importing the package loads, in a fresh interpreter. The modules loaded are compared with fixed lists
+        rather than timed, so that the test does not depend on the load of the machine: the times are measured
+        against their budgets by C{benchmarks/bench_import_time.py}.
+    """
+
+    BOOLEAN_UTILS_MODULES = (
+                             'glyphs', 'glyphs.helpers', 'glyphs.helpers.CacheUtils', 'glyphs.helpers.ImmutableType',
+                             'glyphs.helpers.compat', 'glyphs.utils', 'glyphs.utils.BooleanUtils',
+                             'glyphs.utils.StringUtils',
+                             )
+
+    DICT_UTILS_MODULES = (
+                          'glyphs', 'glyphs.helpers', 'glyphs.helpers.CacheUtils', 'glyphs.helpers.ImmutableObject',
+                          'glyphs.helpers.ImmutableType', 'glyphs.helpers.PathTrie', 'glyphs.helpers.compat',
+                          'glyphs.ro', 'glyphs.ro.ROGlyph', 'glyphs.rw', 'glyphs.rw.RWGlyph',
+                          'glyphs.rw.ResettableGlyph', 'glyphs.utils', 'glyphs.utils.DictUtils',
+                          'glyphs.utils.StringUtils',
+                          )
+
+    GLYPHS_MODULES = (
+                      ('glyphs', ('glyphs',)),
+                      ('glyphs.utils.BooleanUtils', BOOLEAN_UTILS_MODULES),
+                      ('glyphs.utils.DictUtils', DICT_UTILS_MODULES),
+                      (
+                       'glyphs.utils.ExtractionUtils',
+                       DICT_UTILS_MODULES + ('glyphs.utils.ExtractionUtils', 'glyphs.utils.PredicateUtils',),
+                       ),
+                      )
+    """ Pairs of module and of the modules of the package its import loads (Python 3.7+)."""
+
+    FORBIDDEN_MODULES = ('json', 'mmap', 'multiprocessing', 'pickle', 'six', 'tempfile', 'threading', 'tracemalloc')
+    """ Modules which the imports of L{GLYPHS_MODULES} must not load (Python 3), used by other parts of the package."""
+
+    @staticmethod
+    def run_python(code):
+        env = dict(os.environ)
+        env['PYTHONPATH'] = SRC + os.pathsep + env.get('PYTHONPATH', '')
+        return subprocess.check_output([sys.executable, '-c', code], env=env).decode('ascii').strip()
+
+    @staticmethod
+    def loaded_modules(module):
+        """
+            Returns the set of the names of the modules loaded by importing L{module} in a fresh interpreter.
+        """
+        return set(ImportTimeTest.run_python(
+                                             "import sys; before = set(sys.modules); import {}; "
+                                             "print(' '.join(sorted(set(sys.modules) - before)))".format(module)
+                                             ).split())
+
+    @unittest.skipIf(sys.version_info < (3, 7), 'everything is imported upfront without module __getattr__')
+    def test_glyphs_modules(self):
+        for module, expected in ImportTimeTest.GLYPHS_MODULES:
+            loaded = ImportTimeTest.loaded_modules(module)
+            self.assertEqual(sorted(m for m in loaded if m.split('.')[0] == 'glyphs'), sorted(expected), module)
+
+    @unittest.skipIf(sys.version_info[0] < 3, 'six is used on Python 2')
+    def test_forbidden_modules(self):
+        for module, _ in ImportTimeTest.GLYPHS_MODULES:
+            loaded = ImportTimeTest.loaded_modules(module)
+            self.assertEqual(sorted(loaded.intersection(ImportTimeTest.FORBIDDEN_MODULES)), [], module)
+
+    def test_star_import(self):
+        names = ImportTimeTest.run_python("from glyphs import *; print(ROGlyph.__name__ + ' ' + DictUtils.__name__)")
+        self.assertEqual(names, 'ROGlyph DictUtils')
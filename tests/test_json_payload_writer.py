@@ -0,0 +1,108 @@
+from __future__ import unicode_literals
+
+import io
+import json
+import random
+import sys
+import unittest
+
+import tests  # noqa: F401 (puts src on the path)
+from tests.generators import random_rw_glyphs
+
+from glyphs.rw.RWGlyph import RWGlyph
+from glyphs.utils.DictUtils import DictUtils
+from glyphs.writers.JSONPayloadWriter import JSONPayloadWriter
+
+
+def _double(value):
+    return None if value == 0 else value * 2
+
+
+class JSONPayloadWriterTest(unittest.TestCase):
+    """
+        L{JSONPayloadWriter} against C{json.dumps} of the dictionary built with L{DictUtils.set}, on random glyph
+        sets and values.
+    """
+
+    RUNS = 3000
+
+    ORDERED = sys.version_info >= (3, 7)
+    """ Whether the dictionaries keep the order of their keys (the bytes can be compared)."""
+
+    def test_dumps(self):
+        r = random.Random(30)
+        written = 0
+
+        for _ in range(JSONPayloadWriterTest.RUNS):
+            glyphs = random_rw_glyphs(r, (None, _double))
+            values = dict((g, r.choice((0, 1, None, 's'))) for g in glyphs if r.random() < 0.8)
+
+            expected = {}
+            try:
+                for g in glyphs:
+                    if g in values:
+                        DictUtils.set(expected, g, values[g])
+            except (AssertionError, AttributeError, TypeError):  # types clashing on a level
+                continue
+
+            payload = JSONPayloadWriter(glyphs).dumps(values)
+            self.assertEqual(json.loads(payload), expected)
+
+            # when all the glyphs are written, the keys are in the same order as well.
+            if JSONPayloadWriterTest.ORDERED and all(
+                   g in values
+                   and (g.w_translation_function is None or values[g] != 0)
+                   and (values[g] is not None or g.w_allow_none)
+                   for g in glyphs
+                   ):
+                self.assertEqual(payload, json.dumps(expected))
+                written += 1
+
+        self.assertTrue(written or not JSONPayloadWriterTest.ORDERED)
+
+    def test_dumps_example(self):
+        glyphs = (
+                  RWGlyph('a>b', w_types='t:x>'),
+                  RWGlyph('a>c', w_translation_function=None),
+                  RWGlyph('d', w_allow_none=True),
+                  RWGlyph('e'),
+                  )
+        writer = JSONPayloadWriter(glyphs)
+
+        # the type of "a" written after it, None only written when allowed, the default translation to text.
+        self.assertEqual(
+                         writer.dumps({glyphs[0]: 1, glyphs[1]: 'y', glyphs[2]: None, glyphs[3]: None}),
+                         '{"a": {"b": "1", "c": "y"}, "t": "x", "d": null}',
+                         )
+        self.assertEqual(writer.dumps({glyphs[1]: 'y'}), '{"a": {"c": "y"}}')
+        self.assertEqual(writer.dumps({glyphs[3]: None}), '{}')
+
+    def test_write_streams(self):
+        glyphs = tuple(RWGlyph('a>k{}'.format(i), w_translation_function=None) for i in range(20))
+        values = dict((g, i) for i, g in enumerate(glyphs))
+        writer = JSONPayloadWriter(glyphs)
+        chunks = []
+
+        class Recorder(object):
+            def write(self, chunk):
+                chunks.append(chunk)
+
+        writer.write(values, Recorder(), encoding='utf-8')
+
+        # written as it is produced: chunk by chunk, each one encoded.
+        self.assertGreater(len(chunks), len(glyphs))
+        self.assertTrue(all(isinstance(c, bytes) for c in chunks))
+        self.assertEqual(b''.join(chunks), writer.dumps(values).encode('utf-8'))
+
+    def test_write(self):
+        glyphs = (RWGlyph('a>b', w_types='t:x>'), RWGlyph('a>c', w_translation_function=None))
+        values = {glyphs[0]: 1, glyphs[1]: '\u00e9'}
+        writer = JSONPayloadWriter(glyphs)
+
+        text = io.StringIO()
+        writer.write(values, text)
+        self.assertEqual(text.getvalue(), writer.dumps(values))
+
+        data = io.BytesIO()
+        writer.write(values, data, encoding='utf-8')
+        self.assertEqual(data.getvalue(), writer.dumps(values).encode('utf-8'))
@@ -0,0 +1,164 @@
+from __future__ import unicode_literals
+
+import json
+import os
+import sys
+import unittest
+
+import tests  # noqa: F401 (puts src on the path)
+
+try:  # Python 3.4+
+    import tracemalloc
+except ImportError:
+    tracemalloc = None
+
+import glyphs
+from glyphs.registry.GlyphRegistry import GlyphRegistry
+from glyphs.ro.ROGlyph import ROGlyph
+from glyphs.utils.DictUtils import DictUtils
+from glyphs.utils.MemoryUtils import MemoryUtils
+
+
+class _Slotted(object):
+    __slots__ = ('__items', 'count',)
+
+    def __init__(self, items):
+        self.__items = items
+
+
+class _Plain(object):
+    def __init__(self, items):
+        self.items = items
+
+
+class MemoryUtilsTest(unittest.TestCase):
+    """
+        Sizes of object graphs, memory reports and their differences.
+    """
+
+    def test_sizeof(self):
+        getsizeof = sys.getsizeof
+        text = 'x' * 100
+        items = [text, text, 2.5]
+
+        # each object counted once.
+        self.assertEqual(MemoryUtils.sizeof(items), getsizeof(items) + getsizeof(text) + getsizeof(2.5))
+        mapping = {'a': items}
+        self.assertEqual(MemoryUtils.sizeof(mapping), getsizeof(mapping) + getsizeof('a') + MemoryUtils.sizeof(items))
+
+        cycle = []
+        cycle.append(cycle)
+        self.assertEqual(MemoryUtils.sizeof(cycle), getsizeof(cycle))
+
+        # shared code and singletons are not counted.
+        shared = [len, int, MemoryUtilsTest, sys, lambda: 0, None, True, False]
+        self.assertEqual(MemoryUtils.sizeof(shared), getsizeof(shared))
+
+        # attributes, in __dict__ or in (private) __slots__; empty slots are left out.
+        slotted = _Slotted(items)
+        self.assertEqual(MemoryUtils.sizeof(slotted), getsizeof(slotted) + MemoryUtils.sizeof(items))
+        plain = _Plain(items)
+        self.assertEqual(
+                         MemoryUtils.sizeof(plain),
+                         getsizeof(plain) + MemoryUtils.sizeof(plain.__dict__),
+                         )
+
+        # the objects already seen are not counted again.
+        seen = set()
+        self.assertEqual(MemoryUtils.sizeof(items, seen), MemoryUtils.sizeof(items))
+        self.assertEqual(MemoryUtils.sizeof([items, text], seen), getsizeof([items, text]))
+        self.assertIn(id(text), seen)
+
+    def test_report(self):
+        key = ROGlyph('key')
+        status = ROGlyph('fields>status', r_translation_function=int)
+        glyph_set = (key, ROGlyph('key'), status)
+        text = ''.join(('thr', 'ee'))  # a new object
+        values = [status, text]
+
+        DictUtils.get_many({'key': 'X-1', 'fields': {'status': '3'}}, glyph_set)  # fills the cache of the tries
+        report = MemoryUtils.report(
+                                    {'issue': glyph_set},
+                                    results={'values': values, 'again': values},
+                                    interners={'none': None},
+                                    )
+
+        self.assertEqual(report['format'], MemoryUtils.SNAPSHOT_FORMAT)
+        self.assertEqual(report['glyphs_version'], glyphs.__version__)
+
+        issue = report['glyph_sets']['issue']
+        self.assertEqual(issue['count'], 3)
+        self.assertEqual(issue['bytes'], MemoryUtils.sizeof(glyph_set))
+        # equal representations are told apart, each glyph measured on its own.
+        self.assertEqual(sorted(issue['glyphs']), sorted([repr(key), '{}#2'.format(repr(key)), repr(status)]))
+        self.assertEqual(issue['glyphs'][repr(status)], MemoryUtils.sizeof(status))
+
+        tries = report['caches']['glyphs.utils.DictUtils._R_TRIES']
+        self.assertGreater(tries['entries'], 0)
+        self.assertGreater(tries['bytes'], 0)
+
+        # the results are counted once, without the glyph already counted with the glyph sets.
+        self.assertEqual(
+                         sorted(r['bytes'] for r in report['results'].values()),
+                         [0, sys.getsizeof(values) + sys.getsizeof(text)],
+                         )
+        self.assertEqual(report['interners'], {'none': {'bytes': 0}})
+
+        self.assertEqual(
+                         report['total'],
+                         issue['bytes']
+                         + sum(c['bytes'] for c in report['caches'].values())
+                         + sum(r['bytes'] for r in report['results'].values()),
+                         )
+
+        if tracemalloc is None or not tracemalloc.is_tracing():
+            self.assertIsNone(report['tracemalloc'])
+
+    def test_registry(self):
+        registry = GlyphRegistry().load_spec({'keys': [{'r_path': 'key'}], 'issue': [{'r_path': 'a>b'}] * 2})
+        report = MemoryUtils.report(registry)
+
+        self.assertEqual(sorted(report['glyph_sets']), ['issue', 'keys'])
+        self.assertEqual(report['glyph_sets']['issue']['count'], 2)
+        self.assertEqual(report['glyph_sets']['keys']['count'], 1)
+
+    @unittest.skipIf(tracemalloc is None, 'tracemalloc is not available')
+    def test_tracemalloc(self):
+        tracemalloc.start()
+        try:
+            glyph_set = tuple(ROGlyph('level>{}'.format(i)) for i in range(50))
+            DictUtils.get_many({'level': {}}, glyph_set)  # a trie compiled while tracing
+            report = MemoryUtils.report(trace_top=3)['tracemalloc']
+        finally:
+            tracemalloc.stop()
+
+        self.assertGreaterEqual(report['peak'], report['current'])
+        self.assertGreater(report['package'], 0)
+        self.assertLessEqual(len(report['top']), 3)
+        # not the allocations of the measure itself.
+        self.assertFalse(any(line.startswith(os.path.join('utils', 'MemoryUtils.py')) for line in report['top']))
+
+    def test_diff(self):
+        old = {'a': {'bytes': 10, 'entries': 1}, 'b': 1, 'flag': True, 'name': 'x', 'tracemalloc': None}
+        new = {'a': {'bytes': 12, 'entries': 1}, 'c': 2.5, 'flag': False, 'name': 'y', 'tracemalloc': {'peak': 5}}
+
+        # numbers only, unchanged ones left out.
+        self.assertEqual(
+                         MemoryUtils.diff(old, new),
+                         {
+                          'a/bytes': (10, 12, 2),
+                          'b': (1, None, None),
+                          'c': (None, 2.5, None),
+                          'tracemalloc/peak': (None, 5, None),
+                          },
+                         )
+
+        # through the JSON snapshots.
+        report = MemoryUtils.report({'keys': (ROGlyph('key'),)}, results={'values': list(range(10))})
+        snapshot = MemoryUtils.dumps(report)
+        self.assertEqual(json.loads(snapshot)['glyph_sets'], report['glyph_sets'])
+        self.assertEqual(MemoryUtils.diff(json.loads(snapshot), report), {})
+
+        more = MemoryUtils.report({'keys': (ROGlyph('key'),)}, results={'values': list(range(20))})
+        differences = MemoryUtils.diff(json.loads(snapshot), json.loads(MemoryUtils.dumps(more)))
+        self.assertGreater(differences['results/values/bytes'][2], 0)
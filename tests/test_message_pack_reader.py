@@ -0,0 +1,146 @@
+from __future__ import unicode_literals
+
+import random
+import unittest
+
+import tests  # noqa: F401 (puts src on the path)
+from tests.generators import random_path, random_types
+
+from glyphs.readers.MessagePackReader import ExtType, MessagePackReader
+from glyphs.ro.ROGlyph import ROGlyph
+from glyphs.utils.DictUtils import DictUtils
+
+try:
+    import msgpack
+except ImportError:  # only needed to encode the sources and for the comparison
+    msgpack = None
+
+
+def _outcome(function, *args):
+    """
+        Returns the result of the call, or the type and message of the error it raised.
+    """
+    try:
+        return 'ok', function(*args)
+    except (KeyError, TypeError) as e:
+        return type(e), str(e)
+
+
+class MessagePackReaderTest(unittest.TestCase):
+    """
+        L{MessagePackReader} against decoding the whole source with C{msgpack.unpackb} then reading each glyph with
+        L{DictUtils.get}.
+    """
+
+    KEYS = ('a', 'b', 't', '\u00e9' * 12, 'k' * 40)
+
+    RUNS = 1000
+
+    def random_leaf(self, r):
+        leaves = [1, -3, -100, 300, 70000, 2 ** 40, -2 ** 40, 2 ** 63 + 5, 1.5, 'x', '1', None, True, False,
+                  'z' * 300, 'w', b'bin', b'q' * 300, [1, 'x'], [], {}]
+        if msgpack is not None:
+            leaves.extend((msgpack.ExtType(3, b'abcd'), msgpack.ExtType(5, b'abc')))
+        return r.choice(leaves)
+
+    def random_source(self, r, depth=0):
+        if depth > 3 or r.random() < 0.3:
+            return self.random_leaf(r)
+
+        source = dict((k, self.random_source(r, depth + 1)) for k in MessagePackReaderTest.KEYS if r.random() < 0.7)
+        if r.random() < 0.2:
+            source[7] = self.random_source(r, depth + 1)  # a key which is not a string
+        if r.random() < 0.05:
+            source.update(('f{}'.format(i), i) for i in range(20))  # a map 16
+        return source
+
+    @unittest.skipIf(msgpack is None, 'msgpack is not installed')
+    def test_read(self):
+        r = random.Random(37)
+        compared = 0
+
+        for _ in range(MessagePackReaderTest.RUNS):
+            source = self.random_source(r)
+            if not isinstance(source, dict):
+                continue
+
+            raw = msgpack.packb(source, use_bin_type=True)
+            decoded = msgpack.unpackb(raw, raw=False, ext_hook=ExtType, strict_map_key=False)
+
+            glyphs = []
+            for _ in range(r.randint(1, 6)):
+                path = random_path(r, MessagePackReaderTest.KEYS)
+                glyphs.append(ROGlyph(
+                                      path,
+                                      r_types=random_types(r, path, (None, None, 't:x', 't:1')),
+                                      r_translation_function=r.choice((None, str)),
+                                      r_default_value=r.choice((None, 0, {'a': {'b': 1}, 't': 'x'})),
+                                      ))
+            no_default = r.random() < 0.5
+            force_none_to_default_value = r.random() < 0.5
+
+            expected = _outcome(
+                                lambda: tuple(
+                                              DictUtils.get(decoded, g, no_default, force_none_to_default_value)
+                                              for g in glyphs
+                                              ),
+                                )
+            reader = MessagePackReader(glyphs, no_default, force_none_to_default_value, r.random() < 0.5)
+
+            for buffer in (raw, bytearray(raw), memoryview(raw)):
+                self.assertEqual(_outcome(reader.read, buffer), expected, (decoded, glyphs))
+            compared += 1
+
+        self.assertGreater(compared, MessagePackReaderTest.RUNS // 2)
+
+    def test_read_example(self):
+        # {'key': 'X-1', 'fields': {'t': 'Status', 'points': 2, 'labels': None}}
+        raw = b'\x82\xa3key\xa3X-1\xa6fields\x83\xa1t\xa6Status\xa6points\x02\xa6labels\xc0'
+        glyphs = (
+                  ROGlyph('key'),
+                  ROGlyph('fields>points', r_translation_function=str),
+                  ROGlyph('fields>labels', r_default_value=()),
+                  ROGlyph('fields>status', r_default_value='none'),
+                  )
+
+        self.assertEqual(MessagePackReader(glyphs).read(raw), ('X-1', '2', None, 'none'))
+        self.assertEqual(MessagePackReader(glyphs, False, True).read(raw), ('X-1', '2', (), 'none'))  # None forced
+        self.assertEqual(MessagePackReader((ROGlyph('fields>points', r_types='>t:Status'),)).read(raw), (2,))
+
+        with self.assertRaises(KeyError):
+            MessagePackReader(glyphs, no_default=True).read(raw)
+        with self.assertRaises(TypeError):
+            MessagePackReader((ROGlyph('fields>points', r_types='>t:User'),)).read(raw)
+        with self.assertRaises(KeyError):
+            MessagePackReader((ROGlyph('key>id'),)).read(raw)
+
+    # {'a': 1, 'b': {'t': 'x', 'v': 1, 't': 'y'}, 'a': 2}
+    DUPLICATED_KEYS = b'\x83\xa1a\x01\xa1b\x83\xa1t\xa1x\xa1v\x01\xa1t\xa1y\xa1a\x02'
+
+    def test_duplicated_keys(self):
+        # the first value of a key is the one read.
+        glyphs = (ROGlyph('a'), ROGlyph('b>t'), ROGlyph('b>v', r_types='>t:x'))
+        reader = MessagePackReader(glyphs)
+
+        self.assertEqual(reader.read(MessagePackReaderTest.DUPLICATED_KEYS), (1, 'x', 1))
+
+    def test_duplicated_keys_last_value_wins(self):
+        raw = MessagePackReaderTest.DUPLICATED_KEYS
+        glyphs = (ROGlyph('a'), ROGlyph('b>t'), ROGlyph('b>v', r_types='>t:y'))
+        reader = MessagePackReader(glyphs, last_value_wins=True)
+
+        self.assertEqual(reader.read(raw), (2, 'y', 1))
+
+        if msgpack is not None:
+            decoded = msgpack.unpackb(raw, raw=False)
+            self.assertEqual(reader.read(raw), tuple(DictUtils.get(decoded, g) for g in glyphs))
+
+    def test_stops_scanning(self):
+        # {'a': 1, 'b': 2} then a byte MessagePack never uses: only reached when the map is scanned to its end.
+        raw = b'\x83\xa1a\x01\xa1b\x02\xc1'
+
+        self.assertEqual(MessagePackReader((ROGlyph('a'), ROGlyph('b'))).read(raw), (1, 2))
+        with self.assertRaises(ValueError):
+            MessagePackReader((ROGlyph('a'), ROGlyph('b')), last_value_wins=True).read(raw)
+        with self.assertRaises(ValueError):
+            MessagePackReader((ROGlyph('a'), ROGlyph('c'))).read(raw)
@@ -0,0 +1,177 @@
+from __future__ import unicode_literals
+
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+import tests  # noqa: F401 (puts src on the path)
+
+from glyphs.extraction.NDJSONIndex import ExtractedChunk, NDJSONIndex
+from glyphs.ro.ROGlyph import ROGlyph
+from glyphs.utils.PredicateUtils import PredicateUtils
+
+
+KEY = ROGlyph('key')
+POINTS = ROGlyph('fields>points', r_translation_function=int)
+
+# blank lines (spaces included) are not records, the last record does not end with a newline.
+DATA = (
+        b'{"key": "X-1", "fields": {"points": "2"}}\n'
+        b'\n'
+        b'{"key": "X-2", "fields": {"points": "3"}}\n'
+        b'  \t\n'
+        b'{"key": "X-3", "fields": {"points": "5"}}\n'
+        b' {"key": "X-4", "fields": {}}\n'
+        b'{"key": "X-5", "fields": {"points": "8"}}'
+        )
+
+KEYS = ['X-1', 'X-2', 'X-3', 'X-4', 'X-5']
+
+
+class NDJSONIndexTest(unittest.TestCase):
+    """
+        Building, persisting and invalidating the index of a NDJSON file, and reading ranges of its records.
+    """
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'data.ndjson')
+        self.index_path = self.path + NDJSONIndex.INDEX_SUFFIX
+        self.write(DATA, 1000000000)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def write(self, data, mtime):
+        with open(self.path, 'wb') as f:
+            f.write(data)
+        os.utime(self.path, (mtime, mtime,))
+
+    def keys(self, index, start=0, stop=None):
+        return [record['key'] for record in index.iter_records(start, stop)]
+
+    def test_build(self):
+        index = NDJSONIndex.build(self.path)
+
+        self.assertEqual(index.path, self.path)
+        self.assertEqual(len(index), 5)
+        self.assertEqual(self.keys(index), KEYS)
+        self.assertFalse(os.path.exists(self.index_path))  # not saved
+
+        # the offsets of the records (the blanks in front of X-4 included), then the end of the file.
+        starts = [0, 43, 89, 131, 161]
+        self.assertEqual([index.byte_range(i, i + 1)[0] for i in range(5)], starts)
+        self.assertEqual([index.byte_range(i, i)[0] for i in range(6)], starts + [len(DATA)])
+        self.assertEqual(json.loads(DATA[slice(*index.byte_range(3, 4))].decode('utf-8')), {'key': 'X-4', 'fields': {}})
+
+        for data in (b'', b'\n \n\n', b'  '):
+            self.write(data, 1000000000)
+            index = NDJSONIndex.build(self.path)
+            self.assertEqual((len(index), list(index.iter_records()),), (0, [],))
+            self.assertEqual(index.byte_range(), (len(data), len(data),))  # nothing to read
+
+    def test_open(self):
+        index = NDJSONIndex.open(self.path)
+        self.assertEqual(self.keys(index), KEYS)
+        self.assertTrue(os.path.exists(self.index_path))
+
+        # same size and modification time: the saved index is loaded, whatever the content.
+        other = b'{"key": "Y-1"}\n'.ljust(len(DATA), b' ')
+        self.write(other, 1000000000)
+        self.assertEqual(len(NDJSONIndex.open(self.path)), 5)
+
+        # modification time changed: rebuilt and saved.
+        self.write(other, 1000000001)
+        self.assertEqual(self.keys(NDJSONIndex.open(self.path)), ['Y-1'])
+        self.write(DATA[:len(other)], 1000000001)
+        self.assertEqual(len(NDJSONIndex.open(self.path)), 1)
+
+        # size changed, same modification time: rebuilt and saved.
+        self.write(DATA + b'\n{"key": "X-6"}\n', 1000000001)
+        self.assertEqual(self.keys(NDJSONIndex.open(self.path)), KEYS + ['X-6'])
+        self.assertEqual(len(NDJSONIndex.open(self.path)), 6)
+
+    def test_unreadable_index(self):
+        saved = NDJSONIndex.open(self.path)
+        with open(self.index_path, 'rb') as f:
+            contents = f.read()
+
+        # truncated, another magic or another format: rebuilt.
+        for corrupted in (b'', contents[:10], contents[:-8], b'X' + contents[1:], contents[:8] + b'\x02' + contents[9:]):
+            with open(self.index_path, 'wb') as f:
+                f.write(corrupted)
+
+            index = NDJSONIndex.open(self.path)
+            self.assertEqual(self.keys(index), KEYS)
+            self.assertEqual([index.byte_range(i) for i in range(6)], [saved.byte_range(i) for i in range(6)])
+            with open(self.index_path, 'rb') as f:
+                self.assertEqual(f.read(), contents)
+
+    def test_save(self):
+        index_path = os.path.join(self.directory, 'indexes', 'data.idx')
+        index = NDJSONIndex.build(self.path)
+        index.save(index_path)
+
+        self.assertFalse(os.path.exists(self.index_path))
+        self.assertEqual(len(NDJSONIndex.open(self.path, index_path)), 5)
+        self.assertFalse(os.path.exists(self.index_path))
+
+        # modified after the index was built: it is not saved, even if the size did not change.
+        self.write(DATA, 1000000001)
+        with self.assertRaises(IOError):
+            index.save()
+        self.write(DATA + b'\n', 1000000000)
+        with self.assertRaises(IOError):
+            index.save()
+        self.assertFalse(os.path.exists(self.index_path))
+
+    def test_ranges(self):
+        index = NDJSONIndex.open(self.path)
+
+        for start in range(6):
+            for stop in range(start, 6):
+                self.assertEqual(self.keys(index, start, stop), KEYS[start:stop])
+        self.assertEqual(self.keys(index, 3), KEYS[3:])
+
+        # records decoded with another function.
+        self.assertEqual(list(index.iter_records(1, 2, loads=len)), [41])
+
+        for parts in (1, 2, 3, 5, 8):
+            for start, stop in ((0, 5), (1, 4), (2, 2)):
+                ranges = index.split(parts, start, stop)
+
+                # contiguous, not empty and covering the range.
+                bounds = [start] + [e for _, e in ranges]
+                self.assertLessEqual(len(ranges), parts)
+                self.assertEqual([s for s, _ in ranges], bounds[:-1])
+                self.assertTrue(all(s < e for s, e in ranges))
+                self.assertEqual(bounds[-1], stop)
+
+        self.assertEqual(index.split(5), ((0, 1), (1, 2), (2, 3), (3, 4), (4, 5)))
+
+    def test_iter_extract(self):
+        index = NDJSONIndex.open(self.path)
+
+        self.assertEqual(
+                         list(index.iter_extract((KEY, POINTS), 1, 4)),
+                         [('X-2', 3), ('X-3', 5), ('X-4', None)],
+                         )
+        with self.assertRaises(KeyError):
+            list(index.iter_extract((POINTS,), no_default=True))
+
+        expected = [('X-1', 2), ('X-2', 3), ('X-3', 5), ('X-4', None), ('X-5', 8)]
+        for processes, chunks in ((1, 2), (2, 3), (2, None)):
+            chunked = list(index.iter_extract_chunks((KEY, POINTS), processes=processes, chunks=chunks))
+
+            self.assertTrue(all(isinstance(c, ExtractedChunk) for c in chunked))
+            self.assertEqual([v for c in chunked for v in c.values], expected)
+            self.assertEqual([c.values for c in chunked], [expected[c.start:c.stop] for c in chunked])
+
+            # resumed from the stop of a chunk.
+            resumed = list(index.iter_extract_chunks((KEY, POINTS), chunked[0].stop, processes=processes))
+            self.assertEqual([v for c in resumed for v in c.values], expected[chunked[0].stop:])
+
+        chunked = index.iter_extract_chunks((KEY,), processes=2, chunks=2, predicate=PredicateUtils.range_(POINTS, 3, 8))
+        self.assertEqual([v for c in chunked for v in c.values], [('X-2',), ('X-3',)])
@@ -0,0 +1,103 @@
+from __future__ import unicode_literals
+
+import random
+import unittest
+
+import tests  # noqa: F401 (puts src on the path)
+from tests.generators import fits, random_path, random_types
+
+from glyphs.rw.RWGlyph import RWGlyph
+from glyphs.rw.ResettableGlyph import ResettableGlyph
+from glyphs.utils.DictUtils import DictUtils
+from glyphs.writers.PayloadBuilder import PayloadBuilder
+
+
+class PayloadBuilderTest(unittest.TestCase):
+    """
+        L{PayloadBuilder} against L{DictUtils.set} for each value then L{DictUtils.set_reset_value} for each reset,
+        on random glyph sets, values and resets.
+    """
+
+    RUNS = 3000
+
+    def random_path(self, r, paths):
+        for _ in range(50):
+            path = random_path(r, 'abc')
+            if fits(path, paths):
+                paths.add(path)
+                return path
+        return None
+
+    def random_glyphs(self, r):
+        glyphs = []
+        paths = set()
+
+        for _ in range(r.randint(1, 6)):
+            path = self.random_path(r, paths)
+            reset_path = self.random_path(r, paths) if r.random() < 0.5 else None
+            if path is None:
+                break
+
+            types = random_types(r, path, (None, 't:x', 'u:y'))
+            if reset_path is None:
+                glyphs.append(RWGlyph(path, w_types=types, w_allow_none=r.random() < 0.3))
+            else:
+                glyphs.append(ResettableGlyph(
+                                              reset_path,
+                                              r.choice((None, 'RESET')),
+                                              path,
+                                              w_types=types,
+                                              reset_w_type=random_types(r, reset_path, (None, 't:x')),
+                                              w_allow_none=r.random() < 0.3,
+                                              ))
+
+        return glyphs
+
+    def test_build_example(self):
+        key = RWGlyph('key')
+        status = RWGlyph('fields>status>id', w_types='>xsi:Status')
+        assignee = ResettableGlyph('fields>unassign', True, 'fields>assignee')
+        name = RWGlyph('fields>name', w_allow_none=True)
+        builder = PayloadBuilder((key, status, assignee, name))
+
+        self.assertEqual(
+                         builder.build({key: 'X-1', status: 3, assignee: 'someone'}),
+                         {'key': 'X-1', 'fields': {'xsi': 'Status', 'status': {'id': '3'}, 'assignee': 'someone'}},
+                         )
+
+        # a reset written instead of the value, None written only when allowed.
+        self.assertEqual(
+                         builder.build({key: 'X-1', assignee: None, status: None, name: None}, [assignee]),
+                         {'key': 'X-1', 'fields': {'unassign': True, 'name': None}},
+                         )
+        self.assertEqual(builder.build({}, [assignee]), {'fields': {'unassign': True}})
+        self.assertEqual(builder.build({}), {})
+
+    def test_build(self):
+        r = random.Random(31)
+        built = 0
+
+        for _ in range(PayloadBuilderTest.RUNS):
+            glyphs = self.random_glyphs(r)
+            if not glyphs:
+                continue
+
+            values = dict((g, r.choice((0, None, 's'))) for g in glyphs if r.random() < 0.7)
+            resets = [g for g in glyphs if isinstance(g, ResettableGlyph) and r.random() < 0.5]
+
+            expected = {}
+            try:
+                for g in glyphs:
+                    if g in values:
+                        DictUtils.set(expected, g, values[g])
+                for g in resets:
+                    DictUtils.set_reset_value(expected, g)
+            except (AssertionError, AttributeError, TypeError):  # types clashing on a level
+                continue
+
+            builder = PayloadBuilder(glyphs)
+            self.assertEqual(builder.build(values, resets), expected)
+            self.assertEqual(builder.build(values, resets), expected)  # reusable
+            built += 1
+
+        self.assertGreater(built, PayloadBuilderTest.RUNS // 2)
@@ -0,0 +1,77 @@
+from __future__ import unicode_literals
+
+import random
+import sys
+import unittest
+
+import tests  # noqa: F401 (puts src on the path)
+from tests.generators import random_rw_glyphs
+
+from glyphs.rw.RWGlyph import RWGlyph
+from glyphs.utils.DictUtils import DictUtils
+from glyphs.writers.PayloadTemplate import PayloadTemplate
+
+
+def _double(value):
+    return None if value == 0 or value is None else value * 2
+
+
+class PayloadTemplateTest(unittest.TestCase):
+    """
+        L{PayloadTemplate} against L{DictUtils.set} for each value in turn, on random glyph sets and values.
+    """
+
+    RUNS = 3000
+
+    ORDERED = sys.version_info >= (3, 7)
+    """ Whether the dictionaries keep the order of their keys (the order can be compared)."""
+
+    def assertSamePayload(self, payload, expected):
+        self.assertEqual(payload, expected)
+        if PayloadTemplateTest.ORDERED:
+            self.assertEqual(repr(payload), repr(expected))  # the keys in the same order, at all levels
+
+    def test_build_example(self):
+        template = PayloadTemplate((
+                                    RWGlyph('key'),
+                                    RWGlyph('fields>status>id', w_types='>xsi:Status'),
+                                    RWGlyph('fields>status>name', w_types='>xsi:Status', w_translation_function=None),
+                                    RWGlyph('fields>resolved', w_allow_none=True),
+                                    RWGlyph('fields>points', w_translation_function=int),
+                                    ))
+
+        self.assertSamePayload(
+                               template.build(('X-1', 3, 'Done', None, '2')),
+                               {'key': 'X-1', 'fields': {'status': {'id': '3', 'name': 'Done'}, 'xsi': 'Status',
+                                                         'resolved': None, 'points': 2}},
+                               )
+
+        # no value under a type: the type is not written either.
+        self.assertSamePayload(
+                               template.build(('X-2', None, None, True, '5')),
+                               {'key': 'X-2', 'fields': {'resolved': 'True', 'points': 5}},
+                               )
+
+    def test_build(self):
+        r = random.Random(42)
+        built = 0
+
+        for _ in range(PayloadTemplateTest.RUNS):
+            glyphs = random_rw_glyphs(r, (None, _double), same=True)  # the same path twice is fine
+
+            try:
+                template = PayloadTemplate(glyphs)
+            except (AssertionError, AttributeError, TypeError):  # types clashing on a level
+                continue
+
+            for _ in range(3):  # the same template, other values (and possibly other shapes)
+                values = [r.choice((0, 1, None, 's', 2.5)) for _ in glyphs]
+
+                expected = {}
+                for g, value in zip(glyphs, values):
+                    DictUtils.set(expected, g, value)
+
+                self.assertSamePayload(template.build(values), expected)
+                built += 1
+
+        self.assertGreater(built, PayloadTemplateTest.RUNS)
@@ -0,0 +1,107 @@
+from __future__ import unicode_literals
+
+import unittest
+
+import tests  # noqa: F401 (puts src on the path)
+
+from glyphs.extraction.GlyphAggregator import GlyphAggregator
+from glyphs.extraction.ThreadedExtractor import ThreadedExtractor
+from glyphs.ro.ROGlyph import ROGlyph
+from glyphs.utils.ExtractionUtils import ExtractionUtils
+from glyphs.utils.PredicateUtils import PredicateUtils
+
+
+STATUS = ROGlyph('fields>status>name')
+CATEGORY = ROGlyph('fields>status>category>id', r_types='>xsi:Status>', r_translation_function=int)
+KEY = ROGlyph('key')
+POINTS = ROGlyph('fields>points')
+
+SOURCES = (
+           {'key': 'X-1', 'fields': {'xsi': 'Status', 'status': {'name': 'Done', 'category': {'id': '3'}}, 'points': 2}},
+           {'key': 'X-2', 'fields': {'xsi': 'Status', 'status': {'name': 'Done', 'category': {'id': '5'}}, 'points': 3}},
+           {'key': 'X-3', 'fields': {'xsi': 'Status', 'status': {'name': 'Open', 'category': {'id': '4'}}, 'points': 5}},
+           {'key': 'X-4', 'fields': {'xsi': 'Other', 'status': {'name': 'Done', 'category': {'id': '4'}}}},
+           {'key': 'X-5', 'fields': {'status': None}},
+           {'key': 'X-6', 'fields': 7},
+           )
+
+DONE_3_OR_4 = PredicateUtils.and_(PredicateUtils.eq(STATUS, 'Done'), PredicateUtils.in_(CATEGORY, (3, 4)))
+
+
+class PredicateUtilsTest(unittest.TestCase):
+    """
+        Compiled predicates, and their pushdown into the streaming paths.
+    """
+
+    def keys(self, predicate):
+        matches = PredicateUtils.compile(predicate)
+        return [s['key'] for s in SOURCES if matches(s)]
+
+    def test_operators(self):
+        self.assertEqual(self.keys(PredicateUtils.eq(STATUS, 'Done')), ['X-1', 'X-2', 'X-4'])
+        self.assertEqual(self.keys(PredicateUtils.in_(CATEGORY, (3, 4))), ['X-1', 'X-3'])  # X-4: type mismatch
+        self.assertEqual(self.keys(PredicateUtils.range_(POINTS, 3)), ['X-2', 'X-3'])
+        self.assertEqual(self.keys(PredicateUtils.range_(POINTS, high=3)), ['X-1'])
+        self.assertEqual(self.keys(PredicateUtils.range_(POINTS, 2, 5)), ['X-1', 'X-2'])
+        self.assertEqual(self.keys(DONE_3_OR_4), ['X-1'])
+        self.assertEqual(
+                         self.keys(PredicateUtils.or_(PredicateUtils.eq(STATUS, 'Open'), PredicateUtils.eq(KEY, 'X-6'))),
+                         ['X-3', 'X-6'],
+                         )
+        self.assertEqual(self.keys(PredicateUtils.not_(PredicateUtils.eq(STATUS, 'Done'))), ['X-3', 'X-5', 'X-6'])
+
+    def test_exists(self):
+        # X-5 and X-6: a level of the path is None or a number, which does not raise.
+        self.assertEqual(self.keys(PredicateUtils.exists(STATUS)), ['X-1', 'X-2', 'X-3', 'X-4'])
+        self.assertEqual(self.keys(PredicateUtils.exists(CATEGORY)), ['X-1', 'X-2', 'X-3'])
+        self.assertEqual(self.keys(PredicateUtils.not_(PredicateUtils.exists(STATUS))), ['X-5', 'X-6'])
+
+    def test_resolved(self):
+        matches = PredicateUtils.compile(DONE_3_OR_4)
+
+        # the cheapest glyph first: the category is not read once the status does not match.
+        resolved = {}
+        self.assertFalse(matches(SOURCES[2], resolved))
+        self.assertEqual(resolved, {STATUS: 'Open'})
+
+        resolved = {}
+        self.assertTrue(matches(SOURCES[0], resolved))
+        self.assertEqual(resolved, {STATUS: 'Done', CATEGORY: 3})
+
+        resolved = {}
+        self.assertFalse(matches(SOURCES[5], resolved))
+        self.assertEqual(resolved, {STATUS: PredicateUtils.UNRESOLVED})
+
+        # values already resolved are not read again.
+        self.assertTrue(matches(SOURCES[5], {STATUS: 'Done', CATEGORY: 4}))
+
+    def test_iter_extract(self):
+        calls = []
+
+        def counted(value):
+            calls.append(value)
+            return int(value)
+
+        category = ROGlyph('fields>status>category>id', r_translation_function=counted)
+        predicate = PredicateUtils.in_(category, (3, 5))
+
+        self.assertEqual(
+                         list(ExtractionUtils.iter_extract(SOURCES[:4], (KEY, category), predicate)),
+                         [('X-1', 3), ('X-2', 5)],
+                         )
+        self.assertEqual(calls, ['3', '5', '4', '4'])  # read once per source, not again for the extraction
+
+        # the values of the sources dropped are never read, even if they would raise.
+        self.assertEqual(list(ExtractionUtils.iter_extract(SOURCES, (POINTS,), DONE_3_OR_4, no_default=True)), [(2,)])
+
+    def test_aggregator(self):
+        aggregator = GlyphAggregator(STATUS, POINTS, predicate=PredicateUtils.exists(POINTS)).consume(SOURCES)
+
+        self.assertEqual(
+                         [(key, tuple(aggregate)) for key, aggregate in aggregator.iter_results()],
+                         [('Done', (2, 5, 2, 3)), ('Open', (1, 5, 5, 5))],
+                         )
+
+    def test_threaded_extractor(self):
+        with ThreadedExtractor((KEY, CATEGORY), threads=3, chunk_size=1, predicate=DONE_3_OR_4) as extractor:
+            self.assertEqual(list(extractor.iter_extract(SOURCES)), [('X-1', 3)])
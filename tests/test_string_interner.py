@@ -0,0 +1,127 @@
+from __future__ import unicode_literals
+
+import sys
+import threading
+import unittest
+
+import tests  # noqa: F401 (puts src on the path)
+
+from glyphs.extraction.StringInterner import StringInterner
+from glyphs.ro.ROGlyph import ROGlyph
+from glyphs.utils.ExtractionUtils import ExtractionUtils
+
+
+STATUS = ROGlyph('status')
+NAME = ROGlyph('name')
+
+
+def _text(*parts):
+    """
+        Returns a new string object made of the given L{parts} (literals may be shared by the interpreter).
+    """
+    return ''.join(parts)
+
+
+class StringInternerTest(unittest.TestCase):
+    """
+        Pooling of the strings read with each glyph.
+    """
+
+    def test_identity(self):
+        interner = StringInterner()
+        first = _text('Do', 'ne')
+        second = _text('Do', 'ne')
+        self.assertIsNot(first, second)
+
+        self.assertIs(interner.intern(STATUS, first), first)
+        self.assertIs(interner.intern(STATUS, second), first)
+
+        # one pool per glyph.
+        self.assertIs(interner.intern(NAME, second), second)
+        self.assertIs(interner.intern(NAME, _text('Do', 'ne')), second)
+
+        # other values are returned as they are.
+        for value in (None, 3, 2.5, ['Done']):
+            self.assertIs(interner.intern(STATUS, value), value)
+
+        self.assertEqual(interner.hits, 2)
+        self.assertGreater(interner.bytes_saved, 0)
+        self.assertEqual(interner.report()['pools'], {STATUS: 1, NAME: 1})
+
+    def test_max_pool_size(self):
+        interner = StringInterner(max_pool_size=3)
+
+        for i in range(3):
+            interner.intern(STATUS, _text('s', str(i)))
+        self.assertTrue(interner.is_interning(STATUS))
+
+        value = _text('s', '3')
+        self.assertIs(interner.intern(STATUS, value), value)
+        self.assertFalse(interner.is_interning(STATUS))
+        self.assertIsNot(interner.intern(STATUS, _text('s', '0')), interner.intern(STATUS, _text('s', '0')))
+        self.assertEqual(interner.report()['pools'], {STATUS: None})
+
+    def test_distinct_ratio(self):
+        interner = StringInterner(max_distinct_ratio=0.5, warm_up=10)
+
+        # low cardinality: still interned after the warm up.
+        for i in range(100):
+            interner.intern(STATUS, _text('s', str(i % 3)))
+        self.assertTrue(interner.is_interning(STATUS))
+
+        # high cardinality: disabled once warmed up.
+        for i in range(9):
+            interner.intern(NAME, _text('n', str(i)))
+        self.assertTrue(interner.is_interning(NAME))
+        interner.intern(NAME, _text('n', '9'))
+        self.assertFalse(interner.is_interning(NAME))
+
+        interner.clear()
+        self.assertTrue(interner.is_interning(NAME))
+        self.assertEqual((interner.hits, interner.bytes_saved), (0, 0))
+
+    def test_iter_extract(self):
+        sources = [{'status': _text('Do', 'ne'), 'name': _text('n', str(i))} for i in range(5)]
+        interner = StringInterner()
+
+        values = list(ExtractionUtils.iter_extract(sources, (STATUS, NAME), interner=interner))
+
+        self.assertEqual(values, [('Done', 'n{}'.format(i)) for i in range(5)])
+        self.assertTrue(all(v[0] is values[0][0] for v in values))
+        self.assertEqual(interner.hits, 4)
+
+    def test_threads(self):
+        interner = StringInterner()
+        glyphs = (STATUS, NAME)
+        results = []
+        switch_interval = sys.getswitchinterval() if hasattr(sys, 'getswitchinterval') else None
+
+        def run():
+            results.append([
+                            (g, interner.intern(g, _text('v', str(i % 50))))
+                            for i in range(2000)
+                            for g in glyphs
+                            ])
+
+        threads = [threading.Thread(target=run) for _ in range(8)]
+        if switch_interval is not None:
+            sys.setswitchinterval(1e-6)  # as many switches as possible
+        try:
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+        finally:
+            if switch_interval is not None:
+                sys.setswitchinterval(switch_interval)
+
+        # a single object per glyph and value, whichever thread pooled it.
+        pooled = {}
+        for values in results:
+            for g, value in values:
+                self.assertIs(pooled.setdefault((g, value), value), value)
+        self.assertEqual(len(pooled), 100)
+
+        # all the other strings read were counted as replaced, by the counters of their threads.
+        self.assertEqual(interner.hits, 8 * 2000 * 2 - 100)
+        self.assertEqual(interner.report()['pools'], {STATUS: 50, NAME: 50})
@@ -0,0 +1,96 @@
+from __future__ import unicode_literals
+
+import random
+import threading
+import unittest
+
+import tests  # noqa: F401 (puts src on the path)
+
+from glyphs.extraction.StringInterner import StringInterner
+from glyphs.extraction.ThreadedExtractor import ThreadedExtractor
+from glyphs.ro.ROGlyph import ROGlyph
+from glyphs.utils.ExtractionUtils import ExtractionUtils
+from glyphs.utils.PredicateUtils import PredicateUtils
+
+
+KEY = ROGlyph('key')
+STATUS = ROGlyph('fields>status', r_default_value='none')
+POINTS = ROGlyph('fields>points', r_translation_function=int)
+
+
+class ThreadedExtractorTest(unittest.TestCase):
+    """
+        L{ThreadedExtractor} against L{ExtractionUtils.iter_extract} run serially.
+    """
+
+    def random_sources(self, r, count):
+        sources = []
+        for i in range(count):
+            fields = {'points': str(r.randint(0, 8))}
+            if r.random() < 0.8:
+                fields['status'] = ''.join(list(r.choice(('Open', 'Done', 'Closed'))))  # a new object
+            sources.append({'key': 'X-{}'.format(i), 'fields': fields})
+        return sources
+
+    def test_iter_extract(self):
+        r = random.Random(40)
+        glyphs = (KEY, STATUS, POINTS)
+        predicate = PredicateUtils.range_(POINTS, 2, 7)
+
+        for threads, chunk_size, count in ((1, 1, 10), (4, 1, 50), (4, 7, 1000), (8, 256, 3000), (3, 50, 0)):
+            sources = self.random_sources(r, count)
+
+            with ThreadedExtractor(glyphs, threads, chunk_size) as extractor:
+                self.assertEqual(extractor.threads, threads)
+                # the values of each source, in the order of the sources.
+                self.assertEqual(
+                                 list(extractor.iter_extract(iter(sources))),
+                                 list(ExtractionUtils.iter_extract(sources, glyphs)),
+                                 )
+
+            with ThreadedExtractor(glyphs, threads, chunk_size, predicate=predicate) as extractor:
+                self.assertEqual(
+                                 list(extractor.iter_extract(sources)),
+                                 list(ExtractionUtils.iter_extract(sources, glyphs, predicate)),
+                                 )
+
+    def test_interner(self):
+        sources = self.random_sources(random.Random(140), 2000)
+        interner = StringInterner()
+
+        with ThreadedExtractor((STATUS,), 4, 16, interner=interner) as extractor:
+            values = list(extractor.iter_extract(sources))
+
+        self.assertEqual(values, list(ExtractionUtils.iter_extract(sources, (STATUS,))))
+        # one object per distinct string, whichever thread read it.
+        self.assertEqual(len(set(id(v) for v, in values)), len(set(values)))
+        self.assertEqual(len(set(values)), 4)
+
+    def test_lazy(self):
+        consumed = []
+        lock = threading.Lock()
+
+        def sources():
+            for i in range(10000):
+                with lock:
+                    consumed.append(i)
+                yield {'key': i}
+
+        with ThreadedExtractor((KEY,), 2, 10) as extractor:
+            values = extractor.iter_extract(sources())
+            self.assertEqual(next(values), (0,))
+
+            # at most 2 chunks per thread in flight, plus the chunk being read.
+            with lock:
+                self.assertLessEqual(len(consumed), 5 * 10)
+
+            self.assertEqual([v for v, in values], list(range(1, 10000)))
+
+    def test_error(self):
+        sources = [{'key': 1}, {'key': 2}, {}, {'key': 4}]
+
+        with ThreadedExtractor((KEY,), 2, 1, no_default=True) as extractor:
+            values = extractor.iter_extract(sources)
+            self.assertEqual((next(values), next(values)), ((1,), (2,)))
+            with self.assertRaises(KeyError):
+                next(values)